@@ -0,0 +1 @@
+"""Módulos compartilhados pelos notebooks do pipeline (Landing → Bronze → Silver → Gold)."""
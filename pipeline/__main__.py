@@ -0,0 +1,7 @@
+"""
+Execução local do pipeline completo: python -m pipeline --help (ver pipeline/execucao.py)
+"""
+
+from pipeline.execucao import main
+
+main()
@@ -0,0 +1,270 @@
+"""
+Bronze → Silver: aplica o log_pagamento (CDC) na tabela Silver de pagamentos com MERGE e monta as
+tabelas enriquecidas (paciente + endereço, consulta consolidada), escolhendo broadcast ou
+co-particionamento em cada join
+"""
+
+import argparse
+import logging
+
+from delta.tables import DeltaTable
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+from pipeline.controle import gravar_controle, ler_controle
+from pipeline.landing_bronze import origem_reiniciada
+
+logger = logging.getLogger(__name__)
+
+# Nome do registro da Silver de pagamentos na tabela de controle (marca d'água: último id_log aplicado)
+CONTROLE_PAGAMENTO = 'silver_pagamento'
+
+# Tabelas Silver com data são particionadas por ano/mês: leituras de um período só abrem as pastas dele
+COLUNAS_PARTICAO = ["ano", "mes"]
+
+# Tabelas copiadas da Bronze sem transformação e todas as tabelas gravadas na Silver
+TABELAS_SIMPLES = ["odontologista", "procedimento", "tipo_pagamento", "consulta_procedimento"]
+TABELAS_SILVER = ["paciente_enriquecido", "pagamento", "pagamento_removido", "consulta_consolidada",
+                  *TABELAS_SIMPLES]
+
+# Pagamentos apagados pelo log: saem da Silver de pagamento e ficam registrados em pagamento_removido,
+# para a Gold saber de quais consultas tirar as linhas (colunas também presentes na Silver de pagamento)
+PAGAMENTO_REMOVIDO = 'pagamento_removido'
+COLUNAS_REMOVIDO = ["id_pagamento", "consulta_id_consulta", "id_log_aplicado", "atualizado_em"]
+
+COLUNAS_ENDERECO = ["logradouro", "numero", "complemento", "bairro", "cidade", "estado", "cep", "pais"]
+COLUNAS_PAGAMENTO = ["id_pagamento", "valor_pago", "data_pagamento", "tipo_pagamento_id_tipo_pagamento"]
+
+
+def com_particao_mensal(df, coluna_data):
+    """Adiciona as colunas de partição ano/mes a partir de uma coluna de data."""
+    return df.withColumn("ano", F.year(coluna_data)).withColumn("mes", F.month(coluna_data))
+
+
+def gravar_particionado(df, destino, formato="delta"):
+    """Sobrescreve uma tabela particionada por ano/mes, com um arquivo por partição (e não um por tarefa)."""
+    df.repartition(*COLUNAS_PARTICAO).write.format(formato).mode("overwrite") \
+        .option("overwriteSchema", "true") \
+        .partitionBy(*COLUNAS_PARTICAO) \
+        .save(destino)
+
+
+def tamanho_estimado(df):
+    """Tamanho estimado do DataFrame em bytes, pelas estatísticas do plano otimizado (sem executar um job).
+
+    A estimativa parte do tamanho dos arquivos (ou do cache) e é reduzida às colunas selecionadas, então
+    considera a largura das linhas e não só a quantidade.
+    """
+    return int(df._jdf.queryExecution().optimizedPlan().stats().sizeInBytes())
+
+
+def limite_broadcast(spark):
+    """spark.sql.autoBroadcastJoinThreshold da sessão em bytes (-1 desativa o broadcast)."""
+    return spark._jsparkSession.sessionState().conf().autoBroadcastJoinThreshold()
+
+
+def juntar_por_tamanho(df, outro, chave, chave_outro, como="inner", num_particoes=None, limite_bytes=None):
+    """Junta df com outro pela chave: por broadcast se outro cabe no limite, senão co-particionando os dois lados.
+
+    O broadcast evita embaralhar df. No co-particionamento, os dois lados são reparticionados pela chave com
+    o mesmo número de partições, e o sort-merge join não precisa de outra troca de dados. O limite padrão é
+    o spark.sql.autoBroadcastJoinThreshold da sessão.
+    """
+    limite_bytes = limite_broadcast(df.sparkSession) if limite_bytes is None else limite_bytes
+    if tamanho_estimado(outro) <= limite_bytes:
+        return df.join(F.broadcast(outro), df[chave] == outro[chave_outro], como)
+
+    num_particoes = num_particoes or int(df.sparkSession.conf.get("spark.sql.shuffle.partitions"))
+    df = df.repartition(num_particoes, chave)
+    outro = outro.repartition(num_particoes, chave_outro)
+    return df.join(outro, df[chave] == outro[chave_outro], como)
+
+
+def enriquecer_pacientes(paciente, endereco):
+    """Paciente com os dados do endereço (left join: pacientes sem endereço cadastrado são mantidos)."""
+    endereco = endereco.select("id_endereco", *COLUNAS_ENDERECO)
+    return juntar_por_tamanho(paciente, endereco, "endereco_id_endereco", "id_endereco", "left").select(
+        "id_paciente",
+        "nome_paciente",
+        "cpf_paciente",
+        "telefone",
+        "genero",
+        F.col("data_nasc").cast("date").alias("data_nasc"),
+        "email",
+        *COLUNAS_ENDERECO,
+    )
+
+
+def consolidar_consultas(consulta, agendamento, pagamento, num_particoes=None):
+    """Visão consolidada da consulta (consulta + agendamento + pagamento), com as partições ano/mes de data_hora.
+
+    Cada lado é reduzido às colunas usadas antes do join, para embaralhar (ou transmitir) só o necessário.
+    """
+    agendamento = agendamento.select(
+        "id_agendamento", "paciente_id_paciente", "odontologista_id_odontologista", "status_agendamento"
+    )
+    # Inner join: toda consulta tem um agendamento
+    consultas = juntar_por_tamanho(
+        consulta, agendamento, "agendamento_id_agendamento", "id_agendamento", num_particoes=num_particoes
+    )
+    # Left join: a consulta pode não ter pagamento ainda
+    pagamento = pagamento.select("consulta_id_consulta", *COLUNAS_PAGAMENTO)
+    consultas = juntar_por_tamanho(
+        consultas, pagamento, "id_consulta", "consulta_id_consulta", "left", num_particoes=num_particoes
+    )
+    return com_particao_mensal(consultas.select(
+        "id_consulta",
+        "data_hora",
+        "diagnostico",
+        "tratamento",
+        "id_agendamento",
+        "paciente_id_paciente",
+        "odontologista_id_odontologista",
+        "status_agendamento",
+        *COLUNAS_PAGAMENTO,
+    ), "data_hora")
+
+
+def ultimas_alteracoes(log):
+    """Reproduz o log em ordem e mantém só o estado final de cada pagamento (última operação por id_pagamento)."""
+    janela = Window.partitionBy("id_pagamento").orderBy(F.col("DataHoraOperacao").desc(), F.col("id_log").desc())
+    return log.withColumn("_ordem", F.row_number().over(janela)) \
+              .filter(F.col("_ordem") == 1) \
+              .drop("_ordem")
+
+
+def operacoes_aplicadas(pagamento):
+    """Última operação do log aplicada a cada pagamento da Silver, com as colunas do log_pagamento."""
+    return pagamento.select(
+        F.col("id_log_aplicado").alias("id_log"), "id_pagamento", F.col("atualizado_em").alias("DataHoraOperacao")
+    )
+
+
+def aplicar_log_pagamentos(spark, caminho_bronze, caminho_silver, caminho_controle=None, bronze=None):
+    """Aplica na Silver de pagamentos as operações do log_pagamento ainda não aplicadas. Retorna quantos pagamentos mudaram.
+
+    Cada execução lê só o log acima da marca d'água (id_log). Pagamentos novos recebem a consulta da
+    Bronze de pagamento; os existentes são atualizados sem reler a tabela de pagamentos inteira, e os
+    apagados são registrados em pagamento_removido. Se os IDs do log recomeçaram (nova carga do gerador),
+    a Silver é reconstruída com o log inteiro.
+    Com bronze (CacheCamada), as tabelas Bronze são lidas por ele e entram na contagem de leituras do job.
+    """
+    def ler_bronze(tabela):
+        if bronze is not None:
+            return bronze.tabela(tabela)
+        return spark.read.format("delta").load(f"{caminho_bronze}/{tabela}")
+
+    caminho_controle = caminho_controle or f"{caminho_silver}/_controle_silver"
+    destino = f"{caminho_silver}/pagamento"
+    destino_removidos = f"{caminho_silver}/{PAGAMENTO_REMOVIDO}"
+
+    controle = ler_controle(spark, caminho_controle, CONTROLE_PAGAMENTO)
+    reconstruir = not DeltaTable.isDeltaTable(spark, destino)
+    marca = controle.marca if controle is not None and not reconstruir else None
+
+    log = ler_bronze("log_pagamento")
+    if marca is not None:
+        aplicadas = operacoes_aplicadas(spark.read.format("delta").load(destino))
+        if origem_reiniciada(log, aplicadas, "id_log", marca, controle.linhas):
+            logger.warning("⚠️ pagamento: IDs do log_pagamento recomeçaram, Silver reconstruída a partir da Bronze")
+            reconstruir, marca = True, None
+        else:
+            log = log.filter(F.col("id_log") > F.lit(marca))
+    # Se o log já veio em cache (CacheCamada), quem libera o cache é a camada
+    cache_proprio = not log.is_cached
+    if cache_proprio:
+        log = log.cache()
+
+    if log.isEmpty() and not reconstruir:
+        if cache_proprio:
+            log.unpersist()
+        logger.info("pagamento: nenhuma operação nova no log")
+        return 0
+    alteracoes = ultimas_alteracoes(log)
+
+    # A consulta do pagamento não está no log: buscada só para os pagamentos alterados
+    consultas = ler_bronze("pagamento") \
+        .select("id_pagamento", "consulta_id_consulta") \
+        .join(F.broadcast(alteracoes.select("id_pagamento")), "id_pagamento")
+
+    mudancas = com_particao_mensal(alteracoes, "data_pagamento").join(consultas, "id_pagamento", "left").select(
+        "id_pagamento",
+        "valor_pago",
+        "data_pagamento",
+        "tipo_pagamento_id_tipo_pagamento",
+        "consulta_id_consulta",
+        "tipo_acao",
+        F.col("DataHoraOperacao").alias("atualizado_em"),
+        F.col("id_log").alias("id_log_aplicado"),
+        *COLUNAS_PARTICAO,
+    )
+
+    removidos = mudancas.filter(F.col("tipo_acao") == "DELETE").select(COLUNAS_REMOVIDO)
+    if reconstruir:
+        gravar_particionado(mudancas.filter(F.col("tipo_acao") != "DELETE").drop("tipo_acao"), destino)
+        removidos.write.format("delta").mode("overwrite").save(destino_removidos)
+    else:
+        colunas = [coluna for coluna in mudancas.columns if coluna not in ("tipo_acao", "consulta_id_consulta")]
+        DeltaTable.forPath(spark, destino).alias("s") \
+            .merge(mudancas.alias("m"), "s.id_pagamento = m.id_pagamento") \
+            .whenMatchedDelete(condition="m.tipo_acao = 'DELETE'") \
+            .whenMatchedUpdate(
+                # Uma operação mais antiga que o estado atual nunca sobrescreve o pagamento
+                condition="m.atualizado_em >= s.atualizado_em",
+                set={coluna: f"m.{coluna}" for coluna in colunas}
+            ) \
+            .whenNotMatchedInsert(
+                condition="m.tipo_acao != 'DELETE'",
+                values={coluna: f"m.{coluna}" for coluna in mudancas.columns if coluna != "tipo_acao"}
+            ) \
+            .execute()
+        removidos.write.format("delta").mode("append").save(destino_removidos)
+
+    alterados = alteracoes.count()
+    marca, lidas = log.agg(F.max("id_log"), F.count(F.lit(1))).first()
+    # Linhas do log já aplicadas: comparadas na próxima execução para detectar um log que encolheu
+    if reconstruir:
+        linhas = lidas
+    else:
+        linhas = controle.linhas + lidas if controle.linhas is not None else None
+    if cache_proprio:
+        log.unpersist()
+
+    gravar_controle(spark, caminho_controle, CONTROLE_PAGAMENTO, "id_log", marca, None, linhas)
+    logger.info(f"pagamento: {alterados} pagamentos atualizados a partir do log")
+    return alterados
+
+
+def main():
+    """Execução local: ingere os CSVs de amostra na Bronze, aplica o log e monta a consulta consolidada, em Delta local."""
+    parser = argparse.ArgumentParser(description="Monta a Silver de pagamentos e consultas a partir dos CSVs (Delta local)")
+    parser.add_argument('--landing', default='data/raw/teste', help="Diretório com os CSVs da Landing")
+    parser.add_argument('--lake', default='/tmp/lake', help="Diretório local das camadas bronze/ e silver/")
+    args = parser.parse_args()
+
+    from pipeline.cache import CacheCamada
+    from pipeline.landing_bronze import ingerir_tabela
+    from pipeline.sessao import criar_sessao_local
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    spark = criar_sessao_local("bronze-silver-local")
+    try:
+        bronze, silver = f"{args.lake}/bronze", f"{args.lake}/silver"
+        for tabela in ("agendamento", "consulta", "pagamento", "log_pagamento"):
+            ingerir_tabela(spark, tabela, args.landing, bronze, formato="csv")
+        with CacheCamada(spark, bronze) as tabelas_bronze:
+            aplicar_log_pagamentos(spark, bronze, silver, bronze=tabelas_bronze)
+            pagamento = spark.read.format("delta").load(f"{silver}/pagamento")
+            pagamento.orderBy("id_pagamento").show(truncate=False)
+
+            consultas = consolidar_consultas(
+                tabelas_bronze.tabela("consulta"), tabelas_bronze.tabela("agendamento"), pagamento
+            )
+            gravar_particionado(consultas, f"{silver}/consulta_consolidada")
+        spark.read.format("delta").load(f"{silver}/consulta_consolidada").orderBy("id_consulta").show(truncate=False)
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Leitura de uma camada do lake com cache gerenciado: cada tabela é lida uma única vez por job e as
+leituras de cada tabela são contadas
+"""
+
+import logging
+from collections import Counter
+
+from pyspark import StorageLevel
+
+logger = logging.getLogger(__name__)
+
+
+class CacheCamada:
+    """Leitor das tabelas de uma camada (ex.: Bronze) com um DataFrame por tabela durante o job.
+
+    Tabelas em 'reutilizadas' são persistidas no primeiro acesso (o primeiro uso materializa o cache e os
+    seguintes não voltam aos arquivos); as demais só não são relidas (nem o log do Delta reprocessado).
+    Use como gerenciador de contexto, ou chame fechar(), para liberar o cache ao final.
+    """
+
+    def __init__(self, spark, caminho, reutilizadas=(), formato="delta", nivel=StorageLevel.MEMORY_AND_DISK):
+        self.spark = spark
+        self.caminho = caminho
+        self.reutilizadas = set(reutilizadas)
+        self.formato = formato
+        # MEMORY_AND_DISK: partições que não cabem na memória vão para o disco local, em vez de serem recalculadas
+        self.nivel = nivel
+        self.leituras = Counter()
+        self.acessos = Counter()
+        self._tabelas = {}
+
+    def tabela(self, nome):
+        """Retorna o DataFrame de uma tabela, lendo-a só no primeiro acesso."""
+        if nome not in self._tabelas:
+            df = self.spark.read.format(self.formato).load(f"{self.caminho}/{nome}")
+            if nome in self.reutilizadas:
+                df = df.persist(self.nivel)
+            self._tabelas[nome] = df
+            self.leituras[nome] += 1
+        self.acessos[nome] += 1
+        return self._tabelas[nome]
+
+    def relatorio(self):
+        """Retorna {tabela: {leituras, acessos, em_cache}} das tabelas acessadas."""
+        return {
+            nome: {'leituras': self.leituras[nome], 'acessos': self.acessos[nome], 'em_cache': nome in self.reutilizadas}
+            for nome in self.leituras
+        }
+
+    def fechar(self):
+        """Libera o cache das tabelas persistidas e registra as leituras por tabela."""
+        for nome, df in self._tabelas.items():
+            if nome in self.reutilizadas:
+                df.unpersist()
+            elif self.acessos[nome] > 1:
+                # Cada uso de um DataFrame sem cache volta a varrer os arquivos da tabela
+                logger.warning(f"⚠️ {nome}: {self.acessos[nome]} acessos sem cache (incluir em 'reutilizadas'?)")
+        for nome, contagem in self.relatorio().items():
+            logger.info(f"{nome}: {contagem['leituras']} leitura(s), {contagem['acessos']} acesso(s)"
+                        f"{' (em cache)' if contagem['em_cache'] else ''}")
+        self._tabelas.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
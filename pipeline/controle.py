@@ -0,0 +1,50 @@
+"""
+Tabela de controle da ingestão incremental: guarda, por tabela, a marca d'água (maior valor já
+ingerido da coluna de controle), a data de modificação do último arquivo lido e as linhas já ingeridas
+"""
+
+from datetime import datetime
+
+from delta.tables import DeltaTable
+from pyspark.sql import functions as F
+from pyspark.sql.types import LongType, StringType, StructField, StructType, TimestampType
+
+ESQUEMA_CONTROLE = StructType([
+    StructField("tabela", StringType(), nullable=False),
+    StructField("coluna_marca", StringType(), nullable=True),
+    StructField("marca", LongType(), nullable=True),
+    StructField("arquivo_modificado_em", LongType(), nullable=True),
+    StructField("atualizado_em", TimestampType(), nullable=False),
+    # Linhas da origem até a marca, para detectar uma origem que encolheu (ver origem_reiniciada)
+    StructField("linhas", LongType(), nullable=True),
+])
+
+
+def ler_controle(spark, caminho_controle, tabela):
+    """Retorna o registro de controle de uma tabela (Row) ou None se ela ainda não foi ingerida."""
+    if not DeltaTable.isDeltaTable(spark, caminho_controle):
+        return None
+    controle = spark.read.format("delta").load(caminho_controle)
+    # Tabelas de controle gravadas antes da coluna linhas
+    if "linhas" not in controle.columns:
+        controle = controle.withColumn("linhas", F.lit(None).cast(LongType()))
+    linhas = controle.filter(f"tabela = '{tabela}'").collect()
+    return linhas[0] if linhas else None
+
+
+def gravar_controle(spark, caminho_controle, tabela, coluna_marca, marca, arquivo_modificado_em, linhas=None):
+    """Atualiza (ou cria) o registro de controle de uma tabela."""
+    registro = spark.createDataFrame(
+        [(tabela, coluna_marca, marca, arquivo_modificado_em, datetime.utcnow(), linhas)], ESQUEMA_CONTROLE
+    )
+    if not DeltaTable.isDeltaTable(spark, caminho_controle):
+        registro.write.format("delta").save(caminho_controle)
+        return
+
+    if "linhas" not in spark.read.format("delta").load(caminho_controle).columns:
+        spark.sql(f"ALTER TABLE delta.`{caminho_controle}` ADD COLUMNS (linhas bigint)")
+    DeltaTable.forPath(spark, caminho_controle).alias("c") \
+        .merge(registro.alias("r"), "c.tabela = r.tabela") \
+        .whenMatchedUpdateAll() \
+        .whenNotMatchedInsertAll() \
+        .execute()
@@ -0,0 +1,62 @@
+"""
+Registro de esquemas das tabelas de origem, gerado a partir do scripts/modelo_fisico.sql
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from pyspark.sql.types import (
+    DateType, DecimalType, IntegerType, StringType, StructField, StructType, TimestampType
+)
+
+CAMINHO_MODELO_FISICO = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'modelo_fisico.sql')
+
+
+def tipo_spark(tipo_sql):
+    """Converte um tipo do modelo físico no tipo Spark correspondente."""
+    tipo_sql = tipo_sql.lower()
+    if tipo_sql in ('int', 'serial'):
+        return IntegerType()
+    if tipo_sql == 'date':
+        return DateType()
+    if tipo_sql == 'timestamp':
+        return TimestampType()
+    if tipo_sql.startswith('decimal'):
+        precisao, escala = re.findall(r'\d+', tipo_sql)
+        return DecimalType(int(precisao), int(escala))
+    # varchar, char e text: CEP, telefone e CPF continuam texto (zeros à esquerda, traços)
+    return StringType()
+
+
+@lru_cache(maxsize=None)
+def ler_modelo_fisico(caminho=CAMINHO_MODELO_FISICO):
+    """Lê o modelo_fisico.sql e retorna {tabela: StructType}, com as colunas na ordem declarada."""
+    with open(caminho, 'r', encoding='utf-8') as file:
+        sql = file.read()
+
+    esquemas = {}
+    for tabela, corpo in re.findall(r'CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\n\);', sql, re.S):
+        campos = []
+        for linha in corpo.split('\n'):
+            linha = linha.strip().rstrip(',')
+            if not linha or linha.upper().startswith('PRIMARY KEY'):
+                continue
+            nome, tipo = linha.split()[:2]
+            obrigatorio = 'NOT NULL' in linha.upper() or 'PRIMARY KEY' in linha.upper()
+            campos.append(StructField(nome, tipo_spark(tipo), nullable=not obrigatorio))
+        esquemas[tabela] = StructType(campos)
+    return esquemas
+
+
+def esquema_tabela(tabela):
+    """Retorna o StructType de uma tabela do modelo físico."""
+    esquemas = ler_modelo_fisico()
+    if tabela not in esquemas:
+        raise KeyError(f"Tabela '{tabela}' não encontrada no modelo físico")
+    return esquemas[tabela]
+
+
+def tabelas():
+    """Lista as tabelas do modelo físico."""
+    return list(ler_modelo_fisico())
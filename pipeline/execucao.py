@@ -0,0 +1,188 @@
+"""
+Execução local do pipeline completo (Landing → Bronze → Silver → Gold) com as métricas de cada etapa
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+from datetime import datetime, timezone
+
+from pipeline.bronze_silver import (
+    TABELAS_SIMPLES, aplicar_log_pagamentos, consolidar_consultas, enriquecer_pacientes, gravar_particionado
+)
+from pipeline.cache import CacheCamada
+from pipeline.esquemas import tabelas
+from pipeline.landing_bronze import ingerir_tabela
+from pipeline.metricas import medir_grupo, resumir_etapas
+from pipeline.resumos import atualizar_resumos
+from pipeline.silver_gold import atualizar_fato, construir_dimensoes
+
+logger = logging.getLogger(__name__)
+
+
+def etapa_bronze(spark, caminhos, formato="csv", modo="incremental", fonte="landing", jdbc=None):
+    """Landing → Bronze (notebook_landing_bronze): ingere todas as tabelas. Retorna {tabela: {registros, acao}}.
+
+    fonte 'jdbc' lê as tabelas direto do PostgreSQL (pipeline/jdbc_bronze.py); jdbc: kwargs de
+    ingerir_tabela_jdbc (conexao, num_particoes, fetchsize).
+    """
+    if fonte == "jdbc":
+        from pipeline.jdbc_bronze import conexao_jdbc, ingerir_tabela_jdbc
+
+        jdbc = {'conexao': conexao_jdbc(), **(jdbc or {})}
+        return {tabela: ingerir_tabela_jdbc(spark, tabela, caminho_bronze=caminhos['bronze'], modo=modo, **jdbc)
+                for tabela in tabelas()}
+    return {
+        tabela: ingerir_tabela(spark, tabela, caminhos['landing'], caminhos['bronze'], formato=formato, modo=modo)
+        for tabela in tabelas()
+    }
+
+
+def etapa_silver(spark, caminhos):
+    """Bronze → Silver (notebook_bronze_silver): pacientes, CDC dos pagamentos, consultas e tabelas simples."""
+    bronze, silver = caminhos['bronze'], caminhos['silver']
+    with CacheCamada(spark, bronze) as tabelas_bronze:
+        enriquecer_pacientes(tabelas_bronze.tabela("paciente"), tabelas_bronze.tabela("endereco")) \
+            .write.format("delta").mode("overwrite").save(f"{silver}/paciente_enriquecido")
+        alterados = aplicar_log_pagamentos(spark, bronze, silver, bronze=tabelas_bronze)
+        gravar_particionado(consolidar_consultas(
+            tabelas_bronze.tabela("consulta"), tabelas_bronze.tabela("agendamento"),
+            spark.read.format("delta").load(f"{silver}/pagamento"),
+        ), f"{silver}/consulta_consolidada")
+        for tabela in TABELAS_SIMPLES:
+            tabelas_bronze.tabela(tabela).write.format("delta").mode("overwrite").save(f"{silver}/{tabela}")
+    return {'pagamentos_alterados': alterados, 'leituras_bronze': tabelas_bronze.relatorio()}
+
+
+def etapa_gold(spark, caminhos, data_inicio=None, data_fim=None):
+    """Silver → Gold (notebook_silver_gold): dimensões, fato e tabelas de resumo."""
+    gold = caminhos['gold']
+    with CacheCamada(spark, caminhos['silver'], reutilizadas=["consulta_consolidada"]) as tabelas_silver:
+        dimensoes = construir_dimensoes(spark, tabelas_silver, gold, data_inicio, data_fim)
+        fato = atualizar_fato(spark, tabelas_silver, gold)
+    resumos = atualizar_resumos(spark, gold, fato['meses'])
+    return {'dimensoes': dimensoes, 'fato': fato, 'resumos': resumos}
+
+
+def etapa_manutencao(spark, caminhos):
+    """Manutenção (notebook_manutencao): OPTIMIZE/Z-ORDER e VACUUM das três camadas."""
+    from pipeline.manutencao import manter_camadas
+
+    camadas = {camada: caminhos[camada] for camada in ('bronze', 'silver', 'gold')}
+    return manter_camadas(spark, camadas)
+
+
+# Etapas na ordem de execução: {nome: função(spark, caminhos, **opções)}
+ETAPAS = {
+    'bronze': etapa_bronze,
+    'silver': etapa_silver,
+    'gold': etapa_gold,
+    'manutencao': etapa_manutencao,
+}
+
+
+def executar(spark, caminhos, etapas=None, opcoes=None):
+    """Executa as etapas em ordem, cada uma em um grupo de jobs, e retorna a lista de métricas por etapa.
+
+    opcoes: {etapa: kwargs} repassados à função da etapa (ex.: {'bronze': {'modo': 'completo'}}).
+    """
+    opcoes = opcoes or {}
+    metricas = []
+    for etapa in etapas or ETAPAS:
+        logger.info(f"Etapa {etapa}...")
+        resultado, segundos, estagios = medir_grupo(spark, f"pipeline:{etapa}", ETAPAS[etapa],
+                                                    spark, caminhos, **opcoes.get(etapa, {}))
+        metricas.append({'etapa': etapa, 'segundos': round(segundos, 3), **resumir_etapas(estagios),
+                         'resultado': resultado})
+        logger.info(f"✅ {etapa}: {segundos:.1f}s, {metricas[-1]['linhas_gravadas']} linhas, "
+                    f"{metricas[-1]['bytes_gravados'] / 1024 ** 2:.1f} MB gravados")
+    return metricas
+
+
+def versao_codigo():
+    """Commit atual do repositório (ou None fora de um checkout git), para comparar execuções."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def registrar_execucao(arquivo, execucao):
+    """Acrescenta a execução ao histórico do arquivo JSON (uma lista de execuções)."""
+    historico = []
+    if os.path.exists(arquivo):
+        with open(arquivo, encoding='utf-8') as f:
+            historico = json.load(f)
+    historico.append(execucao)
+    os.makedirs(os.path.dirname(os.path.abspath(arquivo)), exist_ok=True)
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(historico, f, ensure_ascii=False, indent=2, default=str)
+
+
+def main():
+    """Executa o pipeline em uma SparkSession local com Delta e grava as métricas das etapas."""
+    parser = argparse.ArgumentParser(description="Executa o pipeline Landing → Bronze → Silver → Gold localmente (Delta)")
+    parser.add_argument('--landing', default='data/raw', help="Diretório com os arquivos da Landing")
+    parser.add_argument('--formato', default='csv', choices=['csv', 'parquet'], help="Formato dos arquivos da Landing")
+    parser.add_argument('--lake', default='/tmp/lake', help="Diretório local das camadas bronze/, silver/ e gold/")
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), default=['bronze', 'silver', 'gold'],
+                        help="Etapas a executar, em ordem")
+    parser.add_argument('--modo', default='incremental', choices=['incremental', 'completo'],
+                        help="Modo de ingestão da Bronze")
+    parser.add_argument('--fonte', default='landing', choices=['landing', 'jdbc'],
+                        help="Origem da Bronze: arquivos da Landing ou o PostgreSQL via JDBC (variáveis DB_*)")
+    parser.add_argument('--particoes-jdbc', type=int, default=None, help="Consultas JDBC paralelas por tabela")
+    parser.add_argument('--fetchsize', type=int, default=None, help="Linhas por ida e volta do cursor JDBC")
+    parser.add_argument('--nucleos', default='*', help="Núcleos da SparkSession local (local[N])")
+    parser.add_argument('--metricas', default=None,
+                        help="Arquivo JSON com o histórico de métricas (padrão: <lake>/_metricas/execucoes.json)")
+    args = parser.parse_args()
+
+    from pipeline.sessao import criar_sessao_local
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    caminhos = {'landing': args.landing, 'bronze': f"{args.lake}/bronze", 'silver': f"{args.lake}/silver",
+                'gold': f"{args.lake}/gold"}
+    arquivo_metricas = args.metricas or os.path.join(args.lake, "_metricas", "execucoes.json")
+
+    opcoes_bronze = {'formato': args.formato, 'modo': args.modo, 'fonte': args.fonte}
+    pacotes = None
+    if args.fonte == 'jdbc':
+        from pipeline.jdbc_bronze import PACOTE_JDBC_POSTGRES
+
+        pacotes = [PACOTE_JDBC_POSTGRES]
+        jdbc = {'num_particoes': args.particoes_jdbc, 'fetchsize': args.fetchsize}
+        opcoes_bronze['jdbc'] = {opcao: valor for opcao, valor in jdbc.items() if valor is not None}
+        caminhos['landing'] = None
+
+    inicio = datetime.now(timezone.utc)
+    spark = criar_sessao_local("pipeline-local", nucleos=args.nucleos, pacotes=pacotes)
+    try:
+        metricas = executar(spark, caminhos, args.etapas, {'bronze': opcoes_bronze})
+        execucao = {
+            'inicio': inicio.isoformat(),
+            'commit': versao_codigo(),
+            'spark': spark.version,
+            'paralelismo': spark.sparkContext.defaultParallelism,
+            'caminhos': caminhos,
+            'etapas': metricas,
+        }
+    finally:
+        spark.stop()
+    registrar_execucao(arquivo_metricas, execucao)
+
+    print("\n" + "="*78)
+    print(f"{'etapa':<14}{'tempo (s)':>11}{'etapas':>8}{'tarefas':>9}{'linhas':>12}{'gravado (MB)':>14}{'shuffle (MB)':>14}")
+    print("-"*78)
+    for m in metricas:
+        print(f"{m['etapa']:<14}{m['segundos']:>11.2f}{m['etapas']:>8}{m['tarefas']:>9}{m['linhas_gravadas']:>12}"
+              f"{m['bytes_gravados'] / 1024 ** 2:>14.2f}{m['shuffle_bytes'] / 1024 ** 2:>14.2f}")
+    print("="*78)
+    print(f"Métricas registradas em {arquivo_metricas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Ingestão direta PostgreSQL → Bronze via Spark JDBC, alternativa à Landing: leitura paralela de cada tabela
+pela chave primária, sem a exportação para CSV e o upload
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from delta.tables import DeltaTable
+from pyspark.sql import functions as F
+
+from pipeline.controle import gravar_controle, ler_controle
+from pipeline.esquemas import esquema_tabela, tabelas
+from pipeline.landing_bronze import (CHAVES_CADASTROS, COLUNAS_MARCA, adicionar_metadados, gravar_bronze,
+                                     linhas_ingeridas, origem_reiniciada)
+
+logger = logging.getLogger(__name__)
+
+# Driver JDBC do PostgreSQL, baixado do Maven pela SparkSession local (spark.jars.packages)
+PACOTE_JDBC_POSTGRES = "org.postgresql:postgresql:42.7.4"
+
+# Consultas paralelas por tabela e linhas trazidas do banco a cada ida e volta do cursor
+NUM_PARTICOES = 8
+FETCHSIZE = 10000
+# Faixa mínima de IDs por consulta: tabelas pequenas não são divididas em várias consultas minúsculas
+IDS_POR_PARTICAO_MIN = 50000
+
+
+def conexao_jdbc(host=None, porta=None, banco=None, usuario=None, senha=None):
+    """Opções de conexão do leitor JDBC; o padrão vem das variáveis DB_* (as mesmas do gerador de dados)."""
+    host = host or os.getenv('DB_HOST', 'localhost')
+    porta = porta or os.getenv('DB_PORT', '5432')
+    banco = banco or os.getenv('DB_NAME', 'clinica_odonto')
+    return {
+        'url': f"jdbc:postgresql://{host}:{porta}/{banco}",
+        'user': usuario or os.getenv('DB_USER', 'root'),
+        'password': senha or os.getenv('DB_PASSWORD', 'root'),
+        'driver': "org.postgresql.Driver",
+    }
+
+
+def coluna_particao(tabela):
+    """Chave primária inteira da tabela, usada para dividir a leitura (e como marca d'água nas transacionais)."""
+    return COLUNAS_MARCA.get(tabela) or CHAVES_CADASTROS[tabela]
+
+
+def limites_particao(spark, conexao, tabela, coluna, marca=None):
+    """(mínimo, máximo) da coluna no banco, acima da marca quando informada: (None, None) se não há linhas.
+
+    min/max da chave primária são lidos do índice, sem varrer a tabela.
+    """
+    filtro = f" WHERE {coluna} > {marca}" if marca is not None else ""
+    minimo, maximo = spark.read.format("jdbc").options(**conexao) \
+        .option("query", f"SELECT min({coluna}) AS minimo, max({coluna}) AS maximo FROM {tabela}{filtro}") \
+        .load().first()
+    return minimo, maximo
+
+
+def tabela_reiniciada(spark, conexao, tabela, coluna, marca, bronze, linhas_anteriores):
+    """True se os IDs da tabela no banco recomeçaram desde a marca (origem_reiniciada, calculada no banco).
+
+    A contagem vem de um count(*) no banco, e só a linha da marca é trazida para a comparação.
+    """
+    linhas = spark.read.format("jdbc").options(**conexao) \
+        .option("query", f"SELECT count(*) AS linhas FROM {tabela}") \
+        .load().first()[0]
+    linha_marca = spark.read.format("jdbc").options(**conexao) \
+        .option("dbtable", f"(SELECT * FROM {tabela} WHERE {coluna} = {marca}) AS {tabela}") \
+        .load()
+    esquema = esquema_tabela(tabela)
+    linha_marca = linha_marca.select([F.col(campo.name).cast(campo.dataType).alias(campo.name) for campo in esquema])
+    return origem_reiniciada(linha_marca, bronze, coluna, marca, linhas_anteriores, linhas)
+
+
+def ler_tabela_jdbc(spark, conexao, tabela, marca=None, num_particoes=NUM_PARTICOES, fetchsize=FETCHSIZE):
+    """Lê uma tabela do PostgreSQL (só as linhas acima da marca, quando informada) com o esquema do modelo físico.
+
+    A faixa [mínimo, máximo] da chave é dividida em até num_particoes consultas, uma por tarefa do Spark.
+    """
+    coluna = coluna_particao(tabela)
+    minimo, maximo = limites_particao(spark, conexao, tabela, coluna, marca)
+    esquema = esquema_tabela(tabela)
+    if minimo is None:
+        return spark.createDataFrame([], esquema)
+
+    origem = f"(SELECT * FROM {tabela} WHERE {coluna} > {marca}) AS {tabela}" if marca is not None else tabela
+    particoes = max(1, min(num_particoes, (maximo - minimo) // IDS_POR_PARTICAO_MIN + 1))
+    leitor = spark.read.format("jdbc").options(**conexao) \
+        .option("dbtable", origem) \
+        .option("fetchsize", fetchsize)
+    if particoes > 1:
+        # Os limites só definem o passo entre as consultas: a primeira e a última partição ficam abertas
+        leitor = leitor.option("partitionColumn", coluna) \
+            .option("lowerBound", minimo) \
+            .option("upperBound", maximo + 1) \
+            .option("numPartitions", particoes)
+    logger.debug(f"{tabela}: {particoes} consultas em {coluna} de {minimo} a {maximo}")
+
+    # O PostgreSQL devolve os nomes sem aspas em minúsculas (DataHoraOperacao → datahoraoperacao)
+    return leitor.load().select([F.col(campo.name).cast(campo.dataType).alias(campo.name) for campo in esquema])
+
+
+def ingerir_tabela_jdbc(spark, tabela, conexao, caminho_bronze, modo="incremental", num_particoes=NUM_PARTICOES,
+                        fetchsize=FETCHSIZE, caminho_controle=None):
+    """Ingere uma tabela do PostgreSQL na Bronze e retorna um resumo {tabela, acao, registros}.
+
+    Mesmas regras de ingerir_tabela: modo 'completo' sobrescreve; 'incremental' lê do banco só as linhas
+    acima da marca d'água nas tabelas transacionais (ou a tabela inteira, se os IDs recomeçaram) e mescla os
+    cadastros pela chave primária. A tabela de controle é a mesma da ingestão pela Landing, então as duas
+    fontes podem se alternar.
+    """
+    caminho_controle = caminho_controle or f"{caminho_bronze}/_controle_ingestao"
+    destino = f"{caminho_bronze}/{tabela}"
+    coluna_marca = COLUNAS_MARCA.get(tabela)
+
+    controle = ler_controle(spark, caminho_controle, tabela)
+    if modo != "incremental" or controle is None or not DeltaTable.isDeltaTable(spark, destino):
+        modo = "completo"
+    marca = controle.marca if controle is not None else None
+
+    if modo == "incremental" and coluna_marca and marca is not None:
+        bronze = spark.read.format("delta").load(destino)
+        if tabela_reiniciada(spark, conexao, tabela, coluna_marca, marca, bronze, controle.linhas):
+            logger.warning(f"⚠️ {tabela}: IDs do banco recomeçaram desde a última ingestão, recarga completa")
+            modo = "completo"
+
+    if modo == "completo":
+        acao, filtro = 'sobrescrita', None
+    elif coluna_marca:
+        acao, filtro = 'acrescentada', marca
+    else:
+        acao, filtro = 'mesclada', None
+
+    df = ler_tabela_jdbc(spark, conexao, tabela, filtro, num_particoes, fetchsize)
+    registros, marca = gravar_bronze(spark, tabela, adicionar_metadados(df, f"jdbc:{tabela}"), destino, acao, marca)
+
+    gravar_controle(spark, caminho_controle, tabela, coluna_marca, marca, None,
+                    linhas_ingeridas(acao, registros, controle))
+    logger.info(f"{tabela}: {registros} registros ({acao}) via JDBC")
+    return {'tabela': tabela, 'acao': acao, 'registros': registros}
+
+
+def main():
+    """Execução local: ingere as tabelas do PostgreSQL do docker-compose em um lake Delta local."""
+    parser = argparse.ArgumentParser(description="Ingestão PostgreSQL → Bronze (Delta) via Spark JDBC")
+    parser.add_argument('--lake', default='/tmp/lake', help="Diretório local do lake (a Bronze fica em <lake>/bronze)")
+    parser.add_argument('--tabelas', nargs='+', choices=tabelas(), default=tabelas(), help="Tabelas a ingerir")
+    parser.add_argument('--modo', default='incremental', choices=['incremental', 'completo'], help="Modo de ingestão")
+    parser.add_argument('--particoes', type=int, default=NUM_PARTICOES, help="Consultas paralelas por tabela")
+    parser.add_argument('--fetchsize', type=int, default=FETCHSIZE, help="Linhas por ida e volta do cursor JDBC")
+    parser.add_argument('--nucleos', default='*', help="Núcleos da SparkSession local (local[N])")
+    args = parser.parse_args()
+
+    from pipeline.sessao import criar_sessao_local
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    conexao = conexao_jdbc()
+    spark = criar_sessao_local("jdbc-bronze-local", nucleos=args.nucleos, pacotes=[PACOTE_JDBC_POSTGRES])
+    resultados = []
+    try:
+        for tabela in args.tabelas:
+            inicio = time.perf_counter()
+            resultado = ingerir_tabela_jdbc(spark, tabela, conexao, f"{args.lake}/bronze", args.modo,
+                                            args.particoes, args.fetchsize)
+            resultados.append({**resultado, 'segundos': time.perf_counter() - inicio})
+    finally:
+        spark.stop()
+
+    print("\n" + "="*64)
+    print(f"{'tabela':<24}{'ação':<14}{'registros':>12}{'tempo (s)':>14}")
+    print("-"*64)
+    for r in resultados:
+        print(f"{r['tabela']:<24}{r['acao']:<14}{r['registros']:>12}{r['segundos']:>14.2f}")
+    print("="*64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Ingestão Landing → Bronze, completa (overwrite) ou incremental por marca d'água
+"""
+
+import logging
+
+from delta.tables import DeltaTable
+from pyspark.sql import functions as F
+from pyspark.sql.types import TimestampType
+
+from pipeline.controle import gravar_controle, ler_controle
+from pipeline.esquemas import esquema_tabela
+
+logger = logging.getLogger(__name__)
+
+# Tabelas transacionais: coluna crescente usada como marca d'água, e só as linhas acima dela são acrescentadas.
+# Os IDs são atribuídos em ordem pelo gerador; uma coluna timestamp (ex.: DataHoraOperacao) também serve.
+# pagamento também sofre UPDATE e DELETE: a Bronze guarda os pagamentos novos, e o estado atual de cada um
+# vem do log_pagamento, aplicado na Silver
+COLUNAS_MARCA = {
+    'agendamento': 'id_agendamento',
+    'consulta': 'id_consulta',
+    'pagamento': 'id_pagamento',
+    'consulta_procedimento': 'id_consulta_procedimento',
+    'log_pagamento': 'id_log',
+}
+
+# Cadastros (podem ter registros alterados): mesclados pela chave primária
+CHAVES_CADASTROS = {
+    'endereco': 'id_endereco',
+    'odontologista': 'id_odontologista',
+    'paciente': 'id_paciente',
+    'procedimento': 'id_procedimento',
+    'tipo_pagamento': 'id_tipo_pagamento',
+}
+
+
+def ler_landing(spark, caminho_landing, tabela, formato="parquet"):
+    """Lê o arquivo de uma tabela na Landing Zone com o esquema do modelo físico."""
+    leitor = spark.read.schema(esquema_tabela(tabela))
+    if formato == "parquet":
+        return leitor.parquet(f"{caminho_landing}/{tabela}.parquet")
+    return leitor.format("csv").option("header", "true").load(f"{caminho_landing}/{tabela}.csv")
+
+
+def data_modificacao(spark, caminho):
+    """Retorna a data de modificação de um arquivo (ms desde a época), via Hadoop FileSystem (funciona com abfss://)."""
+    jvm = spark.sparkContext._jvm
+    caminho_hadoop = jvm.org.apache.hadoop.fs.Path(caminho)
+    sistema = caminho_hadoop.getFileSystem(spark.sparkContext._jsc.hadoopConfiguration())
+    return sistema.getFileStatus(caminho_hadoop).getModificationTime()
+
+
+def expressao_marca(df, coluna):
+    """Valor numérico da coluna de marca d'água: o próprio ID ou, para timestamps, microssegundos desde a época."""
+    if isinstance(df.schema[coluna].dataType, TimestampType):
+        return F.unix_micros(F.col(coluna))
+    return F.col(coluna).cast("long")
+
+
+def valor_marca(df, coluna, marca):
+    """Marca como literal do tipo da coluna (timestamp a partir dos microssegundos), para comparar a coluna pura."""
+    if isinstance(df.schema[coluna].dataType, TimestampType):
+        return F.timestamp_micros(F.lit(marca))
+    return F.lit(marca)
+
+
+def filtro_acima_da_marca(df, coluna, marca):
+    """Condição 'coluna > marca' comparando a coluna sem transformá-la, para o filtro ser empurrado à leitura."""
+    return F.col(coluna) > valor_marca(df, coluna, marca)
+
+
+def filtro_na_marca(df, coluna, marca):
+    """Condição 'coluna = marca', também empurrada à leitura (só os row groups/arquivos da marca são lidos)."""
+    return F.col(coluna) == valor_marca(df, coluna, marca)
+
+
+# Colunas acrescentadas pela ingestão, fora da comparação dos cadastros no merge
+COLUNAS_METADADOS = ("data_ingestao_bronze", "fonte_dados")
+
+
+def adicionar_metadados(df, fonte):
+    """Adiciona os metadados de ingestão da camada Bronze."""
+    return df.withColumn("data_ingestao_bronze", F.current_timestamp()) \
+             .withColumn("fonte_dados", F.lit(fonte))
+
+
+def origem_reiniciada(origem, anterior, coluna, marca, linhas_anteriores=None, linhas=None):
+    """True se os IDs da origem recomeçaram desde a marca (ex.: TRUNCATE ... RESTART IDENTITY do gerador).
+
+    anterior são as linhas já ingeridas e linhas_anteriores, quantas eram (da tabela de controle). A origem
+    foi reiniciada se tem menos linhas que antes ou se a linha da marca sumiu ou mudou. Nesses casos,
+    acrescentar só o que está acima da marca perderia as linhas novas com IDs baixos. Só a linha da marca é
+    lida dos dois lados; linhas é a contagem da origem, quando já calculada (ex.: no banco).
+    """
+    if linhas_anteriores is not None:
+        linhas = origem.count() if linhas is None else linhas
+        if linhas < linhas_anteriores:
+            return True
+
+    colunas = [c for c in anterior.columns if c in origem.columns and c not in COLUNAS_METADADOS]
+    linha_anterior = anterior.filter(filtro_na_marca(anterior, coluna, marca)).select(colunas)
+    linha_origem = origem.filter(filtro_na_marca(origem, coluna, marca)).select(colunas)
+    return not linha_anterior.exceptAll(linha_origem).isEmpty()
+
+
+def gravar_bronze(spark, tabela, novos, destino, acao, marca=None):
+    """Grava as linhas (já com os metadados) na tabela Bronze e retorna (registros, marca d'água atualizada).
+
+    acao 'sobrescrita' sobrescreve a tabela, 'acrescentada' acrescenta as linhas e 'mesclada' mescla os
+    cadastros pela chave primária.
+    """
+    novos = novos.cache()
+    registros = novos.count()
+
+    if acao == 'sobrescrita':
+        novos.write.format("delta").mode("overwrite").option("overwriteSchema", "true").save(destino)
+    elif acao == 'acrescentada':
+        novos.write.format("delta").mode("append").save(destino)
+    else:
+        chave = CHAVES_CADASTROS[tabela]
+        # Só atualiza registros que mudaram: os arquivos com cadastros inalterados não são reescritos
+        colunas = [coluna for coluna in novos.columns if coluna not in COLUNAS_METADADOS]
+        alterado = " OR ".join(f"NOT (b.{coluna} <=> n.{coluna})" for coluna in colunas)
+        DeltaTable.forPath(spark, destino).alias("b") \
+            .merge(novos.alias("n"), f"b.{chave} = n.{chave}") \
+            .whenMatchedUpdateAll(condition=alterado) \
+            .whenNotMatchedInsertAll() \
+            .execute()
+
+    coluna_marca = COLUNAS_MARCA.get(tabela)
+    if acao == 'sobrescrita':
+        marca = None
+    if coluna_marca and registros:
+        marca = novos.select(F.max(expressao_marca(novos, coluna_marca))).first()[0]
+    novos.unpersist()
+    return registros, marca
+
+
+def linhas_ingeridas(acao, registros, controle):
+    """Linhas da tabela Bronze depois da gravação, para a tabela de controle (None se desconhecidas)."""
+    if acao == 'sobrescrita':
+        return registros
+    if acao == 'acrescentada' and controle is not None and controle.linhas is not None:
+        return controle.linhas + registros
+    return None
+
+
+def ingerir_tabela(spark, tabela, caminho_landing, caminho_bronze, formato="parquet", modo="incremental",
+                   caminho_controle=None):
+    """Ingere uma tabela da Landing na Bronze e retorna um resumo {tabela, acao, registros}.
+
+    modo 'completo' sobrescreve a tabela Bronze. modo 'incremental' pula arquivos não modificados desde a
+    última execução, acrescenta só as linhas acima da marca d'água nas tabelas transacionais e mescla os
+    cadastros pela chave primária. A primeira execução incremental de uma tabela é sempre completa, assim
+    como a execução seguinte a um reinício dos IDs da origem (ver origem_reiniciada).
+    """
+    caminho_controle = caminho_controle or f"{caminho_bronze}/_controle_ingestao"
+    arquivo = f"{caminho_landing}/{tabela}.{formato}"
+    destino = f"{caminho_bronze}/{tabela}"
+    modificado_em = data_modificacao(spark, arquivo)
+    coluna_marca = COLUNAS_MARCA.get(tabela)
+
+    controle = ler_controle(spark, caminho_controle, tabela)
+    existe_bronze = DeltaTable.isDeltaTable(spark, destino)
+    if modo == "incremental" and existe_bronze and controle is not None:
+        if controle.arquivo_modificado_em == modificado_em:
+            logger.info(f"{tabela}: arquivo da Landing não mudou desde a última ingestão")
+            return {'tabela': tabela, 'acao': 'ignorada', 'registros': 0}
+    else:
+        modo = "completo"
+
+    df = ler_landing(spark, caminho_landing, tabela, formato)
+    marca = controle.marca if controle is not None else None
+
+    if modo == "incremental" and coluna_marca and marca is not None:
+        bronze = spark.read.format("delta").load(destino)
+        if origem_reiniciada(df, bronze, coluna_marca, marca, controle.linhas):
+            logger.warning(f"⚠️ {tabela}: IDs da Landing recomeçaram desde a última ingestão, recarga completa")
+            modo = "completo"
+
+    if modo == "completo":
+        acao = 'sobrescrita'
+        novos = df
+    elif coluna_marca:
+        # O filtro é empurrado para a leitura: no Parquet, row groups abaixo da marca nem são lidos
+        acao = 'acrescentada'
+        novos = df.filter(filtro_acima_da_marca(df, coluna_marca, marca)) if marca is not None else df
+    else:
+        acao = 'mesclada'
+        novos = df
+
+    registros, marca = gravar_bronze(spark, tabela, adicionar_metadados(novos, f"{tabela}.{formato}"),
+                                     destino, acao, marca)
+
+    gravar_controle(spark, caminho_controle, tabela, coluna_marca, marca, modificado_em,
+                    linhas_ingeridas(acao, registros, controle))
+    logger.info(f"{tabela}: {registros} registros ({acao})")
+    return {'tabela': tabela, 'acao': acao, 'registros': registros}
@@ -0,0 +1,127 @@
+"""
+Manutenção das tabelas Delta das camadas Bronze, Silver e Gold: OPTIMIZE (com Z-ORDER na fato) e VACUUM
+"""
+
+import argparse
+import logging
+
+from delta.tables import DeltaTable
+
+from pipeline.bronze_silver import TABELAS_SILVER
+from pipeline.esquemas import tabelas
+from pipeline.resumos import RESUMOS
+from pipeline.silver_gold import DIMENSOES
+
+logger = logging.getLogger(__name__)
+
+# Tabelas gravadas por cada notebook, incluindo as tabelas de controle (marcas d'água), que recebem
+# um MERGE por execução e também acumulam arquivos pequenos
+TABELAS_POR_CAMADA = {
+    'bronze': [*tabelas(), '_controle_ingestao'],
+    'silver': [*TABELAS_SILVER, '_controle_silver'],
+    'gold': [*DIMENSOES, 'dim_tempo', 'fato_consulta_pagamento', *RESUMOS, '_controle_gold'],
+}
+
+# Colunas do Z-ORDER por tabela: os filtros do Power BI na fato são por período e por odontologista
+ZORDER = {
+    'fato_consulta_pagamento': ["id_tempo", "id_odontologista"],
+}
+
+# Retenção padrão do VACUUM (7 dias, o mínimo aceito pelo Delta sem desativar a verificação de retenção):
+# versões mais antigas que isso deixam de estar disponíveis para time travel
+RETENCAO_HORAS = 168
+
+
+def medir_arquivos(spark, caminho):
+    """Retorna {arquivos, bytes} da versão atual da tabela e {arquivos_armazenados, bytes_armazenados} no storage.
+
+    A versão atual vem do DESCRIBE DETAIL; o storage inclui os arquivos de versões antigas ainda não
+    removidos pelo VACUUM (e o _delta_log).
+    """
+    detalhe = DeltaTable.forPath(spark, caminho).detail().select("numFiles", "sizeInBytes").first()
+    jvm = spark.sparkContext._jvm
+    pasta = jvm.org.apache.hadoop.fs.Path(caminho)
+    resumo = pasta.getFileSystem(spark.sparkContext._jsc.hadoopConfiguration()).getContentSummary(pasta)
+    return {
+        'arquivos': detalhe.numFiles,
+        'bytes': detalhe.sizeInBytes,
+        'arquivos_armazenados': resumo.getFileCount(),
+        'bytes_armazenados': resumo.getLength(),
+    }
+
+
+def manter_tabela(spark, caminho, zorder=None, retencao_horas=RETENCAO_HORAS):
+    """Compacta (ou ordena por Z-ORDER) e limpa uma tabela Delta. Retorna {antes, depois, operacao}."""
+    antes = medir_arquivos(spark, caminho)
+    tabela = DeltaTable.forPath(spark, caminho)
+    # Em tabelas particionadas, o OPTIMIZE compacta cada partição separadamente
+    if zorder:
+        tabela.optimize().executeZOrderBy(*zorder)
+        operacao = f"zorder({', '.join(zorder)})"
+    else:
+        tabela.optimize().executeCompaction()
+        operacao = "compactacao"
+    tabela.vacuum(retencao_horas)
+    return {'antes': antes, 'depois': medir_arquivos(spark, caminho), 'operacao': operacao}
+
+
+def manter_camadas(spark, caminhos, retencao_horas=RETENCAO_HORAS, camadas=None):
+    """Mantém as tabelas de cada camada ({camada: caminho}) e retorna uma lista de resultados por tabela.
+
+    Tabelas que ainda não existem (ex.: resumos antes da primeira carga da Gold) são ignoradas.
+    """
+    resultados = []
+    for camada in camadas or caminhos:
+        for nome in TABELAS_POR_CAMADA[camada]:
+            caminho = f"{caminhos[camada]}/{nome}"
+            if not DeltaTable.isDeltaTable(spark, caminho):
+                logger.warning(f"⚠️ {camada}/{nome}: não é uma tabela Delta, ignorada")
+                continue
+            resultado = manter_tabela(spark, caminho, ZORDER.get(nome), retencao_horas)
+            antes, depois = resultado['antes'], resultado['depois']
+            logger.info(f"✅ {camada}/{nome} ({resultado['operacao']}): "
+                        f"{antes['arquivos']} → {depois['arquivos']} arquivos, "
+                        f"{antes['arquivos_armazenados']} → {depois['arquivos_armazenados']} no storage")
+            resultados.append({'camada': camada, 'tabela': nome, **resultado})
+    return resultados
+
+
+def main():
+    """Execução local: mantém as tabelas de um lake Delta local e imprime os arquivos antes e depois."""
+    parser = argparse.ArgumentParser(description="OPTIMIZE/Z-ORDER e VACUUM das tabelas Delta (lake local)")
+    parser.add_argument('--lake', default='/tmp/lake', help="Diretório local das camadas bronze/, silver/ e gold/")
+    parser.add_argument('--camadas', nargs='+', choices=list(TABELAS_POR_CAMADA), default=list(TABELAS_POR_CAMADA),
+                        help="Camadas a manter")
+    parser.add_argument('--retencao-horas', type=int, default=RETENCAO_HORAS,
+                        help="Retenção do VACUUM; abaixo de 168 h desativa a verificação de retenção do Delta")
+    args = parser.parse_args()
+
+    from pipeline.sessao import criar_sessao_local
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    spark = criar_sessao_local("manutencao-local")
+    if args.retencao_horas < RETENCAO_HORAS:
+        # Só para testes locais: com outro job gravando, o VACUUM pode apagar arquivos ainda em uso
+        logger.warning(f"⚠️ Retenção de {args.retencao_horas} h: verificação de retenção do Delta desativada")
+        spark.conf.set("spark.databricks.delta.retentionDurationCheck.enabled", "false")
+    try:
+        resultados = manter_camadas(
+            spark, {camada: f"{args.lake}/{camada}" for camada in args.camadas}, args.retencao_horas
+        )
+    finally:
+        spark.stop()
+
+    print("\n" + "="*92)
+    print(f"{'tabela':<40}{'arquivos':>16}{'MB':>18}{'no storage':>18}")
+    print("-"*92)
+    for r in resultados:
+        antes, depois = r['antes'], r['depois']
+        print(f"{r['camada'] + '/' + r['tabela']:<40}"
+              f"{antes['arquivos']:>7} → {depois['arquivos']:<6}"
+              f"{antes['bytes'] / 1024 ** 2:>8.2f} → {depois['bytes'] / 1024 ** 2:<7.2f}"
+              f"{antes['arquivos_armazenados']:>8} → {depois['arquivos_armazenados']:<7}")
+    print("="*92)
+
+
+if __name__ == "__main__":
+    main()
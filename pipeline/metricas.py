@@ -0,0 +1,66 @@
+"""
+Métricas de execução do Spark lidas na API REST da Spark UI (tempo, tarefas, bytes e linhas por etapa)
+"""
+
+import json
+import time
+import urllib.request
+from datetime import datetime
+
+
+def api_ui(spark, recurso):
+    """Consulta um recurso da API REST da Spark UI para a aplicação atual."""
+    sc = spark.sparkContext
+    with urllib.request.urlopen(f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}/{recurso}") as resposta:
+        return json.load(resposta)
+
+
+def instante(texto):
+    """Converte os horários da API da Spark UI (ex.: 2024-07-24T09:00:00.123GMT) em datetime."""
+    return datetime.strptime(texto.replace("GMT", ""), "%Y-%m-%dT%H:%M:%S.%f")
+
+
+def duracao_etapa(etapa):
+    """Segundos entre a submissão e a conclusão de uma etapa."""
+    return (instante(etapa["completionTime"]) - instante(etapa["submissionTime"])).total_seconds()
+
+
+def etapas_do_grupo(spark, grupo):
+    """Etapas concluídas dos jobs de um grupo, esperando o ouvinte da UI registrar todas."""
+    for _ in range(30):
+        jobs = [job for job in api_ui(spark, "jobs") if job.get("jobGroup") == grupo]
+        ids = {etapa for job in jobs for etapa in job["stageIds"]}
+        etapas = [e for e in api_ui(spark, "stages?status=complete") if e["stageId"] in ids]
+        if jobs and all(job["status"] != "RUNNING" for job in jobs) and \
+                len({e["stageId"] for e in etapas}) + sum(job["numSkippedStages"] for job in jobs) >= len(ids):
+            return sorted(etapas, key=lambda e: e["stageId"])
+        time.sleep(0.5)
+    if not jobs:
+        # O grupo não disparou nenhum job Spark (ex.: só leu metadados)
+        return []
+    raise RuntimeError(f"Métricas das etapas do grupo '{grupo}' não ficaram disponíveis na Spark UI")
+
+
+def resumir_etapas(etapas):
+    """Totais de um conjunto de etapas: {etapas, tarefas, segundos_etapas, bytes_lidos, bytes_gravados, ...}."""
+    return {
+        'etapas': len(etapas),
+        'tarefas': sum(e["numTasks"] for e in etapas),
+        'segundos_etapas': round(sum(duracao_etapa(e) for e in etapas), 3),
+        'bytes_lidos': sum(e["inputBytes"] for e in etapas),
+        'bytes_gravados': sum(e["outputBytes"] for e in etapas),
+        'linhas_gravadas': sum(e["outputRecords"] for e in etapas),
+        'shuffle_bytes': sum(e["shuffleWriteBytes"] for e in etapas),
+    }
+
+
+def medir_grupo(spark, grupo, funcao, *args, **kwargs):
+    """Executa funcao em um grupo de jobs próprio e retorna (resultado, segundos, etapas concluídas do grupo)."""
+    spark.sparkContext.setJobGroup(grupo, grupo)
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(*args, **kwargs)
+    finally:
+        segundos = time.perf_counter() - inicio
+        spark.sparkContext.setLocalProperty("spark.jobGroup.id", None)
+    return resultado, segundos, etapas_do_grupo(spark, grupo)
@@ -0,0 +1,105 @@
+"""
+Tabelas de resumo da Gold para o Power BI: receita mensal por odontologista, procedimento e tipo de
+pagamento e coortes de pacientes, recalculadas só nos meses alterados pela carga da fato
+"""
+
+import logging
+
+from delta.tables import DeltaTable
+from pyspark.sql import functions as F
+
+from pipeline.silver_gold import ano_mes
+
+logger = logging.getLogger(__name__)
+
+
+def resumo_odontologista(fato, gold):
+    """Receita, consultas e procedimentos por mês e odontologista (com a especialidade)."""
+    return fato.groupBy("ano_mes", "id_odontologista").agg(
+        F.sum("valor_pago").alias("receita"),
+        F.countDistinct("id_consulta").alias("consultas"),
+        F.sum("quantidade_procedimentos").alias("procedimentos"),
+    ).join(F.broadcast(gold['dim_odontologista'].select("id_odontologista", "nome_odontologista", "especialidade")),
+           "id_odontologista", "left")
+
+
+def resumo_procedimento(fato, gold):
+    """Receita, quantidade de procedimentos e de consultas por mês e procedimento."""
+    return fato.groupBy("ano_mes", "id_procedimento").agg(
+        F.sum("valor_pago").alias("receita"),
+        F.sum("quantidade_procedimentos").alias("quantidade"),
+        F.countDistinct("id_consulta").alias("consultas"),
+    ).join(F.broadcast(gold['dim_procedimento'].select("id_procedimento", "nome_procedimento")),
+           "id_procedimento", "left")
+
+
+def resumo_tipo_pagamento(fato, gold):
+    """Receita e número de pagamentos por mês e tipo de pagamento."""
+    return fato.groupBy("ano_mes", "id_tipo_pagamento").agg(
+        F.sum("valor_pago").alias("receita"),
+        F.countDistinct("id_consulta").alias("pagamentos"),
+    ).join(F.broadcast(gold['dim_tipo_pagamento'].select("id_tipo_pagamento", "descricao_tipo_pagamento")),
+           "id_tipo_pagamento", "left")
+
+
+def coorte_pacientes(fato, gold):
+    """Pacientes atendidos por mês, agrupados pela coorte (mês da primeira consulta paga do paciente)."""
+    ativos = fato.select("id_paciente", "ano_mes").distinct()
+    coortes = ativos.groupBy("id_paciente").agg(F.min("ano_mes").alias("coorte_ano_mes"))
+    return ativos.join(coortes, "id_paciente").groupBy("coorte_ano_mes", "ano_mes").agg(
+        F.count("*").alias("pacientes")
+    )
+
+
+# Tabelas de resumo: {tabela: função que monta o resumo a partir das linhas da fato a recalcular e das
+# tabelas Gold (dimensões e a fato inteira), todas com ano_mes na fato}
+RESUMOS = {
+    'resumo_mensal_odontologista': resumo_odontologista,
+    'resumo_mensal_procedimento': resumo_procedimento,
+    'resumo_mensal_tipo_pagamento': resumo_tipo_pagamento,
+    'coorte_pacientes': coorte_pacientes,
+}
+
+# Resumos sempre montados inteiros: uma consulta antiga muda a coorte do paciente em todos os meses em que
+# ele foi atendido, não só nos meses alterados (a coorte é pequena, um distinct de paciente × mês)
+RESUMOS_COMPLETOS = {'coorte_pacientes'}
+
+
+def atualizar_resumos(spark, caminho_gold, meses=None):
+    """Atualiza as tabelas de resumo e retorna {tabela: linhas gravadas}.
+
+    meses (lista aaaamm, como retornada por atualizar_fato) limita o recálculo aos meses alterados: só
+    essas linhas da fato são lidas e só esses meses são substituídos em cada resumo (replaceWhere).
+    Sem meses, ou na primeira execução, os resumos são montados inteiros, assim como os de RESUMOS_COMPLETOS.
+    """
+    if meses is not None and not meses:
+        logger.info("Resumos: nenhum mês alterado")
+        return {tabela: 0 for tabela in RESUMOS}
+
+    gold = {
+        tabela: spark.read.format("delta").load(f"{caminho_gold}/{tabela}")
+        for tabela in ('dim_odontologista', 'dim_procedimento', 'dim_tipo_pagamento')
+    }
+    gold['fato_consulta_pagamento'] = spark.read.format("delta").load(f"{caminho_gold}/fato_consulta_pagamento") \
+        .withColumn("ano_mes", ano_mes(F.col("id_tempo")))
+
+    linhas = {}
+    for tabela, montar in RESUMOS.items():
+        destino = f"{caminho_gold}/{tabela}"
+        parcial = meses is not None and tabela not in RESUMOS_COMPLETOS and DeltaTable.isDeltaTable(spark, destino)
+        fato = gold['fato_consulta_pagamento']
+        if parcial:
+            fato = fato.filter(F.col("ano_mes").isin(meses))
+        resumo = montar(fato, gold) \
+            .withColumn("ano", (F.col("ano_mes") / 100).cast("int")) \
+            .withColumn("mes", F.col("ano_mes") % 100) \
+            .cache()
+
+        escritor = resumo.write.format("delta").mode("overwrite")
+        if parcial:
+            escritor = escritor.option("replaceWhere", f"ano_mes IN ({', '.join(str(mes) for mes in meses)})")
+        escritor.save(destino)
+        linhas[tabela] = resumo.count()
+        resumo.unpersist()
+        logger.info(f"{tabela}: {linhas[tabela]} linhas ({'meses ' + str(meses) if parcial else 'completo'})")
+    return linhas
@@ -0,0 +1,30 @@
+"""
+SparkSession local com Delta Lake, para executar e medir o pipeline fora do Databricks
+"""
+
+from pyspark.sql import SparkSession
+
+
+def criar_sessao_local(nome_app="pipeline-local", nucleos="*", delta=True, pacotes=None):
+    """Cria (ou reaproveita) uma SparkSession local, com as extensões do Delta Lake quando delta=True.
+
+    pacotes: coordenadas Maven baixadas para a sessão (ex.: o driver JDBC do PostgreSQL).
+    """
+    builder = SparkSession.builder \
+        .appName(nome_app) \
+        .master(f"local[{nucleos}]") \
+        .config("spark.sql.session.timeZone", "UTC") \
+        .config("spark.ui.showConsoleProgress", "false")
+
+    if delta:
+        # Importado só aqui: o delta-spark é necessário apenas para gravar as camadas
+        from delta import configure_spark_with_delta_pip
+
+        builder = builder \
+            .config("spark.sql.extensions", "io.delta.sql.DeltaSparkSessionExtension") \
+            .config("spark.sql.catalog.spark_catalog", "org.apache.spark.sql.delta.catalog.DeltaCatalog")
+        builder = configure_spark_with_delta_pip(builder, extra_packages=pacotes)
+    elif pacotes:
+        builder = builder.config("spark.jars.packages", ",".join(pacotes))
+
+    return builder.getOrCreate()
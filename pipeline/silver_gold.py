@@ -0,0 +1,336 @@
+"""
+Silver → Gold: dimensões e fato_consulta_pagamento atualizadas com MERGE (incremental), com chaves estáveis
+entre execuções
+"""
+
+import argparse
+import logging
+from datetime import date
+
+from delta.tables import DeltaTable
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+from pipeline.bronze_silver import COLUNAS_REMOVIDO, PAGAMENTO_REMOVIDO
+from pipeline.controle import gravar_controle, ler_controle
+from pipeline.landing_bronze import origem_reiniciada
+
+logger = logging.getLogger(__name__)
+
+# Dimensões copiadas da Silver: {dimensão: (tabela Silver, chave, colunas)}
+DIMENSOES = {
+    'dim_paciente': ('paciente_enriquecido', 'id_paciente',
+                     ["id_paciente", "nome_paciente", "cpf_paciente", "genero", "data_nasc", "cidade", "estado", "pais"]),
+    'dim_odontologista': ('odontologista', 'id_odontologista',
+                          ["id_odontologista", "nome_odontologista", "especialidade", "cro"]),
+    'dim_procedimento': ('procedimento', 'id_procedimento',
+                         ["id_procedimento", "nome_procedimento", "descricao_procedimento"]),
+    'dim_tipo_pagamento': ('tipo_pagamento', 'id_tipo_pagamento', ["id_tipo_pagamento", "descricao_tipo_pagamento"]),
+    'dim_consulta': ('consulta_consolidada', 'id_consulta',
+                     ["id_consulta", "data_hora", "diagnostico", "tratamento", "id_agendamento"]),
+}
+
+# Registros da fato na tabela de controle: a fato é atualizada a partir de procedimentos novos
+# (id_consulta_procedimento) e de pagamentos alterados ou apagados pelo log (id_log_aplicado da Silver de
+# pagamento e da pagamento_removido)
+CONTROLE_FATO_PROCEDIMENTOS = 'fato_consulta_pagamento.consulta_procedimento'
+CONTROLE_FATO_PAGAMENTOS = 'fato_consulta_pagamento.pagamento'
+
+# Calendário padrão da dim_tempo: de 1º de janeiro de ANOS_CALENDARIO anos atrás até 31 de dezembro do ano que vem
+ANOS_CALENDARIO = 5
+
+
+def chave_tempo(coluna):
+    """Chave da dim_tempo calculada da própria data (aaaammdd), sem join com a dimensão."""
+    return F.year(coluna) * 10000 + F.month(coluna) * 100 + F.dayofmonth(coluna)
+
+
+def ano_mes(coluna):
+    """Mês aaaamm de uma chave da dim_tempo (aaaammdd)."""
+    return (coluna / 100).cast("int")
+
+
+def intervalo_calendario(hoje=None):
+    """Intervalo padrão do calendário: (1º/jan de ANOS_CALENDARIO anos atrás, 31/dez do ano que vem)."""
+    hoje = hoje or date.today()
+    return date(hoje.year - ANOS_CALENDARIO, 1, 1), date(hoje.year + 1, 12, 31)
+
+
+def mesclar(spark, df, destino, chave, remover=None):
+    """Grava df em uma tabela Gold e retorna a ação ('criada' ou 'mesclada').
+
+    Na primeira execução a tabela é criada; depois, MERGE pela chave que insere as linhas novas e só
+    reescreve as que mudaram, sem trocar a chave das linhas que já existem. remover (DataFrame com a
+    chave) lista linhas a apagar no mesmo MERGE, exceto as que estão em df.
+    """
+    if not DeltaTable.isDeltaTable(spark, destino):
+        df.write.format("delta").mode("overwrite").save(destino)
+        return 'criada'
+
+    # Colunas novas de df (ex.: id_tempo_data na dim_tempo) são acrescentadas antes do MERGE
+    existentes = set(spark.read.format("delta").load(destino).columns)
+    novas = [f"`{campo.name}` {campo.dataType.simpleString()}" for campo in df.schema if campo.name not in existentes]
+    if novas:
+        spark.sql(f"ALTER TABLE delta.`{destino}` ADD COLUMNS ({', '.join(novas)})")
+
+    fonte = df.withColumn("_remover", F.lit(False))
+    if remover is not None:
+        removidas = remover.select(chave).join(df.select(chave), chave, "left_anti")
+        fonte = fonte.unionByName(removidas.withColumn("_remover", F.lit(True)), allowMissingColumns=True)
+
+    alterado = " OR ".join(f"NOT (g.{coluna} <=> n.{coluna})" for coluna in df.columns if coluna != chave)
+    colunas = {coluna: f"n.{coluna}" for coluna in df.columns}
+    DeltaTable.forPath(spark, destino).alias("g") \
+        .merge(fonte.alias("n"), f"g.{chave} = n.{chave}") \
+        .whenMatchedDelete(condition="n._remover") \
+        .whenMatchedUpdate(condition=alterado, set=colunas) \
+        .whenNotMatchedInsert(condition="NOT n._remover", values=colunas) \
+        .execute()
+    return 'mesclada'
+
+
+def dim_tempo(spark, data_inicio, data_fim):
+    """Calendário com um dia por linha entre as datas (inclusive), com a chave aaaammdd e a data (id_tempo_data)."""
+    dias = spark.range(1).select(F.explode(F.sequence(F.lit(data_inicio), F.lit(data_fim))).alias("data"))
+    return dias.select(
+        chave_tempo(F.col("data")).alias("id_tempo"),
+        F.col("data").cast("date").alias("id_tempo_data"),  # A própria data, usada nos relacionamentos do Power BI
+        "data",
+        F.year("data").alias("ano"),
+        F.month("data").alias("mes"),
+        F.dayofmonth("data").alias("dia"),
+        F.date_format("data", "E").alias("dia_semana"),
+    )
+
+
+def construir_dimensoes(spark, silver, caminho_gold, data_inicio=None, data_fim=None):
+    """Mescla as dimensões na Gold a partir da Silver (CacheCamada). Retorna {dimensão: ação}.
+
+    A dim_tempo é gerada como calendário entre data_inicio e data_fim (padrão: intervalo_calendario()).
+    """
+    padrao_inicio, padrao_fim = intervalo_calendario()
+    data_inicio, data_fim = data_inicio or padrao_inicio, data_fim or padrao_fim
+
+    acoes = {}
+    for dimensao, (tabela, chave, colunas) in DIMENSOES.items():
+        acoes[dimensao] = mesclar(spark, silver.tabela(tabela).select(*colunas), f"{caminho_gold}/{dimensao}", chave)
+    acoes['dim_tempo'] = mesclar(spark, dim_tempo(spark, data_inicio, data_fim), f"{caminho_gold}/dim_tempo", "id_tempo")
+
+    # Pagamentos fora do calendário gerariam id_tempo sem linha na dim_tempo
+    primeira, ultima = silver.tabela("consulta_consolidada") \
+        .agg(F.min("data_pagamento").cast("date"), F.max("data_pagamento").cast("date")).first()
+    if primeira is not None and (primeira < data_inicio or ultima > data_fim):
+        logger.warning(f"⚠️ Pagamentos entre {primeira} e {ultima} fora do calendário da dim_tempo "
+                       f"({data_inicio} a {data_fim})")
+    for dimensao, acao in acoes.items():
+        logger.info(f"{dimensao}: {acao}")
+    return acoes
+
+
+def ratear(df, coluna_valor, grupo, ordem, peso=None):
+    """Divide o valor de cada grupo entre as suas linhas, em centavos, proporcionalmente ao peso (padrão: igual).
+
+    Cada linha recebe o piso da sua parte e os centavos que sobram vão, um a um, para as maiores frações
+    (desempate pela ordem): a soma das partes de um grupo é exatamente o valor original.
+    """
+    peso = F.lit(1) if peso is None else F.col(peso)
+    grupo_inteiro = Window.partitionBy(grupo)
+    total = F.round(F.col(coluna_valor) * 100).cast("long")
+    df = df.withColumn("_peso", peso) \
+        .withColumn("_parte", total * F.col("_peso") / F.sum("_peso").over(grupo_inteiro)) \
+        .withColumn("_centavos", F.floor("_parte").cast("long"))
+    sobra = total - F.sum("_centavos").over(grupo_inteiro)
+    posicao = F.row_number().over(
+        Window.partitionBy(grupo).orderBy((F.col("_parte") - F.col("_centavos")).desc(), ordem)
+    )
+    return df.withColumn("_posicao", posicao) \
+        .withColumn(coluna_valor, ((F.col("_centavos") + F.when(F.col("_posicao") <= sobra, 1).otherwise(0)) / 100)
+                    .cast(df.schema[coluna_valor].dataType)) \
+        .drop("_peso", "_parte", "_centavos", "_posicao")
+
+
+def linhas_fato(consulta_procedimento, consultas):
+    """Linhas da fato: uma por procedimento de consulta paga, com id_fato = id_consulta_procedimento.
+
+    O valor_pago da consulta é rateado igualmente entre os seus procedimentos (ratear), então a receita
+    sai certa com um SUM simples sobre a fato.
+    """
+    cp, c = consulta_procedimento.alias("cp"), consultas.alias("c")
+    linhas = cp.join(c, F.col("cp.consulta_id_consulta") == F.col("c.id_consulta")) \
+        .filter(F.col("c.valor_pago").isNotNull()) \
+        .select(
+            F.col("cp.id_consulta_procedimento").alias("id_fato"),
+            F.col("c.id_consulta"),
+            F.col("c.paciente_id_paciente").alias("id_paciente"),
+            F.col("c.odontologista_id_odontologista").alias("id_odontologista"),
+            F.col("cp.procedimento_id_procedimento").alias("id_procedimento"),
+            F.col("c.tipo_pagamento_id_tipo_pagamento").alias("id_tipo_pagamento"),
+            chave_tempo(F.col("c.data_pagamento")).alias("id_tempo"),
+            F.col("c.valor_pago"),
+            F.lit(1).alias("quantidade_procedimentos"),  # Cada linha representa um procedimento
+        )
+    return ratear(linhas, "valor_pago", "id_consulta", "id_fato")
+
+
+def mudancas_fato(fato, consulta_procedimento, consultas, consultas_afetadas):
+    """Recalcula as linhas da fato das consultas afetadas. Retorna (novas, antigas).
+
+    novas são as linhas atuais dessas consultas; antigas, as que estavam na fato. As antigas que não estão
+    em novas (pagamento apagado, procedimento removido) devem sair da fato.
+    """
+    afetadas = F.broadcast(consultas_afetadas.select("id_consulta"))
+    procedimentos_afetados = consulta_procedimento.join(
+        afetadas.withColumnRenamed("id_consulta", "consulta_id_consulta"), "consulta_id_consulta", "left_semi"
+    )
+    novas = linhas_fato(procedimentos_afetados, consultas.join(afetadas, "id_consulta", "left_semi"))
+    antigas = fato.join(afetadas, "id_consulta", "left_semi")
+    return novas, antigas
+
+
+def operacoes_pagamento(spark, silver):
+    """Operações do log aplicadas pela Silver: pagamentos atuais e apagados (pagamento_removido).
+
+    Uma Silver gravada antes da pagamento_removido ainda não tem a tabela: só os pagamentos atuais entram.
+    """
+    pagamento = silver.tabela("pagamento").select(COLUNAS_REMOVIDO)
+    if not DeltaTable.isDeltaTable(spark, f"{silver.caminho}/{PAGAMENTO_REMOVIDO}"):
+        return pagamento
+    return pagamento.unionByName(silver.tabela(PAGAMENTO_REMOVIDO).select(COLUNAS_REMOVIDO))
+
+
+def alteracoes_fato(consulta_procedimento, operacoes, marca_procedimentos, marca_pagamentos):
+    """Procedimentos novos e operações de pagamento (inclusive remoções) acima das marcas.
+
+    Retorna (procedimentos, pagamentos).
+    """
+    return (consulta_procedimento.filter(F.col("id_consulta_procedimento") > F.lit(marca_procedimentos)),
+            operacoes.filter(F.col("id_log_aplicado") > F.lit(marca_pagamentos)))
+
+
+def consultas_afetadas(procedimentos, pagamentos):
+    """Consultas (id_consulta, sem repetição) com procedimento novo ou com pagamento alterado ou apagado."""
+    return procedimentos.select(F.col("consulta_id_consulta").alias("id_consulta")) \
+        .union(pagamentos.select(F.col("consulta_id_consulta").alias("id_consulta"))) \
+        .distinct()
+
+
+def fato_desatualizada(fato, consulta_procedimento, operacoes, marca_procedimentos, marca_pagamentos,
+                       linhas_procedimentos=None):
+    """True se a Silver recomeçou desde as marcas da fato e ela precisa ser montada de novo.
+
+    Acontece quando a Bronze foi recarregada (IDs reiniciados): a marca de pagamentos fica acima do maior
+    id_log_aplicado das operações da Silver (operacoes_pagamento), ou consulta_procedimento deixa de conferir
+    com a fato (origem_reiniciada, com as linhas já processadas).
+    """
+    maximo_pagamentos = operacoes.agg(F.max("id_log_aplicado")).first()[0]
+    if maximo_pagamentos is None or maximo_pagamentos < marca_pagamentos:
+        return True
+    procedimentos_na_fato = fato.select(
+        F.col("id_fato").alias("id_consulta_procedimento"),
+        F.col("id_consulta").alias("consulta_id_consulta"),
+        F.col("id_procedimento").alias("procedimento_id_procedimento"),
+    )
+    return origem_reiniciada(consulta_procedimento, procedimentos_na_fato, "id_consulta_procedimento",
+                             marca_procedimentos, linhas_procedimentos)
+
+
+def atualizar_fato(spark, silver, caminho_gold, caminho_controle=None):
+    """Atualiza a fato_consulta_pagamento e retorna {acao, consultas, meses}.
+
+    A primeira execução monta a fato inteira, assim como a seguinte a um reinício da Silver
+    (fato_desatualizada). As demais só recalculam as consultas com procedimentos novos ou com pagamento
+    alterado ou apagado desde a última execução (consultas_afetadas): as linhas delas são mescladas pela
+    chave id_fato, e as que deixaram de existir são apagadas no mesmo MERGE. meses lista os meses (aaaamm)
+    com linhas alteradas, antes ou depois do MERGE; None quando a fato foi montada inteira.
+    """
+    caminho_controle = caminho_controle or f"{caminho_gold}/_controle_gold"
+    destino = f"{caminho_gold}/fato_consulta_pagamento"
+    consulta_procedimento = silver.tabela("consulta_procedimento")
+    operacoes = operacoes_pagamento(spark, silver)
+    consultas = silver.tabela("consulta_consolidada")
+
+    controle_procedimentos = ler_controle(spark, caminho_controle, CONTROLE_FATO_PROCEDIMENTOS)
+    controle_pagamentos = ler_controle(spark, caminho_controle, CONTROLE_FATO_PAGAMENTOS)
+    incremental = DeltaTable.isDeltaTable(spark, destino) and all(
+        controle is not None and controle.marca is not None
+        for controle in (controle_procedimentos, controle_pagamentos)
+    )
+    if incremental and fato_desatualizada(spark.read.format("delta").load(destino), consulta_procedimento, operacoes,
+                                          controle_procedimentos.marca, controle_pagamentos.marca,
+                                          controle_procedimentos.linhas):
+        logger.warning("⚠️ fato_consulta_pagamento: Silver recomeçou desde a última execução, fato montada de novo")
+        incremental = False
+
+    if incremental:
+        procedimentos_novos, pagamentos_alterados = alteracoes_fato(
+            consulta_procedimento, operacoes, controle_procedimentos.marca, controle_pagamentos.marca
+        )
+    else:
+        procedimentos_novos, pagamentos_alterados = consulta_procedimento, operacoes
+
+    # Novas marcas d'água: maior valor entre as linhas processadas nesta execução (ou a marca anterior)
+    maximo, novos = procedimentos_novos.agg(F.max("id_consulta_procedimento"), F.count(F.lit(1))).first()
+    marca_procedimentos = maximo or (controle_procedimentos.marca if incremental else None)
+    # Procedimentos já processados: comparados na próxima execução para detectar uma Silver que encolheu
+    if not incremental:
+        linhas_procedimentos = novos
+    elif controle_procedimentos.linhas is not None:
+        linhas_procedimentos = controle_procedimentos.linhas + novos
+    else:
+        linhas_procedimentos = None
+    marca_pagamentos = pagamentos_alterados.agg(F.max("id_log_aplicado")).first()[0] or \
+        (controle_pagamentos.marca if incremental else None)
+
+    if not incremental:
+        linhas_fato(consulta_procedimento, consultas).write.format("delta").mode("overwrite").save(destino)
+        acao, afetadas, meses = 'criada', consultas.count(), None
+    else:
+        alteradas = consultas_afetadas(procedimentos_novos, pagamentos_alterados).cache()
+        afetadas = alteradas.count()
+        meses = []
+        if afetadas:
+            # Só as consultas afetadas são recalculadas: o volume do MERGE acompanha o volume do dia
+            novas, antigas = mudancas_fato(spark.read.format("delta").load(destino), consulta_procedimento,
+                                           consultas, alteradas)
+            # Meses das linhas antigas e novas das consultas afetadas (um pagamento pode mudar de data)
+            meses = sorted(linha[0] for linha in novas.select("id_tempo").union(antigas.select("id_tempo"))
+                           .select(ano_mes(F.col("id_tempo"))).distinct().collect())
+            mesclar(spark, novas, destino, "id_fato", remover=antigas)
+        alteradas.unpersist()
+        acao = 'mesclada' if afetadas else 'ignorada'
+
+    gravar_controle(spark, caminho_controle, CONTROLE_FATO_PROCEDIMENTOS, "id_consulta_procedimento",
+                    marca_procedimentos, None, linhas_procedimentos)
+    gravar_controle(spark, caminho_controle, CONTROLE_FATO_PAGAMENTOS, "id_log_aplicado", marca_pagamentos, None)
+    logger.info(f"fato_consulta_pagamento: {afetadas} consultas ({acao})")
+    return {'acao': acao, 'consultas': afetadas, 'meses': meses}
+
+
+def main():
+    """Execução local: monta Bronze e Silver a partir dos CSVs de amostra e atualiza a Gold, em Delta local."""
+    parser = argparse.ArgumentParser(description="Atualiza as dimensões e a fato da Gold a partir dos CSVs (Delta local)")
+    parser.add_argument('--landing', default='data/raw/teste', help="Diretório com os CSVs da Landing")
+    parser.add_argument('--lake', default='/tmp/lake', help="Diretório local das camadas bronze/, silver/ e gold/")
+    args = parser.parse_args()
+
+    from pipeline.execucao import etapa_bronze, etapa_gold, etapa_silver
+    from pipeline.sessao import criar_sessao_local
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    spark = criar_sessao_local("silver-gold-local")
+    caminhos = {'landing': args.landing, 'bronze': f"{args.lake}/bronze", 'silver': f"{args.lake}/silver",
+                'gold': f"{args.lake}/gold"}
+    try:
+        etapa_bronze(spark, caminhos)
+        etapa_silver(spark, caminhos)
+        etapa_gold(spark, caminhos)
+        gold = caminhos['gold']
+        spark.read.format("delta").load(f"{gold}/fato_consulta_pagamento").orderBy("id_fato").show(truncate=False)
+        spark.read.format("delta").load(f"{gold}/resumo_mensal_odontologista") \
+            .orderBy("ano_mes", "id_odontologista").show(truncate=False)
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+SparkSession local compartilhada pelos testes do pipeline (sem Delta: os testes usam só DataFrames)
+"""
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+
+@pytest.fixture(scope="session")
+def spark():
+    from pipeline.sessao import criar_sessao_local
+
+    sessao = criar_sessao_local("testes-pipeline", nucleos="2", delta=False)
+    sessao.conf.set("spark.sql.shuffle.partitions", "2")
+    yield sessao
+    sessao.stop()
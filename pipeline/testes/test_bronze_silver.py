@@ -0,0 +1,60 @@
+"""
+Marca d'água do log_pagamento na Silver: reinício dos IDs do log e reprodução do log inteiro
+"""
+
+from datetime import datetime
+
+from pyspark.sql import functions as F
+
+from pipeline.bronze_silver import operacoes_aplicadas, ultimas_alteracoes
+from pipeline.landing_bronze import origem_reiniciada
+
+ESQUEMA_LOG = "id_log long, tipo_acao string, id_pagamento long, valor_pago double, DataHoraOperacao timestamp"
+
+
+def log_pagamento(spark, linhas):
+    return spark.createDataFrame(linhas, ESQUEMA_LOG)
+
+
+def silver_pagamento(log):
+    """Silver de pagamento como aplicar_log_pagamentos a grava: o estado final de cada pagamento."""
+    return ultimas_alteracoes(log).filter(F.col("tipo_acao") != "DELETE").select(
+        "id_pagamento", "valor_pago",
+        F.col("DataHoraOperacao").alias("atualizado_em"), F.col("id_log").alias("id_log_aplicado"),
+    )
+
+
+LOG = [
+    (1, "INSERT", 1, 100.0, datetime(2024, 1, 1, 10)),
+    (2, "INSERT", 2, 50.0, datetime(2024, 1, 2, 10)),
+    (3, "UPDATE", 1, 120.0, datetime(2024, 1, 3, 10)),
+]
+
+
+def test_ultimas_alteracoes_mantem_a_ultima_operacao(spark):
+    silver = silver_pagamento(log_pagamento(spark, LOG))
+    estado = {r.id_pagamento: (r.valor_pago, r.id_log_aplicado) for r in silver.collect()}
+    assert estado == {1: (120.0, 3), 2: (50.0, 2)}
+
+
+def test_log_com_operacoes_novas_nao_e_reinicio(spark):
+    silver = silver_pagamento(log_pagamento(spark, LOG))
+    log = log_pagamento(spark, LOG + [(4, "DELETE", 2, 50.0, datetime(2024, 1, 4, 10))])
+    assert not origem_reiniciada(log, operacoes_aplicadas(silver), "id_log", 3)
+
+
+def test_log_regenerado_e_reinicio(spark):
+    silver = silver_pagamento(log_pagamento(spark, LOG))
+    # Nova carga do gerador com mais operações: os IDs passam da marca, mas o id_log 3 é outra operação
+    regenerado = log_pagamento(spark, [
+        (1, "INSERT", 1, 80.0, datetime(2024, 2, 1, 10)),
+        (2, "INSERT", 2, 30.0, datetime(2024, 2, 1, 11)),
+        (3, "INSERT", 3, 70.0, datetime(2024, 2, 2, 10)),
+        (4, "UPDATE", 2, 35.0, datetime(2024, 2, 3, 10)),
+    ])
+    assert origem_reiniciada(regenerado, operacoes_aplicadas(silver), "id_log", 3)
+
+
+def test_log_menor_e_reinicio(spark):
+    silver = silver_pagamento(log_pagamento(spark, LOG))
+    assert origem_reiniciada(log_pagamento(spark, LOG[:1]), operacoes_aplicadas(silver), "id_log", 3)
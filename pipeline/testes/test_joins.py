@@ -0,0 +1,65 @@
+"""
+Escolha do broadcast em juntar_por_tamanho pelo tamanho estimado em bytes
+"""
+
+from pyspark.sql import functions as F
+
+from pipeline.bronze_silver import juntar_por_tamanho, tamanho_estimado
+
+
+def plano_fisico(df):
+    return df._jdf.queryExecution().executedPlan().toString()
+
+
+def tabelas(spark, colunas_texto):
+    """Fato com 1000 linhas e dimensão com 100 linhas e colunas_texto colunas de texto."""
+    fato = spark.range(1000).withColumn("id_dimensao", F.col("id") % 100)
+    dimensao = spark.range(100).withColumnRenamed("id", "id_dimensao")
+    for i in range(colunas_texto):
+        dimensao = dimensao.withColumn(f"texto_{i}", F.concat(F.lit("texto "), F.col("id_dimensao").cast("string")))
+    return fato, dimensao
+
+
+def test_linhas_largas_pesam_mais(spark):
+    _, estreita = tabelas(spark, 0)
+    _, larga = tabelas(spark, 20)
+    assert tamanho_estimado(larga) > 10 * tamanho_estimado(estreita)
+
+
+def test_escolha_nao_executa_jobs(spark):
+    fato, dimensao = tabelas(spark, 20)
+    spark.sparkContext.setJobGroup("teste-joins", "escolha do join")
+    try:
+        juntar_por_tamanho(fato, dimensao, "id_dimensao", "id_dimensao")
+        assert spark.sparkContext.statusTracker().getJobIdsForGroup("teste-joins") == []
+    finally:
+        spark.sparkContext.setLocalProperty("spark.jobGroup.id", None)
+
+
+def test_broadcast_pelo_tamanho_em_bytes(spark):
+    # Mesma quantidade de linhas: só a dimensão estreita cabe no limite
+    fato, estreita = tabelas(spark, 0)
+    _, larga = tabelas(spark, 20)
+    limite = tamanho_estimado(estreita)
+
+    com_estreita = juntar_por_tamanho(fato, estreita, "id_dimensao", "id_dimensao", limite_bytes=limite)
+    assert "BroadcastHashJoin" in plano_fisico(com_estreita)
+
+    spark.conf.set("spark.sql.autoBroadcastJoinThreshold", "-1")
+    try:
+        com_larga = juntar_por_tamanho(fato, larga, "id_dimensao", "id_dimensao", limite_bytes=limite)
+        assert "SortMergeJoin" in plano_fisico(com_larga)
+        assert com_larga.count() == 1000
+    finally:
+        spark.conf.unset("spark.sql.autoBroadcastJoinThreshold")
+
+
+def test_limite_padrao_e_o_do_spark(spark):
+    fato, dimensao = tabelas(spark, 0)
+    spark.conf.set("spark.sql.autoBroadcastJoinThreshold", "-1")
+    try:
+        sem_broadcast = plano_fisico(juntar_por_tamanho(fato, dimensao, "id_dimensao", "id_dimensao"))
+    finally:
+        spark.conf.unset("spark.sql.autoBroadcastJoinThreshold")
+    assert "BroadcastHashJoin" not in sem_broadcast
+    assert "BroadcastHashJoin" in plano_fisico(juntar_por_tamanho(fato, dimensao, "id_dimensao", "id_dimensao"))
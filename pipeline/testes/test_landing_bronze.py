@@ -0,0 +1,78 @@
+"""
+Detecção de reinício dos IDs da origem na ingestão incremental Landing → Bronze
+"""
+
+import re
+from datetime import datetime
+
+from pyspark.sql import functions as F
+
+from pipeline.landing_bronze import adicionar_metadados, filtro_na_marca, origem_reiniciada
+
+COLUNAS = ["id_consulta", "diagnostico"]
+
+
+def consultas(spark, linhas):
+    return spark.createDataFrame(linhas, COLUNAS)
+
+
+def test_crescimento_normal_nao_e_reinicio(spark):
+    bronze = adicionar_metadados(consultas(spark, [(1, "a"), (2, "b")]), "consulta.csv")
+    landing = consultas(spark, [(1, "a"), (2, "b"), (3, "c")])
+    assert not origem_reiniciada(landing, bronze, "id_consulta", 2, linhas_anteriores=2)
+
+
+def test_arquivo_sem_linhas_novas_nao_e_reinicio(spark):
+    bronze = consultas(spark, [(1, "a"), (2, "b")])
+    assert not origem_reiniciada(consultas(spark, [(1, "a"), (2, "b")]), bronze, "id_consulta", 2, linhas_anteriores=2)
+
+
+def test_ids_abaixo_da_marca_sao_reinicio(spark):
+    # TRUNCATE ... RESTART IDENTITY seguido de uma carga menor: o acréscimo acima da marca não traria nada
+    bronze = consultas(spark, [(1, "a"), (2, "b"), (3, "c")])
+    assert origem_reiniciada(consultas(spark, [(1, "x"), (2, "y")]), bronze, "id_consulta", 3)
+
+
+def test_origem_vazia_e_reinicio(spark):
+    bronze = consultas(spark, [(1, "a")])
+    vazia = spark.createDataFrame([], "id_consulta long, diagnostico string")
+    assert origem_reiniciada(vazia, bronze, "id_consulta", 1)
+
+
+def test_menos_linhas_que_as_ingeridas_e_reinicio(spark):
+    bronze = consultas(spark, [(1, "a"), (2, "b"), (3, "c")])
+    landing = consultas(spark, [(1, "a"), (3, "c")])
+    assert origem_reiniciada(landing, bronze, "id_consulta", 3, linhas_anteriores=3)
+    # Já contadas na origem (ex.: count(*) no banco)
+    assert origem_reiniciada(landing, bronze, "id_consulta", 3, linhas_anteriores=3, linhas=2)
+    assert not origem_reiniciada(landing, bronze, "id_consulta", 3)
+
+
+def test_carga_maior_com_linha_da_marca_diferente_e_reinicio(spark):
+    # Nova carga maior que a anterior: os IDs passam da marca, mas a linha da marca já não é a mesma
+    bronze = consultas(spark, [(1, "a"), (2, "b")])
+    landing = consultas(spark, [(1, "x"), (2, "y"), (3, "z")])
+    assert origem_reiniciada(landing, bronze, "id_consulta", 2)
+
+
+def test_marca_em_timestamp(spark):
+    colunas = "id_log long, DataHoraOperacao timestamp"
+    bronze = spark.createDataFrame([(1, datetime(2024, 1, 1)), (2, datetime(2024, 1, 2))], colunas)
+    marca = bronze.agg(F.max(F.unix_micros("DataHoraOperacao"))).first()[0]
+    landing = bronze.union(spark.createDataFrame([(3, datetime(2024, 1, 3))], colunas))
+    assert not origem_reiniciada(landing, bronze, "DataHoraOperacao", marca)
+    assert origem_reiniciada(bronze.limit(1), bronze, "DataHoraOperacao", marca)
+
+
+def test_filtro_na_marca_e_empurrado_ao_parquet(spark, tmp_path):
+    consultas(spark, [(1, "a"), (2, "b")]).write.parquet(str(tmp_path / "consulta"))
+    landing = spark.read.parquet(str(tmp_path / "consulta"))
+    plano = landing.filter(filtro_na_marca(landing, "id_consulta", 2))._jdf.queryExecution().executedPlan().toString()
+    assert re.search(r"PushedFilters: \[.*EqualTo\(id_consulta,2\)", plano)
+
+    colunas = "id_log long, DataHoraOperacao timestamp"
+    spark.createDataFrame([(1, datetime(2024, 1, 1))], colunas).write.parquet(str(tmp_path / "log"))
+    log = spark.read.parquet(str(tmp_path / "log"))
+    marca = log.agg(F.max(F.unix_micros("DataHoraOperacao"))).first()[0]
+    plano = log.filter(filtro_na_marca(log, "DataHoraOperacao", marca))._jdf.queryExecution().executedPlan().toString()
+    assert re.search(r"PushedFilters: \[.*EqualTo\(DataHoraOperacao,", plano)
@@ -0,0 +1,27 @@
+"""
+Coorte de pacientes: a primeira consulta do paciente define a coorte em todos os meses em que ele foi atendido
+"""
+
+from pipeline.resumos import coorte_pacientes
+
+
+def coortes(spark, linhas):
+    fato = spark.createDataFrame(linhas, "id_paciente int, ano_mes int")
+    resumo = coorte_pacientes(fato, {})
+    return {(linha.coorte_ano_mes, linha.ano_mes): linha.pacientes for linha in resumo.collect()}
+
+
+def test_coorte_pelo_primeiro_mes(spark):
+    assert coortes(spark, [(1, 202403), (1, 202405), (2, 202405), (2, 202405)]) == {
+        (202403, 202403): 1, (202403, 202405): 1, (202405, 202405): 1,
+    }
+
+
+def test_consulta_antiga_muda_a_coorte_de_todos_os_meses(spark):
+    # Uma carga com uma consulta de 202401 do paciente 2 muda a coorte dele também em 202405
+    depois = coortes(spark, [(1, 202403), (1, 202405), (2, 202405), (2, 202401)])
+    assert depois == {
+        (202401, 202401): 1, (202403, 202403): 1, (202403, 202405): 1, (202401, 202405): 1,
+    }
+    assert (202405, 202405) not in depois
+
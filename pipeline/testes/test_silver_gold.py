@@ -0,0 +1,140 @@
+"""
+Gold: fato incremental (linhas removidas, reinício da Silver), calendário da dim_tempo e rateio do valor_pago
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from pipeline.bronze_silver import COLUNAS_REMOVIDO
+from pipeline.silver_gold import (
+    alteracoes_fato, consultas_afetadas, dim_tempo, fato_desatualizada, linhas_fato, mudancas_fato, ratear
+)
+
+ESQUEMA_CONSULTAS = ("id_consulta int, paciente_id_paciente int, odontologista_id_odontologista int, "
+                     "tipo_pagamento_id_tipo_pagamento int, data_pagamento timestamp, valor_pago decimal(10,2), "
+                     "id_log_aplicado long")
+ESQUEMA_PROCEDIMENTOS = "id_consulta_procedimento int, consulta_id_consulta int, procedimento_id_procedimento int"
+ESQUEMA_OPERACOES = "id_pagamento int, consulta_id_consulta int, id_log_aplicado long, atualizado_em timestamp"
+
+
+def consultas(spark, linhas):
+    return spark.createDataFrame(
+        [(id_consulta, 1, 1, 1, datetime(2024, 3, 10), valor, id_log) for id_consulta, valor, id_log in linhas],
+        ESQUEMA_CONSULTAS,
+    )
+
+
+def procedimentos(spark, linhas):
+    return spark.createDataFrame(linhas, ESQUEMA_PROCEDIMENTOS)
+
+
+def operacoes(spark, linhas):
+    """Operações de pagamento como as de operacoes_pagamento: (id_pagamento, consulta, id_log_aplicado)."""
+    df = spark.createDataFrame([(*linha, datetime(2024, 3, 10)) for linha in linhas], ESQUEMA_OPERACOES)
+    return df.select(COLUNAS_REMOVIDO)
+
+
+def afetadas(spark, ids):
+    return spark.createDataFrame([(i,) for i in ids], "id_consulta int")
+
+
+def ids_fato(df):
+    return sorted(linha.id_fato for linha in df.select("id_fato").collect())
+
+
+def test_pagamento_apagado_remove_as_linhas_da_consulta(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 10, 2), (3, 20, 1)])
+    fato = linhas_fato(cp, consultas(spark, [(10, Decimal("100.00"), 1), (20, Decimal("50.00"), 2)]))
+    # O pagamento da consulta 10 foi apagado (id_log 3): ela some da Silver de pagamentos e fica sem
+    # valor_pago, e a remoção fica em pagamento_removido
+    silver = consultas(spark, [(10, None, None), (20, Decimal("50.00"), 2)])
+    pagamento = operacoes(spark, [(200, 20, 2)])
+    removidos = operacoes(spark, [(100, 10, 3)])
+
+    procedimentos_novos, pagamentos_alterados = alteracoes_fato(cp, pagamento.unionByName(removidos), 3, 2)
+    selecionadas = consultas_afetadas(procedimentos_novos, pagamentos_alterados)
+    assert [linha.id_consulta for linha in selecionadas.collect()] == [10]
+
+    novas, antigas = mudancas_fato(fato, cp, silver, selecionadas)
+    assert ids_fato(novas) == []
+    assert ids_fato(antigas) == [1, 2]
+
+
+def test_remocao_como_ultima_operacao_nao_refaz_a_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 20, 1)])
+    fato = linhas_fato(cp, consultas(spark, [(10, Decimal("100.00"), 1), (20, Decimal("50.00"), 2)]))
+    # A marca de pagamentos (3) é a de uma remoção: o id_log não está mais na Silver de pagamentos
+    pagamento = operacoes(spark, [(200, 20, 2)])
+    assert fato_desatualizada(fato, cp, pagamento, 2, 3)
+    assert not fato_desatualizada(fato, cp, pagamento.unionByName(operacoes(spark, [(100, 10, 3)])), 2, 3)
+
+
+def test_procedimento_removido_sai_da_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 10, 2)])
+    fato = linhas_fato(cp, consultas(spark, [(10, Decimal("100.00"), 1)]))
+    atual = procedimentos(spark, [(1, 10, 1), (3, 10, 3)])
+
+    novas, antigas = mudancas_fato(fato, atual, consultas(spark, [(10, Decimal("100.00"), 1)]), afetadas(spark, [10]))
+    assert ids_fato(novas) == [1, 3]
+    assert sorted(set(ids_fato(antigas)) - set(ids_fato(novas))) == [2]
+    # O valor da consulta continua inteiro na soma das linhas novas
+    assert sum(linha.valor_pago for linha in novas.collect()) == Decimal("100.00")
+
+
+def test_silver_sem_reinicio_mantem_a_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 20, 1)])
+    silver = consultas(spark, [(10, Decimal("100.00"), 1), (20, Decimal("50.00"), 2)])
+    fato = linhas_fato(cp, silver)
+    novos = procedimentos(spark, [(1, 10, 1), (2, 20, 1), (3, 20, 2)])
+    assert not fato_desatualizada(fato, novos, silver, 2, 2)
+
+
+def test_marca_de_pagamentos_acima_da_silver_refaz_a_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1)])
+    fato = linhas_fato(cp, consultas(spark, [(10, Decimal("100.00"), 5)]))
+    # Silver de pagamento reconstruída depois de uma nova carga: o log recomeçou em 1
+    assert fato_desatualizada(fato, cp, consultas(spark, [(10, Decimal("80.00"), 1)]), 1, 5)
+
+
+def test_procedimentos_regenerados_refazem_a_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 20, 1)])
+    silver = consultas(spark, [(10, Decimal("100.00"), 1), (20, Decimal("50.00"), 2)])
+    fato = linhas_fato(cp, silver)
+    # Nova carga maior: os IDs passam da marca, mas o procedimento 2 agora é de outra consulta
+    regenerados = procedimentos(spark, [(1, 20, 3), (2, 10, 2), (3, 10, 1)])
+    assert fato_desatualizada(fato, regenerados, silver, 2, 2)
+
+
+def test_menos_procedimentos_que_os_processados_refazem_a_fato(spark):
+    cp = procedimentos(spark, [(1, 10, 1), (2, 20, 1), (3, 20, 2)])
+    silver = consultas(spark, [(10, Decimal("100.00"), 1), (20, Decimal("50.00"), 2)])
+    fato = linhas_fato(cp, silver)
+    # Nova carga menor que chega à marca com a mesma linha: só a contagem guardada acusa o reinício
+    regenerados = procedimentos(spark, [(1, 10, 1), (3, 20, 2)])
+    assert fato_desatualizada(fato, regenerados, silver, 3, 2, linhas_procedimentos=3)
+    assert not fato_desatualizada(fato, regenerados, silver, 3, 2)
+
+
+def test_dim_tempo_mantem_id_tempo_data(spark):
+    calendario = dim_tempo(spark, date(2024, 2, 28), date(2024, 3, 1))
+    assert calendario.columns[:3] == ["id_tempo", "id_tempo_data", "data"]
+    assert calendario.schema["id_tempo_data"].dataType.simpleString() == "date"
+    linhas = [(linha.id_tempo, linha.id_tempo_data) for linha in calendario.orderBy("id_tempo").collect()]
+    assert linhas == [(20240228, date(2024, 2, 28)), (20240229, date(2024, 2, 29)), (20240301, date(2024, 3, 1))]
+
+
+def test_ratear_preserva_o_total_em_centavos(spark):
+    linhas = [(1, 1, Decimal("100.00")), (2, 1, Decimal("100.00")), (3, 1, Decimal("100.00")),
+              (4, 2, Decimal("0.05")), (5, 2, Decimal("0.05"))]
+    df = ratear(spark.createDataFrame(linhas, "id int, grupo int, valor decimal(10,2)"), "valor", "grupo", "id")
+    partes = {linha.id: linha.valor for linha in df.collect()}
+    assert partes == {1: Decimal("33.34"), 2: Decimal("33.33"), 3: Decimal("33.33"),
+                      4: Decimal("0.03"), 5: Decimal("0.02")}
+    assert df.schema["valor"].dataType.simpleString() == "decimal(10,2)"
+
+
+def test_ratear_com_peso(spark):
+    linhas = [(1, 1, 10.0, 1), (2, 1, 10.0, 3)]
+    df = ratear(spark.createDataFrame(linhas, "id int, grupo int, valor double, peso int"), "valor", "grupo", "id",
+                peso="peso")
+    assert {linha.id: linha.valor for linha in df.collect()} == {1: 2.5, 2: 7.5}
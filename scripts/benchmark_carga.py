@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de carga: compara o INSERT em lote (executemany) com o COPY FROM STDIN no PostgreSQL
+(recria e esvazia as tabelas do modelo físico)
+"""
+
+import argparse
+import time
+from sqlalchemy import text
+
+from gerador_dados import (
+    conectar_db, criar_e_limpar_tabelas, inserir_dados_tabela,
+    gerar_enderecos, gerar_log_pagamentos, logger
+)
+
+
+def medir_carga(engine, tabela, dados, metodo, tamanho_lote=None):
+    """Esvazia a tabela, carrega os dados com o método informado e retorna o tempo gasto em segundos."""
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tabela} RESTART IDENTITY CASCADE"))
+
+    inicio = time.perf_counter()
+    inserir_dados_tabela(engine, tabela, dados, metodo=metodo, tamanho_lote=tamanho_lote)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara INSERT em lote e COPY na carga do PostgreSQL")
+    parser.add_argument('--registros', type=int, default=50000, help="Registros gerados por tabela")
+    parser.add_argument('--tamanhos-lote', default='5000,50000', help="Tamanhos de bloco do COPY, separados por vírgula")
+    args = parser.parse_args()
+
+    engine = conectar_db()
+    if not engine:
+        logger.error("❌ Falha na conexão com o banco. Verifique se o PostgreSQL está rodando.")
+        return
+
+    try:
+        if not criar_e_limpar_tabelas(engine):
+            return
+
+        # A geração fica fora da medição: só o tempo de carga é comparado
+        cenarios = {
+            'endereco': gerar_enderecos(args.registros),
+            'log_pagamento': gerar_log_pagamentos(list(range(1, args.registros + 1))),
+        }
+        tamanhos_lote = [int(t) for t in args.tamanhos_lote.split(',') if t.strip()]
+
+        resultados = []
+        for tabela, dados in cenarios.items():
+            execucoes = [('insert', None)] + [('copy', t) for t in tamanhos_lote]
+            for metodo, tamanho_lote in execucoes:
+                segundos = medir_carga(engine, tabela, dados, metodo, tamanho_lote)
+                resultados.append((tabela, metodo, tamanho_lote, len(dados), segundos))
+
+        print("\n" + "="*72)
+        print(f"{'tabela':<16}{'método':<10}{'lote':>10}{'registros':>12}{'segundos':>10}{'registros/s':>14}")
+        print("-"*72)
+        for tabela, metodo, tamanho_lote, registros, segundos in resultados:
+            lote = f"{tamanho_lote:,}" if tamanho_lote else '-'
+            print(f"{tabela:<16}{metodo:<10}{lote:>10}{registros:>12,}{segundos:>10.2f}{registros / segundos:>14,.0f}")
+        print("="*72)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
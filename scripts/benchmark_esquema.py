@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de leitura no Spark: compara o CSV lido com inferSchema com o CSV lido com o esquema
+explícito do modelo físico (pipeline/esquemas.py)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Permite importar o pacote pipeline a partir da raiz do repositório
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pipeline.esquemas import esquema_tabela, tabelas
+from pipeline.sessao import criar_sessao_local
+
+
+def ler_csv(spark, caminho, tabela, modo):
+    """Lê o CSV de uma tabela com inferSchema ('inferido') ou com o esquema do modelo físico ('explicito')."""
+    leitor = spark.read.format("csv").option("header", "true")
+    if modo == 'inferido':
+        leitor = leitor.option("inferSchema", "true")
+    else:
+        leitor = leitor.schema(esquema_tabela(tabela))
+    return leitor.load(caminho)
+
+
+def medir_leitura(spark, caminho, tabela, modo):
+    """Lê e consome o arquivo inteiro, retornando o tempo gasto em segundos."""
+    inicio = time.perf_counter()
+    ler_csv(spark, caminho, tabela, modo).write.format("noop").mode("overwrite").save()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a leitura de CSV com inferSchema e com esquema explícito")
+    parser.add_argument('--diretorio', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'raw'),
+                        help="Diretório com os CSVs das tabelas")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções de cada leitura (vale a menor)")
+    args = parser.parse_args()
+
+    spark = criar_sessao_local("benchmark-esquema", delta=False)
+    try:
+        resultados = []
+        for tabela in tabelas():
+            caminho = os.path.join(args.diretorio, f"{tabela}.csv")
+            if not os.path.exists(caminho):
+                continue
+            tempos = {
+                modo: min(medir_leitura(spark, caminho, tabela, modo) for _ in range(args.repeticoes))
+                for modo in ('inferido', 'explicito')
+            }
+            resultados.append((tabela, os.path.getsize(caminho), tempos['inferido'], tempos['explicito']))
+    finally:
+        spark.stop()
+
+    print("\n" + "="*72)
+    print(f"{'tabela':<24}{'MB':>8}{'inferSchema (s)':>16}{'esquema (s)':>12}{'ganho':>10}")
+    print("-"*72)
+    for tabela, tamanho, inferido, explicito in resultados:
+        print(f"{tabela:<24}{tamanho / 1024 ** 2:>8.1f}{inferido:>16.2f}{explicito:>12.2f}{inferido / explicito:>9.1f}x")
+    total_inferido = sum(r[2] for r in resultados)
+    total_explicito = sum(r[3] for r in resultados)
+    if resultados:
+        print("-"*72)
+        print(f"{'total':<24}{sum(r[1] for r in resultados) / 1024 ** 2:>8.1f}{total_inferido:>16.2f}"
+              f"{total_explicito:>12.2f}{total_inferido / total_explicito:>9.1f}x")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    main()
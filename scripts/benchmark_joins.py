@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark dos joins Bronze → Silver: compara os joins do notebook original (joins padrão, gravação sem
+partições) com o plano de pipeline/bronze_silver.py (broadcast ou co-particionamento em cada join e
+consulta consolidada particionada por ano/mês), informando bytes embaralhados e tempo de cada etapa
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# Permite importar o pacote pipeline a partir da raiz do repositório
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pyspark.sql import functions as F
+
+from pipeline.bronze_silver import consolidar_consultas, enriquecer_pacientes, gravar_particionado
+from pipeline.landing_bronze import ler_landing
+from pipeline.metricas import duracao_etapa, medir_grupo
+from pipeline.sessao import criar_sessao_local
+
+TABELAS = ['paciente', 'endereco', 'consulta', 'agendamento', 'pagamento']
+
+# Deslocamento das chaves entre as cópias de uma tabela (maior que qualquer ID da amostra)
+DESLOCAMENTO_CHAVES = 1_000_000
+
+
+def replicar(spark, df, copias):
+    """Multiplica as linhas da tabela, deslocando as chaves (id_*, *_id_*) de cada cópia."""
+    df = df.crossJoin(spark.range(copias).withColumnRenamed("id", "_copia"))
+    for coluna in df.columns:
+        if coluna.startswith("id_") or "_id_" in coluna:
+            df = df.withColumn(coluna, (F.col(coluna) + F.col("_copia") * DESLOCAMENTO_CHAVES).cast("int"))
+    return df.drop("_copia")
+
+
+def preparar_tabelas(spark, diretorio, copias, destino):
+    """Grava as tabelas da amostra (multiplicadas) em Parquet e as relê, como a Bronze seria lida."""
+    tabelas = {}
+    for tabela in TABELAS:
+        caminho = os.path.join(destino, tabela)
+        replicar(spark, ler_landing(spark, diretorio, tabela, "csv"), copias).write.mode("overwrite").parquet(caminho)
+        tabelas[tabela] = spark.read.parquet(caminho)
+    return tabelas
+
+
+def silver_padrao(t, destino):
+    """Joins como no notebook original: sem dicas de join e consulta consolidada gravada sem partições."""
+    paciente, endereco = t['paciente'], t['endereco']
+    paciente.join(endereco, paciente["endereco_id_endereco"] == endereco["id_endereco"], "left").select(
+        "id_paciente", "nome_paciente", "cpf_paciente", "telefone", "genero", F.to_date("data_nasc").alias("data_nasc"),
+        "email", "logradouro", "numero", "complemento", "bairro", "cidade", "estado", "cep", "pais"
+    ).write.mode("overwrite").parquet(os.path.join(destino, "paciente_enriquecido"))
+
+    consulta, agendamento, pagamento = t['consulta'], t['agendamento'], t['pagamento']
+    consulta.join(
+        agendamento, consulta["agendamento_id_agendamento"] == agendamento["id_agendamento"], "inner"
+    ).join(
+        pagamento, consulta["id_consulta"] == pagamento["consulta_id_consulta"], "left"
+    ).select(
+        consulta["id_consulta"], "data_hora", "diagnostico", "tratamento", "id_agendamento", "paciente_id_paciente",
+        "odontologista_id_odontologista", "status_agendamento", "id_pagamento", "valor_pago", "data_pagamento",
+        "tipo_pagamento_id_tipo_pagamento"
+    ).write.mode("overwrite").parquet(os.path.join(destino, "consulta_consolidada"))
+
+
+def silver_otimizado(t, destino):
+    """Joins de pipeline/bronze_silver.py, com a consulta consolidada particionada por ano/mês."""
+    enriquecer_pacientes(t['paciente'], t['endereco']) \
+        .write.mode("overwrite").parquet(os.path.join(destino, "paciente_enriquecido"))
+    consultas = consolidar_consultas(t['consulta'], t['agendamento'], t['pagamento'])
+    gravar_particionado(consultas, os.path.join(destino, "consulta_consolidada"), formato="parquet")
+
+
+def contar_arquivos(diretorio):
+    """Conta os arquivos de dados (part-*) gravados em um diretório e suas partições."""
+    return sum(1 for _, _, arquivos in os.walk(diretorio) for nome in arquivos if nome.startswith("part-"))
+
+
+def medir(spark, modo, funcao, tabelas, destino):
+    """Executa um modo em seu próprio grupo de jobs e retorna (segundos, etapas, arquivos gravados)."""
+    _, segundos, etapas = medir_grupo(spark, modo, funcao, tabelas, destino)
+    return segundos, etapas, contar_arquivos(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os joins Bronze → Silver padrão com o plano broadcast/co-particionado")
+    parser.add_argument('--diretorio', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'raw'),
+                        help="Diretório com os CSVs das tabelas")
+    parser.add_argument('--copias', type=int, default=20, help="Multiplicador das tabelas da amostra")
+    parser.add_argument('--limite-spark-mb', type=int, default=None,
+                        help="spark.sql.autoBroadcastJoinThreshold nos dois modos (padrão do Spark: 10 MB), também "
+                             "o limite de juntar_por_tamanho. Com a amostra multiplicada as tabelas ainda ficam abaixo "
+                             "dele; um valor menor reproduz o cenário do cluster, com sort-merge joins")
+    parser.add_argument('--etapas', action='store_true', help="Lista cada etapa (tarefas, shuffle e duração)")
+    args = parser.parse_args()
+
+    spark = criar_sessao_local("benchmark-joins", delta=False)
+    if args.limite_spark_mb is not None:
+        spark.conf.set("spark.sql.autoBroadcastJoinThreshold", f"{args.limite_spark_mb}MB")
+    resultados = []
+    try:
+        with tempfile.TemporaryDirectory() as temporario:
+            tabelas = preparar_tabelas(spark, args.diretorio, args.copias, os.path.join(temporario, "bronze"))
+            # Aquecimento da JVM (não medido)
+            silver_padrao(tabelas, os.path.join(temporario, "aquecimento"))
+            for modo, funcao in (('padrao', silver_padrao), ('otimizado', silver_otimizado)):
+                resultados.append((modo, *medir(spark, modo, funcao, tabelas, os.path.join(temporario, modo))))
+    finally:
+        spark.stop()
+
+    print("\n" + "="*84)
+    print(f"{'modo':<12}{'etapas':>8}{'tarefas':>10}{'shuffle (MB)':>15}{'etapas (s)':>13}{'total (s)':>12}{'arquivos':>12}")
+    print("-"*84)
+    for modo, segundos, etapas, arquivos in resultados:
+        shuffle = sum(e["shuffleWriteBytes"] for e in etapas) / 1024 ** 2
+        duracao = sum(duracao_etapa(e) for e in etapas)
+        tarefas = sum(e["numTasks"] for e in etapas)
+        print(f"{modo:<12}{len(etapas):>8}{tarefas:>10}{shuffle:>15.1f}{duracao:>13.2f}{segundos:>12.2f}{arquivos:>12}")
+    print("="*84)
+
+    if args.etapas:
+        for modo, _, etapas, _ in resultados:
+            print(f"\n{modo}:")
+            for e in etapas:
+                print(f"  etapa {e['stageId']:>4}  {e['numTasks']:>5} tarefas  "
+                      f"{e['shuffleWriteBytes'] / 1024 ** 2:>8.1f} MB shuffle  {duracao_etapa(e):>6.2f}s  {e['name'][:40]}")
+
+
+if __name__ == "__main__":
+    main()
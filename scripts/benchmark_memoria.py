@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de memória: compara o pico de memória da geração em lotes (streaming) com a geração
+que materializa cada tabela inteira em listas
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import gerador_dados
+from gerador_dados import gerar_e_carregar, gerar_em_paralelo, semear, SEMENTE
+
+
+def configurar_volume(num_agendamentos):
+    """Ajusta os volumes do gerador mantendo as proporções padrão entre as tabelas."""
+    gerador_dados.NUM_AGENDAMENTOS = num_agendamentos
+    gerador_dados.NUM_PACIENTES = int(num_agendamentos * 3 / 7)
+    gerador_dados.NUM_ENDERECOS = int(num_agendamentos * 2 / 7)
+    gerador_dados.NUM_CONSULTAS = int(num_agendamentos * 0.9)
+    gerador_dados.NUM_PAGAMENTOS = int(gerador_dados.NUM_CONSULTAS * 0.95)
+
+
+def gerar_materializado():
+    """Gera todas as tabelas mantendo as listas completas em memória, como antes do streaming."""
+    g = gerador_dados
+    ids_enderecos = range(1, g.NUM_ENDERECOS + 1)
+    ids_pacientes = range(1, g.NUM_PACIENTES + 1)
+    ids_agendamentos = range(1, g.NUM_AGENDAMENTOS + 1)
+    ids_consultas = range(1, g.NUM_CONSULTAS + 1)
+    ids_pagamentos = range(1, g.NUM_PAGAMENTOS + 1)
+    ids_odontologistas = range(1, g.NUM_ODONTOLOGISTAS + 1)
+    return [
+        gerar_em_paralelo('endereco', g.NUM_ENDERECOS),
+        gerar_em_paralelo('paciente', g.NUM_PACIENTES, ids_enderecos),
+        gerar_em_paralelo('agendamento', g.NUM_AGENDAMENTOS, ids_pacientes, ids_odontologistas),
+        gerar_em_paralelo('consulta', g.NUM_CONSULTAS, ids_agendamentos),
+        gerar_em_paralelo('pagamento', g.NUM_PAGAMENTOS, ids_consultas, range(1, 6)),
+        gerar_em_paralelo('consulta_procedimento', len(ids_consultas), ids_consultas, range(1, g.NUM_PROCEDIMENTOS + 1),
+                          g.MIN_PROC_POR_CONSULTA, g.MAX_PROC_POR_CONSULTA),
+        gerar_em_paralelo('log_pagamento', len(ids_pagamentos), ids_pagamentos),
+    ]
+
+
+def medir(funcao):
+    """Executa a função e retorna (pico de memória em MB, segundos)."""
+    semear(SEMENTE)
+    gerador_dados._proximos_ids.clear()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return pico / 1024 ** 2, segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o pico de memória da geração em lotes e da geração materializada")
+    parser.add_argument('--volumes', default='10000,50000,100000', help="Números de agendamentos, separados por vírgula")
+    args = parser.parse_args()
+
+    resultados = []
+    for volume in [int(v) for v in args.volumes.split(',') if v.strip()]:
+        configurar_volume(volume)
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultados.append((volume, 'lotes', *medir(lambda: gerar_e_carregar(None, diretorio))))
+        resultados.append((volume, 'materializado', *medir(gerar_materializado)))
+
+    print("\n" + "="*62)
+    print(f"{'agendamentos':>14}{'modo':>16}{'pico (MB)':>16}{'segundos':>16}")
+    print("-"*62)
+    for volume, modo, pico, segundos in resultados:
+        print(f"{volume:>14,}{modo:>16}{pico:>16,.1f}{segundos:>16.2f}")
+    print("="*62)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark das colunas de texto: compara uma chamada ao Faker por valor (BACKEND_TEXTOS=faker) com o
+vocabulário pré-sorteado (BACKEND_TEXTOS=vocabulario), com cache frio e quente
+"""
+
+import argparse
+import tempfile
+import time
+
+import gerador_dados
+import vocabulario
+from gerador_dados import gerar_enderecos, gerar_log_pagamentos, gerar_pacientes, semear, SEMENTE
+
+
+def gerar_tabelas(num_registros):
+    """Gera as três tabelas com colunas de texto e retorna o total de registros."""
+    return len(gerar_enderecos(num_registros)) + \
+        len(gerar_pacientes(num_registros, range(1, num_registros + 1))) + \
+        len(gerar_log_pagamentos(range(1, num_registros + 1)))
+
+
+def medir(backend, num_registros):
+    """Tempo e registros por segundo da geração com um backend de textos (vocabulário já carregado)."""
+    gerador_dados.BACKEND_TEXTOS = backend
+    semear(SEMENTE)
+    inicio = time.perf_counter()
+    registros = gerar_tabelas(num_registros)
+    segundos = time.perf_counter() - inicio
+    return segundos, registros / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara textos do Faker por registro com o vocabulário pré-sorteado")
+    parser.add_argument('--registros', type=int, default=100000, help="Registros de cada tabela")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        vocabulario.DIRETORIO_VOCABULARIO = diretorio
+        inicio = time.perf_counter()
+        vocabulario.carregar_vocabulario(SEMENTE)
+        frio = time.perf_counter() - inicio
+        # Cache quente: um processo novo só lê o arquivo (simulado limpando o cache em memória)
+        vocabulario._carregados.clear()
+        inicio = time.perf_counter()
+        vocabulario.carregar_vocabulario(SEMENTE)
+        quente = time.perf_counter() - inicio
+
+        resultados = [(backend, *medir(backend, args.registros)) for backend in ('faker', 'vocabulario')]
+
+    print("\n" + "="*60)
+    print(f"Vocabulário ({vocabulario.TAMANHO_VOCABULARIO} valores por campo): "
+          f"construção {frio:.2f}s, leitura do disco {quente:.3f}s")
+    print(f"{'backend':<14}{'tempo (s)':>12}{'registros/s':>16}{'ganho':>10}")
+    print("-"*60)
+    base = resultados[0][2]
+    for backend, segundos, por_segundo in resultados:
+        print(f"{backend:<14}{segundos:>12.2f}{por_segundo:>16,.0f}{por_segundo / base:>9.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
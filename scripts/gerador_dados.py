@@ -1,16 +1,37 @@
+import argparse
+import base64
 import csv
+import hashlib
+import io
+import json
+import time
 from faker import Faker
 from datetime import datetime, timedelta
+from decimal import Decimal
 import random
 import os
+import re
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobServiceClient, BlobBlock, ContentSettings
 from azure.core.exceptions import ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
+import requests
+from requests.adapters import HTTPAdapter
 import logging
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
 
+from identificadores import gerar_cpfs, gerar_emails
+from vocabulario import CAMPOS, carregar_vocabulario, compor_nomes, sortear_textos
+
 
 # Carregar o .env
 load_dotenv()
@@ -30,11 +51,75 @@ DB_CONFIG = {
 # URL de conexão para SQLAlchemy
 DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
+# --- Configurações de carga ---
+# 'copy' usa COPY FROM STDIN (padrão); 'insert' usa o INSERT em lote (executemany)
+METODO_CARGA = os.getenv('METODO_CARGA', 'copy')
+# Quantidade de registros enviada em cada bloco do COPY
+TAMANHO_LOTE_COPY = int(os.getenv('TAMANHO_LOTE_COPY', '50000'))
+# Atribuir as chaves primárias no Python, reservando faixas das sequences,
+# em vez de reler os IDs gerados pelo banco após cada inserção
+ATRIBUIR_IDS_CLIENTE = os.getenv('ATRIBUIR_IDS_CLIENTE', 'true').lower() == 'true'
+
+# --- Configurações de extração ---
+# 'copy' usa COPY (SELECT ...) TO STDOUT (padrão); 'cursor' lê por um cursor no servidor, em lotes
+METODO_EXTRACAO = os.getenv('METODO_EXTRACAO', 'copy')
+# Registros buscados por vez no modo 'cursor'
+TAMANHO_LOTE_EXTRACAO = int(os.getenv('TAMANHO_LOTE_EXTRACAO', '10000'))
+# Tabelas exportadas ao mesmo tempo, cada uma em uma conexão do pool
+NUM_CONEXOES_EXTRACAO = int(os.getenv('NUM_CONEXOES_EXTRACAO', '4'))
+
+# --- Configurações da carga rápida ---
+# Remove os índices secundários e as chaves estrangeiras antes da carga (TRUNCATE ... RESTART IDENTITY no
+# lugar do DELETE) e os recria ao final, validando as FKs uma única vez
+CARGA_RAPIDA = os.getenv('CARGA_RAPIDA', 'true').lower() == 'true'
+# Índices recriados (e FKs validadas) ao mesmo tempo, cada um em uma conexão do pool
+NUM_CONEXOES_INDICES = int(os.getenv('NUM_CONEXOES_INDICES', '4'))
+
+# Coluna de chave primária (SERIAL) de cada tabela do modelo físico
+COLUNAS_ID = {
+    'endereco': 'id_endereco',
+    'odontologista': 'id_odontologista',
+    'paciente': 'id_paciente',
+    'tipo_pagamento': 'id_tipo_pagamento',
+    'procedimento': 'id_procedimento',
+    'agendamento': 'id_agendamento',
+    'consulta': 'id_consulta',
+    'pagamento': 'id_pagamento',
+    'consulta_procedimento': 'id_consulta_procedimento',
+    'log_pagamento': 'id_log',
+}
+
+CAMINHO_MODELO_FISICO = os.path.join(os.path.dirname(__file__), 'modelo_fisico.sql')
+CAMINHO_MODELO_FISICO_PARTICIONADO = os.path.join(os.path.dirname(__file__), 'modelo_fisico_particionado.sql')
+
+# Usar o modelo físico com as tabelas transacionais particionadas por mês (modelo_fisico_particionado.sql)
+MODELO_PARTICIONADO = os.getenv('MODELO_PARTICIONADO', 'false').lower() == 'true'
+# Coluna de data que define a partição mensal de cada tabela no modelo particionado
+COLUNAS_PARTICAO = {
+    'agendamento': 'data_agendamento',
+    'consulta': 'data_hora',
+    'pagamento': 'data_pagamento',
+    'log_pagamento': 'DataHoraOperacao',
+}
+
+# --- Configurações dos arquivos Parquet ---
+# Registros por row group (os lotes são acumulados até atingir esse tamanho)
+PARQUET_LINHAS_POR_GRUPO = int(os.getenv('PARQUET_LINHAS_POR_GRUPO', '100000'))
+# Compressão das colunas: snappy, zstd, gzip ou none
+PARQUET_COMPRESSAO = os.getenv('PARQUET_COMPRESSAO', 'snappy')
+
 # --- Configurações do Azure Storage ---
 # Configure estas variáveis com suas credenciais do Azure
 AZURE_STORAGE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING', '')
 AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME', 'data')
 AZURE_BLOB_PREFIX = ''  # Pasta dentro do container
+# Arquivos enviados ao mesmo tempo
+AZURE_UPLOADS_SIMULTANEOS = int(os.getenv('AZURE_UPLOADS_SIMULTANEOS', '4'))
+# Arquivos maiores que o limiar são divididos em blocos enviados em paralelo (stage_block)
+AZURE_LIMIAR_BLOCOS_MB = int(os.getenv('AZURE_LIMIAR_BLOCOS_MB', '16'))
+AZURE_TAMANHO_BLOCO_MB = int(os.getenv('AZURE_TAMANHO_BLOCO_MB', '8'))
+# Blocos de um mesmo arquivo enviados ao mesmo tempo
+AZURE_CONCORRENCIA_BLOCOS = int(os.getenv('AZURE_CONCORRENCIA_BLOCOS', '4'))
 
 # --- Configuração de logging ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -44,7 +129,8 @@ logger = logging.getLogger(__name__)
 def conectar_db():
     """Conecta ao banco PostgreSQL usando SQLAlchemy."""
     try:
-        engine = create_engine(DATABASE_URL)
+        # O pool comporta as exportações simultâneas de extrair_tabelas_para_arquivos e os índices da carga rápida
+        engine = create_engine(DATABASE_URL, pool_size=max(5, NUM_CONEXOES_EXTRACAO, NUM_CONEXOES_INDICES))
         # Testar conexão
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
@@ -58,14 +144,13 @@ def criar_e_limpar_tabelas(engine):
     """Cria as tabelas através do modelo físico e limpa dados existentes."""
     try:
         # 1. Primeiro, executar o modelo físico para criar as tabelas
-        modelo_fisico_path = os.path.join(os.path.dirname(__file__), 'modelo_fisico.sql')
+        modelo_fisico_path = caminho_modelo_fisico()
         if os.path.exists(modelo_fisico_path):
             logger.info("📋 Criando tabelas através do modelo físico...")
-            with open(modelo_fisico_path, 'r', encoding='utf-8') as file:
-                sql_commands = file.read()
+            remover_tabelas_de_outro_modelo(engine)
             
             # Dividir comandos SQL e executar um por vez
-            commands = [cmd.strip() for cmd in sql_commands.split(';') if cmd.strip()]
+            commands = ler_comandos_modelo_fisico()
             
             with engine.connect() as conn:
                 trans = conn.begin()
@@ -73,7 +158,9 @@ def criar_e_limpar_tabelas(engine):
                     for command in commands:
                         if command.upper().startswith(('CREATE', 'ALTER', 'CREATE INDEX')):
                             try:
-                                conn.execute(text(command))
+                                # Savepoint por comando: um erro de "já existe" não aborta a transação inteira
+                                with conn.begin_nested():
+                                    conn.execute(text(command))
                             except Exception as e:
                                 # Ignorar erros de "já existe" 
                                 if "already exists" in str(e) or "já existe" in str(e):
@@ -170,10 +257,251 @@ def criar_e_limpar_tabelas(engine):
         logger.error(f"❌ Erro ao criar/limpar tabelas: {e}")
         return False
 
-def inserir_dados_tabela(engine, tabela, dados):
-    """Insere dados em uma tabela específica usando SQLAlchemy."""
-    if not dados:
+def caminho_modelo_fisico():
+    """Arquivo do modelo físico em uso: o particionado por mês (MODELO_PARTICIONADO) ou o comum."""
+    return CAMINHO_MODELO_FISICO_PARTICIONADO if MODELO_PARTICIONADO else CAMINHO_MODELO_FISICO
+
+def ler_comandos_modelo_fisico():
+    """Lê os comandos SQL do modelo físico em uso, sem as linhas de comentário, um por item da lista."""
+    with open(caminho_modelo_fisico(), 'r', encoding='utf-8') as file:
+        sql = '\n'.join(linha for linha in file.read().split('\n') if not linha.lstrip().startswith('--'))
+    return [cmd.strip() for cmd in sql.split(';') if cmd.strip()]
+
+def remover_tabelas_de_outro_modelo(engine):
+    """Remove as tabelas transacionais criadas pelo outro modelo físico (particionadas x comuns).
+    
+    CREATE TABLE IF NOT EXISTS não converte uma tabela existente; como a carga esvazia as tabelas de
+    qualquer forma, as do outro modelo são removidas e recriadas pelo modelo em uso.
+    """
+    tipo_esperado = 'p' if MODELO_PARTICIONADO else 'r'
+    with engine.begin() as conn:
+        existentes = conn.execute(
+            text("SELECT relname, relkind FROM pg_class WHERE relname = ANY(:tabelas) AND pg_table_is_visible(oid)"),
+            {'tabelas': list(COLUNAS_PARTICAO)}
+        ).fetchall()
+        for tabela, tipo in existentes:
+            if tipo != tipo_esperado:
+                logger.info(f"🔁 Tabela {tabela} criada pelo outro modelo físico: removendo para recriar")
+                conn.execute(text(f"DROP TABLE {tabela} CASCADE"))
+    _particoes_criadas.clear()
+
+# --- Carga rápida: índices e chaves estrangeiras recriados só depois da carga ---
+def ler_estrutura_modelo_fisico():
+    """Separa os comandos do modelo físico em tabelas, índices secundários e chaves estrangeiras.
+    
+    Retorna {'tabelas': [sql], 'indices': [(nome, tabela, sql)], 'chaves_estrangeiras': [(nome, tabela, sql)]}.
+    """
+    comandos = ler_comandos_modelo_fisico()
+    
+    estrutura = {'tabelas': [], 'indices': [], 'chaves_estrangeiras': []}
+    for comando in comandos:
+        indice = re.match(r'CREATE\s+INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)', comando, re.I)
+        fk = re.match(r'ALTER\s+TABLE\s+(\w+)\s+ADD\s+CONSTRAINT\s+(\w+)\s+FOREIGN\s+KEY', comando, re.I)
+        if re.match(r'CREATE\s+TABLE', comando, re.I):
+            estrutura['tabelas'].append(comando)
+        elif indice:
+            estrutura['indices'].append((indice.group(1), indice.group(2), comando))
+        elif fk:
+            estrutura['chaves_estrangeiras'].append((fk.group(2), fk.group(1), comando))
+    return estrutura
+
+def medir_fase(metricas, fase, funcao, *args):
+    """Executa uma fase da carga rápida, registra o tempo no relatório e retorna o resultado da função."""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    registrar_metrica(metricas, fase, None, None, None, segundos)
+    logger.info(f"⏱️  {fase}: {segundos:.2f}s")
+    return resultado
+
+def executar_em_paralelo(engine, grupos, conexoes):
+    """Executa cada grupo de comandos SQL em uma conexão própria do pool, até `conexoes` grupos ao mesmo tempo."""
+    def executar_grupo(comandos):
+        with engine.begin() as conn:
+            for comando in comandos:
+                conn.execute(text(comando))
+    
+    with ThreadPoolExecutor(max_workers=max(1, conexoes)) as pool:
+        # list() propaga a primeira exceção de qualquer grupo
+        list(pool.map(executar_grupo, grupos))
+
+def preparar_carga_rapida(engine, metricas=None):
+    """Cria as tabelas, remove índices secundários e chaves estrangeiras e esvazia tudo com TRUNCATE.
+    
+    TRUNCATE ... RESTART IDENTITY zera as sequences de todas as tabelas em um único comando, sem depender
+    do nome de cada sequence. Retorna a estrutura do modelo físico, usada depois em restaurar_indices_e_fks.
+    """
+    estrutura = ler_estrutura_modelo_fisico()
+    logger.info(f"⚡ Carga rápida: {len(estrutura['indices'])} índices e "
+                f"{len(estrutura['chaves_estrangeiras'])} chaves estrangeiras recriados após a carga")
+    
+    def criar_tabelas():
+        remover_tabelas_de_outro_modelo(engine)
+        with engine.begin() as conn:
+            for comando in estrutura['tabelas']:
+                conn.execute(text(comando))
+    
+    def remover_indices_e_fks():
+        with engine.begin() as conn:
+            for nome, tabela, _ in estrutura['chaves_estrangeiras']:
+                conn.execute(text(f"ALTER TABLE {tabela} DROP CONSTRAINT IF EXISTS {nome}"))
+            for nome, _, _ in estrutura['indices']:
+                conn.execute(text(f"DROP INDEX IF EXISTS {nome}"))
+    
+    def esvaziar_tabelas():
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {', '.join(COLUNAS_ID)} RESTART IDENTITY CASCADE"))
+    
+    medir_fase(metricas, 'criacao_tabelas', criar_tabelas)
+    medir_fase(metricas, 'remocao_indices_fks', remover_indices_e_fks)
+    medir_fase(metricas, 'truncate', esvaziar_tabelas)
+    return estrutura
+
+def restaurar_indices_e_fks(engine, estrutura, metricas=None, conexoes=None):
+    """Recria os índices e as chaves estrangeiras removidos em preparar_carga_rapida e valida as FKs uma vez.
+    
+    Os índices são construídos em paralelo (CREATE INDEX só bloqueia escritas, então vários índices da mesma
+    tabela podem ser construídos juntos). As FKs entram como NOT VALID, o que não lê as tabelas, e a
+    validação de cada uma é uma varredura única; validações de tabelas diferentes rodam em paralelo.
+    """
+    conexoes = conexoes or NUM_CONEXOES_INDICES
+    
+    def recriar_indices():
+        executar_em_paralelo(engine, [
+            [re.sub(r'CREATE\s+INDEX\s+(?!IF\s+NOT\s+EXISTS)', 'CREATE INDEX IF NOT EXISTS ', sql, flags=re.I)]
+            for _, _, sql in estrutura['indices']
+        ], conexoes)
+    
+    # O PostgreSQL não aceita FK NOT VALID em tabela particionada: ali a FK é criada já validada
+    particionadas = tabelas_particionadas()
+    
+    def criar_fks():
+        # ADD CONSTRAINT bloqueia as duas tabelas da FK: feito em uma transação curta, sem varrer os dados
+        with engine.begin() as conn:
+            for nome, tabela, sql in estrutura['chaves_estrangeiras']:
+                conn.execute(text(f"ALTER TABLE {tabela} DROP CONSTRAINT IF EXISTS {nome}"))
+                conn.execute(text(sql if tabela in particionadas else f"{sql} NOT VALID"))
+    
+    def validar_fks():
+        # VALIDATE CONSTRAINT não roda duas vezes ao mesmo tempo na mesma tabela: um grupo por tabela
+        por_tabela = {}
+        for nome, tabela, _ in estrutura['chaves_estrangeiras']:
+            if tabela in particionadas:
+                continue
+            por_tabela.setdefault(tabela, []).append(f"ALTER TABLE {tabela} VALIDATE CONSTRAINT {nome}")
+        executar_em_paralelo(engine, list(por_tabela.values()), conexoes)
+    
+    def atualizar_estatisticas():
+        executar_em_paralelo(engine, [[f"ANALYZE {tabela}"] for tabela in COLUNAS_ID], conexoes)
+    
+    medir_fase(metricas, 'recriacao_indices', recriar_indices)
+    medir_fase(metricas, 'criacao_fks', criar_fks)
+    medir_fase(metricas, 'validacao_fks', validar_fks)
+    medir_fase(metricas, 'analyze', atualizar_estatisticas)
+    logger.info("✅ Índices e chaves estrangeiras recriados e validados")
+
+def _formatar_valor_copy(valor):
+    """Converte um valor Python para o formato texto do COPY (NULL como \\N e caracteres de controle escapados)."""
+    if valor is None:
+        return '\\N'
+    return str(valor).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def inserir_dados_copy(engine, tabela, dados, tamanho_lote=TAMANHO_LOTE_COPY):
+    """Insere dados via COPY FROM STDIN, enviando os registros em blocos de texto de tamanho_lote linhas.
+    
+    Retorna o número de bytes enviados ao banco.
+    """
+    colunas = list(dados[0].keys())
+    comando = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN"
+    
+    # COPY não é exposto pelo SQLAlchemy, então usamos a conexão psycopg2 subjacente
+    conn = engine.raw_connection()
+    enviados = 0
+    try:
+        with conn.cursor() as cursor:
+            for inicio in range(0, len(dados), tamanho_lote):
+                buffer = io.StringIO()
+                for registro in dados[inicio:inicio + tamanho_lote]:
+                    buffer.write('\t'.join(_formatar_valor_copy(registro[coluna]) for coluna in colunas))
+                    buffer.write('\n')
+                enviados += len(buffer.getvalue().encode('utf-8'))
+                buffer.seek(0)
+                cursor.copy_expert(comando, buffer)
+        # Todos os blocos são confirmados na mesma transação
+        conn.commit()
+        return enviados
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# --- Partições mensais (modelo particionado) ---
+# Partições já criadas neste processo: {(tabela, ano, mês)}
+_particoes_criadas = set()
+
+def tabelas_particionadas():
+    """Tabelas particionadas por mês no modelo físico em uso: {tabela: coluna de data}."""
+    return COLUNAS_PARTICAO if MODELO_PARTICIONADO else {}
+
+def nome_particao(tabela, ano, mes):
+    """Nome da partição mensal de uma tabela (ex.: agendamento_2024_03)."""
+    return f"{tabela}_{ano}_{mes:02d}"
+
+def criar_particoes_mensais(engine, tabela, meses):
+    """Cria as partições mensais de uma tabela para os meses (ano, mês) informados que ainda não existem."""
+    novos = sorted(mes for mes in set(meses) if (tabela, *mes) not in _particoes_criadas)
+    if not novos:
         return
+    with engine.begin() as conn:
+        for ano, mes in novos:
+            proximo = (ano + mes // 12, mes % 12 + 1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {nome_particao(tabela, ano, mes)} PARTITION OF {tabela} "
+                f"FOR VALUES FROM ('{ano}-{mes:02d}-01') TO ('{proximo[0]}-{proximo[1]:02d}-01')"
+            ))
+    _particoes_criadas.update((tabela, *mes) for mes in novos)
+    logger.debug(f"{len(novos)} partições mensais criadas em {tabela}")
+
+def inserir_dados_particionados(engine, tabela, coluna, dados, metodo=None, tamanho_lote=None):
+    """Separa os registros por mês da coluna de partição e carrega cada grupo direto na sua partição.
+    
+    As partições que faltam são criadas antes da carga, e o COPY em cada partição dispensa o roteamento
+    linha a linha pela tabela pai. Registros sem data vão para a partição padrão.
+    """
+    por_mes = {}
+    for registro in dados:
+        data = registro[coluna]
+        por_mes.setdefault((data.year, data.month) if data else None, []).append(registro)
+    
+    criar_particoes_mensais(engine, tabela, [mes for mes in por_mes if mes])
+    return sum(
+        inserir_dados_tabela(engine, nome_particao(tabela, *mes) if mes else f"{tabela}_padrao", registros,
+                             metodo, tamanho_lote)
+        for mes, registros in por_mes.items()
+    )
+
+def inserir_dados_tabela(engine, tabela, dados, metodo=None, tamanho_lote=None):
+    """Insere dados em uma tabela específica via COPY, com fallback para INSERT em lote usando SQLAlchemy.
+    
+    No modelo particionado, as tabelas particionadas são carregadas partição a partição.
+    Retorna os bytes enviados pelo COPY (0 quando a carga é feita por INSERT).
+    """
+    if not dados:
+        return 0
+    
+    coluna_particao = tabelas_particionadas().get(tabela)
+    if coluna_particao:
+        return inserir_dados_particionados(engine, tabela, coluna_particao, dados, metodo, tamanho_lote)
+    
+    metodo = metodo or METODO_CARGA
+    if metodo == 'copy':
+        try:
+            enviados = inserir_dados_copy(engine, tabela, dados, tamanho_lote or TAMANHO_LOTE_COPY)
+            logger.debug(f"✅ {len(dados)} registros inseridos na tabela {tabela} via COPY")
+            return enviados
+        except Exception as e:
+            logger.warning(f"⚠️  COPY falhou na tabela {tabela}, usando INSERT em lote: {e}")
     
     try:
         with engine.connect() as conn:
@@ -188,7 +516,8 @@ def inserir_dados_tabela(engine, tabela, dados):
                 conn.execute(query, dados)
                 trans.commit()
                 
-                logger.info(f"✅ {len(dados)} registros inseridos na tabela {tabela}")
+                logger.debug(f"✅ {len(dados)} registros inseridos na tabela {tabela}")
+                return 0
                 
             except Exception as e:
                 trans.rollback()
@@ -198,45 +527,286 @@ def inserir_dados_tabela(engine, tabela, dados):
         logger.error(f"❌ Erro ao inserir dados na tabela {tabela}: {e}")
         raise
 
-def extrair_dados_para_csv(engine, tabela, diretorio_saida):
-    """Extrai dados de uma tabela e salva em CSV usando SQLAlchemy."""
+# Próximo ID de cada tabela quando não há banco (geração apenas para arquivos)
+_proximos_ids = {}
+
+def reservar_faixa_ids(engine, tabela, quantidade):
+    """Reserva um bloco contíguo de IDs na sequence da tabela e retorna a faixa reservada."""
+    if quantidade <= 0:
+        return range(0)
+    
+    if engine is None:
+        inicio = _proximos_ids.get(tabela, 1)
+        _proximos_ids[tabela] = inicio + quantidade
+        return range(inicio, inicio + quantidade)
+    
+    with engine.begin() as conn:
+        sequence = conn.execute(
+            text("SELECT pg_get_serial_sequence(:tabela, :coluna)"),
+            {'tabela': tabela, 'coluna': COLUNAS_ID[tabela]}
+        ).scalar()
+        # nextval + setval avançam a sequence de uma só vez; o gerador é o único
+        # escritor durante a carga, então ninguém consome valores no meio do bloco
+        inicio = conn.execute(
+            text("SELECT setval(:sequence, nextval(:sequence) + :quantidade - 1) - :quantidade + 1"),
+            {'sequence': sequence, 'quantidade': quantidade}
+        ).scalar()
+    
+    return range(inicio, inicio + quantidade)
+
+def atribuir_ids(engine, tabela, dados):
+    """Atribui chaves primárias aos registros a partir de uma faixa reservada na sequence."""
+    ids = reservar_faixa_ids(engine, tabela, len(dados))
+    coluna_id = COLUNAS_ID[tabela]
+    for id_registro, registro in zip(ids, dados):
+        registro[coluna_id] = id_registro
+    return ids
+
+def buscar_ids(engine, tabela):
+    """Busca no banco os IDs gerados para uma tabela."""
+    coluna_id = COLUNAS_ID[tabela]
+    with engine.connect() as conn:
+        result = conn.execute(text(f"SELECT {coluna_id} FROM {tabela} ORDER BY {coluna_id}"))
+        return [row[0] for row in result.fetchall()]
+
+def ler_colunas_modelo_fisico():
+    """Lê do modelo_fisico.sql as colunas (nome, tipo) de cada tabela, na ordem em que foram declaradas."""
+    with open(CAMINHO_MODELO_FISICO, 'r', encoding='utf-8') as file:
+        sql = file.read()
+    
+    colunas = {}
+    for tabela, corpo in re.findall(r'CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\n\);', sql, re.S):
+        colunas[tabela] = []
+        for linha in corpo.split('\n'):
+            linha = linha.strip().rstrip(',')
+            if linha and not linha.upper().startswith('PRIMARY KEY'):
+                nome, tipo = linha.split()[:2]
+                colunas[tabela].append((nome, tipo))
+    return colunas
+
+def registrar_metrica(metricas, etapa, tabela, registros, bytes_processados, segundos):
+    """Acrescenta ao relatório de execução as medidas de uma etapa para uma tabela (ou arquivo)."""
+    if metricas is None:
+        return
+    metricas.append({
+        'etapa': etapa,
+        'tabela': tabela,
+        'registros': registros,
+        'bytes': bytes_processados,
+        'segundos': round(segundos, 3),
+        'registros_por_segundo': round(registros / segundos, 1) if registros and segundos else None,
+    })
+
+def tipo_arrow(tipo_sql):
+    """Converte um tipo do modelo físico no tipo Arrow/Parquet correspondente."""
+    tipo_sql = tipo_sql.lower()
+    if tipo_sql in ('int', 'serial'):
+        return pa.int32()
+    if tipo_sql == 'date':
+        return pa.date32()
+    if tipo_sql == 'timestamp':
+        # Sem fuso, como as datas do gerador e o texto do CSV: o Spark lê o mesmo horário dos dois formatos,
+        # qualquer que seja o spark.sql.session.timeZone (com tz='UTC', o horário mudaria fora de UTC)
+        return pa.timestamp('us')
+    if tipo_sql.startswith('decimal'):
+        precisao, escala = re.findall(r'\d+', tipo_sql)
+        return pa.decimal128(int(precisao), int(escala))
+    # varchar, char e text
+    return pa.string()
+
+def esquema_parquet(tabela):
+    """Monta o esquema Arrow de uma tabela a partir do modelo_fisico.sql."""
+    return pa.schema([(nome, tipo_arrow(tipo)) for nome, tipo in ler_colunas_modelo_fisico()[tabela]])
+
+class EscritorCSV:
+    """Grava os lotes de uma tabela em um arquivo CSV, com as colunas na ordem do modelo físico."""
+    
+    def __init__(self, diretorio, tabela):
+        self.caminho = os.path.join(diretorio, f"{tabela}.csv")
+        self.arquivo = open(self.caminho, 'w', newline='', encoding='utf-8')
+        colunas = [nome for nome, _ in ler_colunas_modelo_fisico()[tabela]]
+        self.writer = csv.DictWriter(self.arquivo, fieldnames=colunas)
+        self.writer.writeheader()
+    
+    def escrever(self, lote):
+        self.writer.writerows(lote)
+    
+    def fechar(self):
+        self.arquivo.close()
+
+class EscritorParquet:
+    """Grava os lotes de uma tabela em um arquivo Parquet tipado, acumulando-os em row groups."""
+    
+    def __init__(self, diretorio, tabela, linhas_por_grupo=None, compressao=None):
+        self.caminho = os.path.join(diretorio, f"{tabela}.parquet")
+        self.esquema = esquema_parquet(tabela)
+        self.linhas_por_grupo = linhas_por_grupo or PARQUET_LINHAS_POR_GRUPO
+        self.writer = pq.ParquetWriter(self.caminho, self.esquema, compression=compressao or PARQUET_COMPRESSAO)
+        self.pendentes = []
+    
+    def escrever(self, lote):
+        self.pendentes.extend(lote)
+        while len(self.pendentes) >= self.linhas_por_grupo:
+            self._gravar_grupo(self.pendentes[:self.linhas_por_grupo])
+            self.pendentes = self.pendentes[self.linhas_por_grupo:]
+    
+    def fechar(self):
+        if self.pendentes:
+            self._gravar_grupo(self.pendentes)
+            self.pendentes = []
+        self.writer.close()
+    
+    def _gravar_grupo(self, registros):
+        colunas = []
+        for campo in self.esquema:
+            valores = [registro.get(campo.name) for registro in registros]
+            if pa.types.is_decimal(campo.type):
+                # valor_pago é gerado como float; o Arrow só converte Decimal para decimal128
+                valores = [None if valor is None else Decimal(f"{valor:.2f}") for valor in valores]
+            colunas.append(pa.array(valores, type=campo.type))
+        self.writer.write_table(pa.Table.from_arrays(colunas, schema=self.esquema), row_group_size=len(registros))
+
+ESCRITORES = {
+    'csv': EscritorCSV,
+    'parquet': EscritorParquet,
+}
+
+def processar_tabela(engine, tabela, lotes, num_registros=None, diretorio_saida=None, metricas=None, formatos=('csv',)):
+    """Consome os lotes gerados de uma tabela, enviando cada um ao banco e aos arquivos assim que fica pronto.
+    
+    Para tabelas com dependentes, num_registros é o total esperado e os IDs da tabela são retornados.
+    Com metricas, registra registros, bytes (dos arquivos, ou do COPY sem arquivos) e o tempo de geração + carga.
+    """
+    inicio_etapa = time.perf_counter()
+    ids = None
+    if ATRIBUIR_IDS_CLIENTE and num_registros is not None:
+        # Faixa reservada de uma vez; cada lote recebe a sua fatia, em ordem
+        ids = reservar_faixa_ids(engine, tabela, num_registros)
+    
+    escritores = []
+    if diretorio_saida:
+        os.makedirs(diretorio_saida, exist_ok=True)
+        escritores = [ESCRITORES[formato](diretorio_saida, tabela) for formato in formatos]
+    
+    total = 0
+    bytes_copy = 0
     try:
-        # Determinar o nome da coluna ID dinamicamente
-        id_column = f"id_{tabela}"
-        if tabela == "consulta_procedimento":
-            id_column = "id_consulta_procedimento"
-        elif tabela == "log_pagamento":
-            id_column = "id_log"
-        elif tabela == "tipo_pagamento":
-            id_column = "id_tipo_pagamento"
-        
-        query = text(f"SELECT * FROM {tabela} ORDER BY {id_column}")
-        
-        with engine.connect() as conn:
-            result = conn.execute(query)
-            rows = result.fetchall()
-            columns = result.keys()
+        for lote in lotes:
+            if ATRIBUIR_IDS_CLIENTE:
+                if ids is not None:
+                    coluna_id = COLUNAS_ID[tabela]
+                    for id_registro, registro in zip(ids[total:total + len(lote)], lote):
+                        registro[coluna_id] = id_registro
+                else:
+                    atribuir_ids(engine, tabela, lote)
+            if engine is not None:
+                bytes_copy += inserir_dados_tabela(engine, tabela, lote)
+            for escritor in escritores:
+                escritor.escrever(lote)
+            total += len(lote)
+    finally:
+        for escritor in escritores:
+            escritor.fechar()
+    
+    bytes_processados = sum(os.path.getsize(escritor.caminho) for escritor in escritores) if escritores else bytes_copy
+    registrar_metrica(metricas, 'geracao_carga', tabela, total, bytes_processados, time.perf_counter() - inicio_etapa)
+    logger.info(f"✅ {total} registros processados na tabela {tabela}")
+    if num_registros is None:
+        return None
+    if ids is not None:
+        return ids[:total]
+    return buscar_ids(engine, tabela)
+
+def extrair_dados_para_csv(engine, tabela, diretorio_saida, metodo=None, metricas=None):
+    """Extrai dados de uma tabela e salva em CSV, gravando o arquivo aos poucos (memória constante).
+    
+    metodo 'copy' usa COPY (SELECT ...) TO STDOUT; 'cursor' lê com um cursor no servidor (yield_per).
+    """
+    try:
+        inicio = time.perf_counter()
+        id_column = COLUNAS_ID[tabela]
+        consulta = f"SELECT * FROM {tabela} ORDER BY {id_column}"
         
         # Criar diretório se não existir
         os.makedirs(diretorio_saida, exist_ok=True)
-        
-        # Salvar CSV
         arquivo_csv = os.path.join(diretorio_saida, f"{tabela}.csv")
         
+        metodo = metodo or METODO_EXTRACAO
         with open(arquivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            # Escrever cabeçalho
-            writer.writerow(columns)
-            # Escrever dados
-            writer.writerows(rows)
+            if metodo == 'copy':
+                # COPY não é exposto pelo SQLAlchemy, então usamos a conexão psycopg2 subjacente
+                conn = engine.raw_connection()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.copy_expert(f"COPY ({consulta}) TO STDOUT WITH (FORMAT csv, HEADER)", csvfile)
+                        registros = cursor.rowcount
+                    conn.commit()
+                finally:
+                    conn.close()
+            else:
+                with engine.connect() as conn:
+                    result = conn.execution_options(stream_results=True, yield_per=TAMANHO_LOTE_EXTRACAO).execute(text(consulta))
+                    writer = csv.writer(csvfile)
+                    # Escrever cabeçalho
+                    writer.writerow(result.keys())
+                    registros = 0
+                    for lote in result.partitions():
+                        writer.writerows(lote)
+                        registros += len(lote)
         
-        logger.info(f"✅ Dados da tabela {tabela} salvos em {arquivo_csv} ({len(rows)} registros)")
+        registrar_metrica(metricas, 'extracao', tabela, registros, os.path.getsize(arquivo_csv), time.perf_counter() - inicio)
+        logger.info(f"✅ Dados da tabela {tabela} salvos em {arquivo_csv} ({registros} registros)")
         return arquivo_csv
     except Exception as e:
         logger.error(f"❌ Erro ao extrair dados da tabela {tabela}: {e}")
         return None
 
+def extrair_dados_para_parquet(engine, tabela, diretorio_saida, metricas=None):
+    """Extrai dados de uma tabela para Parquet tipado, lendo com um cursor no servidor (yield_per)."""
+    try:
+        inicio = time.perf_counter()
+        id_column = COLUNAS_ID[tabela]
+        os.makedirs(diretorio_saida, exist_ok=True)
+        
+        escritor = EscritorParquet(diretorio_saida, tabela)
+        # O PostgreSQL devolve as colunas em minúsculas: usar os nomes do modelo, na mesma ordem
+        colunas = escritor.esquema.names
+        registros = 0
+        try:
+            with engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=TAMANHO_LOTE_EXTRACAO).execute(
+                    text(f"SELECT * FROM {tabela} ORDER BY {id_column}")
+                )
+                for lote in result.partitions():
+                    escritor.escrever([dict(zip(colunas, linha)) for linha in lote])
+                    registros += len(lote)
+        finally:
+            escritor.fechar()
+        
+        registrar_metrica(metricas, 'extracao', tabela, registros, os.path.getsize(escritor.caminho), time.perf_counter() - inicio)
+        logger.info(f"✅ Dados da tabela {tabela} salvos em {escritor.caminho} ({registros} registros)")
+        return escritor.caminho
+    except Exception as e:
+        logger.error(f"❌ Erro ao extrair dados da tabela {tabela}: {e}")
+        return None
+
+def extrair_tabelas_para_arquivos(engine, tabelas, diretorio_saida, formatos=('csv',), metodo=None, metricas=None, num_conexoes=None):
+    """Exporta várias tabelas para CSV e/ou Parquet ao mesmo tempo, uma por conexão.
+    
+    Retorna os arquivos gerados, na ordem das tabelas.
+    """
+    def extrair(tarefa):
+        tabela, formato = tarefa
+        if formato == 'parquet':
+            return extrair_dados_para_parquet(engine, tabela, diretorio_saida, metricas)
+        return extrair_dados_para_csv(engine, tabela, diretorio_saida, metodo, metricas)
+    
+    tarefas = [(tabela, formato) for tabela in tabelas for formato in formatos]
+    with ThreadPoolExecutor(max_workers=num_conexoes or NUM_CONEXOES_EXTRACAO) as executor:
+        return [arquivo for arquivo in executor.map(extrair, tarefas) if arquivo]
+
 # --- Configurações de dados ---
+# Volumes do fator de escala 1 (ver calcular_volumes e --fator-escala)
 NUM_ENDERECOS = 20000
 NUM_ODONTOLOGISTAS = 70 # Número mais realista para odontologistas
 NUM_PACIENTES = 30000
@@ -244,15 +814,74 @@ NUM_TIPOS_PAGAMENTO = 5
 NUM_PROCEDIMENTOS = 60
 NUM_AGENDAMENTOS = 70000 # Tabela transacional principal
 # Assumindo que 90% dos agendamentos viram consultas
-NUM_CONSULTAS = int(NUM_AGENDAMENTOS * 0.9)
+PROPORCAO_CONSULTAS = 0.9
+NUM_CONSULTAS = int(NUM_AGENDAMENTOS * PROPORCAO_CONSULTAS)
 # Assumindo que 95% das consultas geram um pagamento
-NUM_PAGAMENTOS = int(NUM_CONSULTAS * 0.95)
+PROPORCAO_PAGAMENTOS = 0.95
+NUM_PAGAMENTOS = int(NUM_CONSULTAS * PROPORCAO_PAGAMENTOS)
 # Cada consulta pode ter de 1 a 3 procedimentos
 MIN_PROC_POR_CONSULTA = 1
 MAX_PROC_POR_CONSULTA = 3
 
+# --- Configurações de geração paralela ---
+# Número de processos usados na geração (1 gera tudo no processo principal)
+NUM_PROCESSOS = int(os.getenv('NUM_PROCESSOS', str(os.cpu_count() or 1)))
+# Registros por fragmento. Como o tamanho é fixo, o resultado não depende do número de processos
+TAMANHO_FRAGMENTO = int(os.getenv('TAMANHO_FRAGMENTO', '10000'))
+# Semente base: cada fragmento recebe uma semente derivada dela
+SEMENTE = int(os.getenv('SEMENTE', '42'))
+# 'numpy' sorteia colunas numéricas, datas e chaves estrangeiras em vetores NumPy;
+# 'python' usa uma chamada random/Faker por registro
+BACKEND_GERACAO = os.getenv('BACKEND_GERACAO', 'numpy')
+# 'vocabulario' monta as colunas de texto (nomes, logradouros, bairros, cidades, usuários...) sorteando
+# índices de conjuntos pré-sorteados do Faker e guardados em disco (ver vocabulario.py);
+# 'faker' chama o Faker uma vez por valor
+BACKEND_TEXTOS = os.getenv('BACKEND_TEXTOS', 'vocabulario')
+
+# Gerador NumPy do processo atual (ressemeado em cada fragmento por semear)
+rng = np.random.default_rng(SEMENTE)
+
+def calcular_volumes(fator_escala=1.0, volumes=None, proporcao_consultas=None, proporcao_pagamentos=None):
+    """Calcula o número de registros de cada tabela para um fator de escala (1 = volumes padrão).
+    
+    Endereços, odontologistas, pacientes e agendamentos crescem com o fator; procedimentos e tipos
+    de pagamento são catálogos fixos. volumes substitui o total de tabelas específicas.
+    """
+    volumes = volumes or {}
+    proporcao_consultas = PROPORCAO_CONSULTAS if proporcao_consultas is None else proporcao_consultas
+    proporcao_pagamentos = PROPORCAO_PAGAMENTOS if proporcao_pagamentos is None else proporcao_pagamentos
+    
+    def escalar(tabela, volume_base):
+        return volumes.get(tabela, max(1, round(volume_base * fator_escala)))
+    
+    resultado = {
+        'endereco': escalar('endereco', NUM_ENDERECOS),
+        'odontologista': escalar('odontologista', NUM_ODONTOLOGISTAS),
+        'procedimento': volumes.get('procedimento', NUM_PROCEDIMENTOS),
+        'paciente': escalar('paciente', NUM_PACIENTES),
+        'agendamento': escalar('agendamento', NUM_AGENDAMENTOS),
+    }
+    resultado['consulta'] = volumes.get('consulta', int(resultado['agendamento'] * proporcao_consultas))
+    resultado['pagamento'] = volumes.get('pagamento', int(resultado['consulta'] * proporcao_pagamentos))
+    return resultado
+
 # --- Funções de Geração ---
 
+def semear(semente):
+    """Inicializa os geradores aleatórios (random, Faker e NumPy) do processo atual."""
+    global rng
+    random.seed(semente)
+    fake.seed_instance(semente)
+    rng = np.random.default_rng(semente)
+
+def semente_fragmento(semente, tabela, indice_fragmento):
+    """Deriva de forma determinística a semente de um fragmento de uma tabela."""
+    return zlib.crc32(f"{semente}:{tabela}:{indice_fragmento}".encode())
+
+def gerar_email_unico(indice):
+    """Gera o email do paciente de índice global `indice`; o sufixo numérico garante a unicidade."""
+    return f"{fake.user_name()}.{indice + 1}@{fake.free_email_domain()}"
+
 def gerar_datas_tres_anos():
     """Gera uma data aleatória nos últimos 3 anos."""
     end_date = datetime.now()
@@ -265,22 +894,125 @@ def gerar_data_nascimento():
     start_date = datetime.now() - timedelta(days=80*365) # Máximo 80 anos
     return fake.date_of_birth(minimum_age=18, maximum_age=80)
 
+# --- Sorteio de colunas ---
+# Cada função sorteia uma coluna inteira de uma vez. Com BACKEND_GERACAO='numpy' os
+# valores saem de vetores NumPy; com 'python', de uma chamada random/Faker por registro.
+
+def sortear_datas_tres_anos(num):
+    """Sorteia `num` datas/horas nos últimos 3 anos."""
+    if BACKEND_GERACAO != 'numpy':
+        return [gerar_datas_tres_anos() for _ in range(num)]
+    fim = np.datetime64(datetime.now(), 'us')
+    inicio = fim - np.timedelta64(3*365, 'D')
+    deslocamentos = rng.integers(0, (fim - inicio).astype(np.int64), num)
+    return (inicio + deslocamentos.astype('timedelta64[us]')).tolist()
+
+def sortear_datas_nascimento(num):
+    """Sorteia `num` datas de nascimento de adultos (18-80 anos)."""
+    if BACKEND_GERACAO != 'numpy':
+        return [gerar_data_nascimento() for _ in range(num)]
+    hoje = np.datetime64(datetime.now().date(), 'D')
+    inicio = hoje - np.timedelta64(80*365, 'D')
+    dias = rng.integers(0, (80 - 18)*365, num)
+    return (inicio + dias.astype('timedelta64[D]')).tolist()
+
+def sortear_valores(num, minimo, maximo):
+    """Sorteia `num` valores monetários uniformes entre minimo e maximo, com 2 casas decimais."""
+    if BACKEND_GERACAO != 'numpy':
+        return [round(random.uniform(minimo, maximo), 2) for _ in range(num)]
+    return np.round(rng.uniform(minimo, maximo, num), 2).tolist()
+
+def sortear_inteiros(num, minimo, maximo):
+    """Sorteia `num` inteiros entre minimo e maximo (inclusive)."""
+    if BACKEND_GERACAO != 'numpy':
+        return [random.randint(minimo, maximo) for _ in range(num)]
+    return rng.integers(minimo, maximo + 1, num).tolist()
+
+def sortear_probabilidades(num):
+    """Sorteia `num` números uniformes em [0, 1)."""
+    if BACKEND_GERACAO != 'numpy':
+        return [random.random() for _ in range(num)]
+    return rng.random(num).tolist()
+
+def sortear_elementos(sequencia, num):
+    """Sorteia `num` elementos de uma sequência, com reposição (equivalente a random.choice)."""
+    if BACKEND_GERACAO != 'numpy':
+        return [random.choice(sequencia) for _ in range(num)]
+    indices = rng.integers(0, len(sequencia), num)
+    if isinstance(sequencia, range):
+        # Faixas de IDs (ver atribuir_ids) são sorteadas aritmeticamente, sem materializar a lista
+        return (sequencia.start + indices * sequencia.step).tolist()
+    return np.asarray(sequencia)[indices].tolist()
+
+def sortear_amostra(sequencia, num):
+    """Sorteia `num` elementos distintos de uma sequência (equivalente a random.sample)."""
+    if BACKEND_GERACAO != 'numpy':
+        return random.sample(sequencia, num)
+    indices = rng.choice(len(sequencia), num, replace=False)
+    if isinstance(sequencia, range):
+        return (sequencia.start + indices * sequencia.step).tolist()
+    return np.asarray(sequencia)[indices].tolist()
+
+def sortear_subconjuntos(sequencia, tamanhos):
+    """Sorteia, para cada tamanho k, um subconjunto de k elementos distintos da sequência."""
+    if BACKEND_GERACAO != 'numpy':
+        return [random.sample(sequencia, k) for k in tamanhos]
+    valores = np.asarray(sequencia)
+    tamanhos = np.asarray(tamanhos)
+    maior = int(tamanhos.max()) if len(tamanhos) else 0
+    if maior == 0:
+        return [[] for _ in tamanhos]
+    # Os `maior` menores de uma linha de chaves aleatórias formam um subconjunto uniforme;
+    # as linhas são processadas em blocos para limitar a matriz a ~1M de células
+    subconjuntos = []
+    linhas_por_bloco = max(1, 1_000_000 // len(valores))
+    for inicio in range(0, len(tamanhos), linhas_por_bloco):
+        bloco = tamanhos[inicio:inicio + linhas_por_bloco]
+        chaves = rng.random((len(bloco), len(valores)))
+        escolhidos = np.argpartition(chaves, maior - 1, axis=1)[:, :maior]
+        subconjuntos.extend(valores[linha[:k]].tolist() for linha, k in zip(escolhidos, bloco))
+    return subconjuntos
+
+def sortear_campo_texto(campo, num):
+    """Sorteia `num` textos de um campo do vocabulário (ver vocabulario.CAMPOS), ex.: 'bairro'."""
+    if BACKEND_TEXTOS != 'vocabulario':
+        return [CAMPOS[campo](fake) for _ in range(num)]
+    # O vocabulário é o da semente base: os fragmentos só sorteiam índices diferentes dele
+    return sortear_textos(carregar_vocabulario(SEMENTE), campo, rng, num)
+
+def sortear_nomes(num):
+    """Sorteia `num` nomes completos de pessoas."""
+    if BACKEND_TEXTOS != 'vocabulario':
+        return [fake.name() for _ in range(num)]
+    return compor_nomes(carregar_vocabulario(SEMENTE), rng, num)
+
+def sortear_emails(inicio, nomes):
+    """Emails dos pacientes de índices globais inicio, inicio+1, ... (um por nome); o sufixo numérico garante a unicidade."""
+    if BACKEND_TEXTOS != 'vocabulario':
+        return [gerar_email_unico(inicio + i) for i in range(len(nomes))]
+    # O usuário vem do nome do próprio paciente (ex.: ana.lima.15@gmail.com)
+    return gerar_emails(range(inicio, inicio + len(nomes)), nomes, sortear_campo_texto('dominio', len(nomes)))
+
 # 1. Tabela endereco
 def gerar_enderecos(num_registros):
     """Gera dados para a tabela endereco."""
+    # Um terço dos endereços tem complemento
+    tem_complemento = sortear_probabilidades(num_registros)
+    colunas = ('logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'estado', 'cep')
+    valores = {coluna: sortear_campo_texto(coluna, num_registros) for coluna in colunas}
     dados_endereco = []
     for i in range(num_registros):
         dados_endereco.append({
-            'logradouro': fake.street_name(),
-            'numero': fake.building_number(),
-            'complemento': fake.text(max_nb_chars=30) if random.choice([True, False, False]) else None,
-            'bairro': fake.bairro(),
-            'cidade': fake.city(),
-            'estado': fake.state_abbr(),
-            'cep': fake.postcode(),
+            'logradouro': valores['logradouro'][i],
+            'numero': valores['numero'][i],
+            'complemento': valores['complemento'][i] if tem_complemento[i] < 1/3 else None,
+            'bairro': valores['bairro'][i],
+            'cidade': valores['cidade'][i],
+            'estado': valores['estado'][i],
+            'cep': valores['cep'][i],
             'pais': 'Brasil'
         })
-    logger.info(f"{len(dados_endereco)} registros de ENDERECO gerados.")
+    logger.debug(f"{len(dados_endereco)} registros de ENDERECO gerados.")
     return dados_endereco
 
 # 2. Tabela odontologista
@@ -288,38 +1020,50 @@ def gerar_odontologistas(num_registros):
     """Gera dados para a tabela odontologista."""
     dados_odontologista = []
     especialidades = ['Clínico Geral', 'Ortodontia', 'Periodontia', 'Endodontia', 'Implantodontia', 'Odontopediatria', 'Prótese Dentária']
+    nomes = sortear_nomes(num_registros)
+    numeros_cro = sortear_inteiros(num_registros, 0, 99999)
+    estados = sortear_campo_texto('estado', num_registros)
     for i in range(num_registros):
         dados_odontologista.append({
-            'nome_odontologista': fake.name(),
+            'nome_odontologista': nomes[i],
             'especialidade': random.choice(especialidades),
-            'cro': f"{fake.random_number(digits=5)}-{fake.state_abbr()}"
+            'cro': f"{numeros_cro[i]}-{estados[i]}"
         })
-    logger.info(f"{len(dados_odontologista)} registros de ODONTOLOGISTA gerados.")
+    logger.debug(f"{len(dados_odontologista)} registros de ODONTOLOGISTA gerados.")
     return dados_odontologista
 
 # 3. Tabela paciente
-def gerar_pacientes(num_registros, ids_enderecos_disponiveis):
-    """Gera dados para a tabela paciente."""
-    dados_paciente = []
+def gerar_pacientes(num_registros, ids_enderecos_disponiveis, inicio=0):
+    """Gera dados para a tabela paciente. `inicio` é o índice global do primeiro registro."""
     generos = ['M', 'F', 'O'] # Masculino, Feminino, Outro
+    # Gerar telefone mais curto para caber no varchar(15)
+    # Formato: (XX) XXXXX-XXXX = 14 caracteres
+    ddds = sortear_inteiros(num_registros, 11, 99)
+    numeros = sortear_inteiros(num_registros, 90000, 99999)
+    finais = sortear_inteiros(num_registros, 1000, 9999)
+    generos_sorteados = sortear_elementos(generos, num_registros)
+    datas_nasc = sortear_datas_nascimento(num_registros)
+    nomes = sortear_nomes(num_registros)
+    emails = sortear_emails(inicio, nomes)
+    # CPFs da permutação semeada dos índices globais: únicos entre fragmentos, sem guardar os já gerados
+    cpfs = gerar_cpfs(np.arange(inicio, inicio + num_registros), SEMENTE)
+    if ids_enderecos_disponiveis:
+        enderecos = sortear_elementos(ids_enderecos_disponiveis, num_registros)
+    else:
+        enderecos = [None] * num_registros
+
+    dados_paciente = []
     for i in range(num_registros):
-        # Gerar telefone mais curto para caber no varchar(15)
-        # Formato: (XX) XXXXX-XXXX = 14 caracteres
-        ddd = fake.random_int(min=11, max=99)
-        numero = fake.random_int(min=90000, max=99999)
-        final = fake.random_int(min=1000, max=9999)
-        telefone_curto = f"({ddd:02d}){numero}{final}"
-        
         dados_paciente.append({
-            'nome_paciente': fake.name(),
-            'cpf_paciente': fake.unique.cpf().replace('.', '').replace('-', ''), # CPF sem formatação
-            'telefone': telefone_curto,
-            'genero': random.choice(generos),
-            'data_nasc': gerar_data_nascimento(),
-            'email': fake.unique.email(),
-            'endereco_id_endereco': random.choice(ids_enderecos_disponiveis) if ids_enderecos_disponiveis else None
+            'nome_paciente': nomes[i],
+            'cpf_paciente': cpfs[i], # CPF sem formatação
+            'telefone': f"({ddds[i]:02d}){numeros[i]}{finais[i]}",
+            'genero': generos_sorteados[i],
+            'data_nasc': datas_nasc[i],
+            'email': emails[i],
+            'endereco_id_endereco': enderecos[i]
         })
-    logger.info(f"{len(dados_paciente)} registros de PACIENTE gerados.")
+    logger.debug(f"{len(dados_paciente)} registros de PACIENTE gerados.")
     return dados_paciente
 
 # 4. Tabela tipo_pagamento
@@ -361,25 +1105,30 @@ def gerar_procedimentos(num_registros):
 # 6. Tabela agendamento
 def gerar_agendamentos(num_registros, ids_pacientes, ids_odontologistas):
     """Gera dados para a tabela agendamento."""
-    dados_agendamento = []
     status_agendamento = ['Confirmado', 'Realizado', 'Cancelado', 'Remarcado', 'Não Compareceu']
     if not ids_pacientes or not ids_odontologistas:
         logger.warning("AVISO: Não há pacientes ou odontologistas suficientes para gerar agendamentos.")
         return []
-    for i in range(num_registros):
-        dados_agendamento.append({
-            'data_agendamento': gerar_datas_tres_anos(),
-            'status_agendamento': random.choice(status_agendamento),
-            'paciente_id_paciente': random.choice(ids_pacientes),
-            'odontologista_id_odontologista': random.choice(ids_odontologistas)
-        })
-    logger.info(f"{len(dados_agendamento)} registros de AGENDAMENTO gerados.")
+    datas = sortear_datas_tres_anos(num_registros)
+    status = sortear_elementos(status_agendamento, num_registros)
+    pacientes = sortear_elementos(ids_pacientes, num_registros)
+    odontologistas = sortear_elementos(ids_odontologistas, num_registros)
+
+    dados_agendamento = [
+        {
+            'data_agendamento': data,
+            'status_agendamento': status_sorteado,
+            'paciente_id_paciente': id_paciente,
+            'odontologista_id_odontologista': id_odontologista
+        }
+        for data, status_sorteado, id_paciente, id_odontologista in zip(datas, status, pacientes, odontologistas)
+    ]
+    logger.debug(f"{len(dados_agendamento)} registros de AGENDAMENTO gerados.")
     return dados_agendamento
 
 # 7. Tabela consulta
-def gerar_consultas(num_registros, ids_agendamentos_disponiveis):
-    """Gera dados para a tabela consulta, baseando-se em agendamentos disponíveis."""
-    dados_consulta = []
+def gerar_consultas(num_registros, ids_agendamentos_disponiveis, inicio=0):
+    """Gera dados para a tabela consulta, baseando-se em agendamentos disponíveis. `inicio` é o índice global do primeiro registro."""
     diagnosticos_exemplo = ["Cárie dentária", "Gengivite", "Periodontite", "Necessidade de extração", "Bruxismo", "Alinhamento dental necessário"]
     tratamentos_exemplo = ["Restauração", "Limpeza profunda", "Tratamento periodontal", "Extração do siso", "Placa de bruxismo", "Indicação para ortodontista"]
 
@@ -389,69 +1138,72 @@ def gerar_consultas(num_registros, ids_agendamentos_disponiveis):
 
     # Limitar o número de consultas ao número de agendamentos disponíveis ou ao NUM_CONSULTAS desejado
     num_registros_efetivo = min(num_registros, len(ids_agendamentos_disponiveis))
-    agendamentos_para_consulta = random.sample(ids_agendamentos_disponiveis, num_registros_efetivo)
+    agendamentos_para_consulta = sortear_amostra(ids_agendamentos_disponiveis, num_registros_efetivo)
+    # Gerar data e hora da consulta (últimos 3 anos)
+    datas = sortear_datas_tres_anos(num_registros_efetivo)
+    diagnosticos = sortear_elementos(diagnosticos_exemplo, num_registros_efetivo)
+    tratamentos = sortear_elementos(tratamentos_exemplo, num_registros_efetivo)
 
+    dados_consulta = []
     for i in range(num_registros_efetivo):
-        id_agendamento_ref = agendamentos_para_consulta[i]
-        # Gerar data e hora da consulta (últimos 3 anos)
-        data_hora_consulta = gerar_datas_tres_anos()
-
         dados_consulta.append({
-            'data_hora': data_hora_consulta,
-            'diagnostico': random.choice(diagnosticos_exemplo) + f" (Consulta {i+1})",
-            'tratamento': random.choice(tratamentos_exemplo) + f" (Consulta {i+1})",
-            'agendamento_id_agendamento': id_agendamento_ref
+            'data_hora': datas[i],
+            'diagnostico': diagnosticos[i] + f" (Consulta {inicio+i+1})",
+            'tratamento': tratamentos[i] + f" (Consulta {inicio+i+1})",
+            'agendamento_id_agendamento': agendamentos_para_consulta[i]
         })
-    logger.info(f"{len(dados_consulta)} registros de CONSULTA gerados.")
+    logger.debug(f"{len(dados_consulta)} registros de CONSULTA gerados.")
     return dados_consulta
 
 
 # 8. Tabela pagamento
 def gerar_pagamentos(num_registros, ids_consultas_disponiveis, ids_tipos_pagamento):
     """Gera dados para a tabela pagamento."""
-    dados_pagamento = []
     if not ids_consultas_disponiveis or not ids_tipos_pagamento:
         logger.warning("AVISO: Não há consultas ou tipos de pagamento para gerar pagamentos.")
         return []
 
     # Limitar o número de pagamentos ao número de consultas disponíveis
     num_registros_efetivo = min(num_registros, len(ids_consultas_disponiveis))
-    consultas_para_pagamento = random.sample(ids_consultas_disponiveis, num_registros_efetivo)
+    consultas_para_pagamento = sortear_amostra(ids_consultas_disponiveis, num_registros_efetivo)
+    valores = sortear_valores(num_registros_efetivo, 50.0, 800.0)
+    # Gerar data de pagamento (últimos 3 anos)
+    datas = sortear_datas_tres_anos(num_registros_efetivo)
+    tipos = sortear_elementos(ids_tipos_pagamento, num_registros_efetivo)
 
-    for i in range(num_registros_efetivo):
-        id_consulta_ref = consultas_para_pagamento[i]
-        # Gerar data de pagamento (últimos 3 anos)
-        data_pagamento_val = gerar_datas_tres_anos()
-
-        dados_pagamento.append({
-            'valor_pago': round(random.uniform(50.0, 800.0), 2),
-            'data_pagamento': data_pagamento_val,
-            'tipo_pagamento_id_tipo_pagamento': random.choice(ids_tipos_pagamento),
-            'consulta_id_consulta': id_consulta_ref
-        })
-    logger.info(f"{len(dados_pagamento)} registros de PAGAMENTO gerados.")
+    dados_pagamento = [
+        {
+            'valor_pago': valor,
+            'data_pagamento': data,
+            'tipo_pagamento_id_tipo_pagamento': id_tipo,
+            'consulta_id_consulta': id_consulta
+        }
+        for valor, data, id_tipo, id_consulta in zip(valores, datas, tipos, consultas_para_pagamento)
+    ]
+    logger.debug(f"{len(dados_pagamento)} registros de PAGAMENTO gerados.")
     return dados_pagamento
 
 # 9. Tabela consulta_procedimento (Tabela de Junção)
 def gerar_consulta_procedimento(ids_consultas_disponiveis, ids_procedimentos_disponiveis, min_proc, max_proc):
     """Gera dados para a tabela de junção consulta_procedimento."""
-    dados_consulta_procedimento = []
     if not ids_consultas_disponiveis or not ids_procedimentos_disponiveis:
         print("AVISO: Não há consultas ou procedimentos para gerar consulta_procedimento.")
         return []
 
-    id_pk_consulta_procedimento = 1
-    for id_consulta in ids_consultas_disponiveis:
-        num_procedimentos_para_consulta = random.randint(min_proc, max_proc)
-        # Garante que não tentemos escolher mais procedimentos do que os disponíveis
-        num_procedimentos_para_consulta = min(num_procedimentos_para_consulta, len(ids_procedimentos_disponiveis))
-        procedimentos_escolhidos = random.sample(ids_procedimentos_disponiveis, num_procedimentos_para_consulta)
-        for id_procedimento in procedimentos_escolhidos:
+    # Garante que não tentemos escolher mais procedimentos do que os disponíveis
+    max_proc = min(max_proc, len(ids_procedimentos_disponiveis))
+    min_proc = min(min_proc, max_proc)
+    quantidades = sortear_inteiros(len(ids_consultas_disponiveis), min_proc, max_proc)
+    procedimentos_escolhidos = sortear_subconjuntos(ids_procedimentos_disponiveis, quantidades)
+
+    dados_consulta_procedimento = []
+    for id_consulta, procedimentos in zip(ids_consultas_disponiveis, procedimentos_escolhidos):
+        for id_procedimento in procedimentos:
             dados_consulta_procedimento.append({
                 'consulta_id_consulta': id_consulta,
                 'procedimento_id_procedimento': id_procedimento
             })
-    logger.info(f"{len(dados_consulta_procedimento)} registros de CONSULTA_PROCEDIMENTO gerados.")
+    logger.debug(f"{len(dados_consulta_procedimento)} registros de CONSULTA_PROCEDIMENTO gerados.")
     return dados_consulta_procedimento
 
 # 10. Tabela log_pagamento
@@ -463,71 +1215,284 @@ def gerar_log_pagamentos(pagamentos_ids_db):
         logger.warning("AVISO: Não há dados de pagamento para gerar logs.")
         return []
 
+    # Para cada pagamento, um log de INSERT
+    num_pagamentos = len(pagamentos_ids_db)
+    datas_operacao = sortear_datas_tres_anos(num_pagamentos)
+    tipos = sortear_inteiros(num_pagamentos, 1, 5)  # Assumindo 5 tipos de pagamento
+    valores = sortear_valores(num_pagamentos, 50.0, 800.0)
+    segundos = sortear_inteiros(num_pagamentos, 1, 300)
+    usuarios = sortear_campo_texto('usuario', num_pagamentos)
+    # Opcional: 10% de chance de o pagamento ter também um log de UPDATE
+    tem_update = [p < 0.1 for p in sortear_probabilidades(num_pagamentos)]
+    num_updates = sum(tem_update)
+    updates = zip(
+        sortear_inteiros(num_updates, 1, 5),
+        sortear_valores(num_updates, 50.0, 800.0),
+        sortear_inteiros(num_updates, 1, 5),
+        sortear_inteiros(num_updates, 1, 300),
+        sortear_campo_texto('usuario', num_updates)
+    )
+
     for i, id_pagamento in enumerate(pagamentos_ids_db):
-        # Para cada pagamento, gerar um log de INSERT
-        data_operacao = gerar_datas_tres_anos()
+        data_operacao = datas_operacao[i]
         dados_log_pagamento.append({
             'tipo_acao': 'INSERT',
             'id_pagamento': id_pagamento,
-            'tipo_pagamento_id_tipo_pagamento': random.randint(1, 5),  # Assumindo 5 tipos de pagamento
-            'valor_pago': round(random.uniform(50.0, 800.0), 2),
+            'tipo_pagamento_id_tipo_pagamento': tipos[i],
+            'valor_pago': valores[i],
             'data_pagamento': data_operacao,
-            'DataHoraOperacao': data_operacao + timedelta(seconds=random.randint(1, 300)),
-            'ExecutedBy': fake.user_name()
+            'DataHoraOperacao': data_operacao + timedelta(seconds=segundos[i]),
+            'ExecutedBy': usuarios[i]
         })
 
-        # Opcional: Gerar alguns logs de UPDATE para alguns pagamentos
-        if random.random() < 0.1: # 10% de chance de ter um update
-            data_update = data_operacao + timedelta(days=random.randint(1,5))
+        if tem_update[i]:
+            tipo_update, valor_update, dias_update, segundos_update, usuario_update = next(updates)
+            data_update = data_operacao + timedelta(days=dias_update)
             dados_log_pagamento.append({
                 'tipo_acao': 'UPDATE',
                 'id_pagamento': id_pagamento,
-                'tipo_pagamento_id_tipo_pagamento': random.randint(1, 5),
-                'valor_pago': round(random.uniform(50.0, 800.0), 2),
+                'tipo_pagamento_id_tipo_pagamento': tipo_update,
+                'valor_pago': valor_update,
                 'data_pagamento': data_update,
-                'DataHoraOperacao': data_update + timedelta(seconds=random.randint(1, 300)),
-                'ExecutedBy': fake.user_name()
+                'DataHoraOperacao': data_update + timedelta(seconds=segundos_update),
+                'ExecutedBy': usuario_update
             })
 
-    logger.info(f"{len(dados_log_pagamento)} registros de LOG_PAGAMENTO gerados.")
+    logger.debug(f"{len(dados_log_pagamento)} registros de LOG_PAGAMENTO gerados.")
     return dados_log_pagamento
 
+# --- Geração paralela em fragmentos ---
+# Tabelas geradas em fragmentos com sementes próprias; as demais são catálogos fixos, sem sorteio
+GERADORES = {
+    'endereco': gerar_enderecos,
+    'odontologista': gerar_odontologistas,
+    'paciente': gerar_pacientes,
+    'agendamento': gerar_agendamentos,
+    'consulta': gerar_consultas,
+    'pagamento': gerar_pagamentos,
+    'consulta_procedimento': gerar_consulta_procedimento,
+    'log_pagamento': gerar_log_pagamentos,
+}
+
+def planejar_fragmentos(tabela, num_registros, referencias, tamanho_fragmento=None):
+    """Divide a geração de uma tabela em fragmentos, produzindo sob demanda os (argumentos, opções) de cada um."""
+    tamanho_fragmento = tamanho_fragmento or TAMANHO_FRAGMENTO
+    if tabela in ('consulta', 'pagamento'):
+        # Cada fragmento sorteia seus registros de um bloco proporcional e disjunto
+        # da tabela pai, então nenhum agendamento/consulta é usado em dois fragmentos
+        ids_pai, *demais = referencias
+        total = min(num_registros, len(ids_pai))
+        for inicio in range(0, total, tamanho_fragmento):
+            fim = min(inicio + tamanho_fragmento, total)
+            bloco = ids_pai[inicio * len(ids_pai) // total:fim * len(ids_pai) // total]
+            opcoes = {'inicio': inicio} if tabela == 'consulta' else {}
+            yield (fim - inicio, bloco, *demais), opcoes
+    elif tabela in ('consulta_procedimento', 'log_pagamento'):
+        # Um registro (ou mais) por ID da tabela pai: fragmentar os próprios IDs
+        ids_pai, *demais = referencias
+        for inicio in range(0, len(ids_pai), tamanho_fragmento):
+            yield (ids_pai[inicio:inicio + tamanho_fragmento], *demais), {}
+    else:
+        for inicio in range(0, num_registros, tamanho_fragmento):
+            fim = min(inicio + tamanho_fragmento, num_registros)
+            opcoes = {'inicio': inicio} if tabela == 'paciente' else {}
+            yield (fim - inicio, *referencias), opcoes
+
+def _executar_fragmento(tarefa):
+    """Gera um fragmento de uma tabela. Executado nos processos do pool."""
+    tabela, semente, argumentos, opcoes = tarefa
+    semear(semente)
+    return GERADORES[tabela](*argumentos, **opcoes)
+
+def gerar_em_lotes(tabela, num_registros, *referencias, executor=None, semente=None, max_pendentes=None):
+    """Gera uma tabela em lotes (um por fragmento), na ordem, com sementes determinísticas.
+    
+    No máximo max_pendentes fragmentos ficam em geração ou aguardando consumo no pool, então a
+    memória ocupada depende do tamanho do fragmento e não do tamanho da tabela.
+    """
+    semente = SEMENTE if semente is None else semente
+    tarefas = (
+        (tabela, semente_fragmento(semente, tabela, indice), argumentos, opcoes)
+        for indice, (argumentos, opcoes) in enumerate(planejar_fragmentos(tabela, num_registros, referencias))
+    )
+    # Sem pool, os mesmos fragmentos são gerados no processo atual (mesmo resultado)
+    if not executor:
+        yield from map(_executar_fragmento, tarefas)
+        return
+    
+    max_pendentes = max_pendentes or 2 * NUM_PROCESSOS
+    pendentes = deque()
+    for tarefa in tarefas:
+        pendentes.append(executor.submit(_executar_fragmento, tarefa))
+        if len(pendentes) >= max_pendentes:
+            yield pendentes.popleft().result()
+    while pendentes:
+        yield pendentes.popleft().result()
+
+def gerar_em_paralelo(tabela, num_registros, *referencias, executor=None, semente=None):
+    """Gera uma tabela inteira em memória, juntando os lotes de gerar_em_lotes."""
+    dados = []
+    for lote in gerar_em_lotes(tabela, num_registros, *referencias, executor=executor, semente=semente):
+        dados.extend(lote)
+    logger.info(f"{len(dados)} registros de {tabela.upper()} gerados.")
+    return dados
+
+def gerar_e_carregar(engine, diretorio_saida=None, executor=None, volumes=None, metricas=None, formatos=('csv',)):
+    """Gera todas as tabelas em lotes, na ordem das dependências, enviando cada lote ao banco e aos arquivos.
+    
+    engine None gera apenas os arquivos (CSV e/ou Parquet, conforme formatos). Os arquivos só são escritos
+    durante a geração quando as chaves são atribuídas no cliente (ATRIBUIR_IDS_CLIENTE); caso contrário,
+    são extraídos do banco ao final. volumes vem de calcular_volumes (padrão: fator de escala 1).
+    Retorna os arquivos escritos.
+    """
+    if not ATRIBUIR_IDS_CLIENTE:
+        diretorio_saida = None
+    volumes = volumes or calcular_volumes()
+    
+    def lotes(tabela, num_registros, *referencias):
+        logger.info(f"Gerando tabela: {tabela}")
+        return gerar_em_lotes(tabela, num_registros, *referencias, executor=executor)
+    
+    def processar(tabela, lotes_tabela, num_registros=None):
+        return processar_tabela(engine, tabela, lotes_tabela, num_registros, diretorio_saida, metricas, formatos)
+    
+    # Tabelas independentes. Os IDs retornados alimentam as tabelas dependentes
+    # sem precisar reler as chaves geradas do banco (ver ATRIBUIR_IDS_CLIENTE)
+    enderecos_ids = processar('endereco', lotes('endereco', volumes['endereco']), volumes['endereco'])
+    odontologistas_ids = processar('odontologista', lotes('odontologista', volumes['odontologista']),
+                                   volumes['odontologista'])
+    dados_tipos_pagamento = gerar_tipos_pagamento()
+    tipos_pagamento_ids = processar('tipo_pagamento', [dados_tipos_pagamento], len(dados_tipos_pagamento))
+    procedimentos_ids = processar('procedimento', [gerar_procedimentos(volumes['procedimento'])], volumes['procedimento'])
+    
+    # Tabelas dependentes
+    pacientes_ids = processar('paciente', lotes('paciente', volumes['paciente'], enderecos_ids), volumes['paciente'])
+    agendamentos_ids = processar(
+        'agendamento', lotes('agendamento', volumes['agendamento'], pacientes_ids, odontologistas_ids),
+        volumes['agendamento']
+    )
+    num_consultas = min(volumes['consulta'], len(agendamentos_ids))
+    consultas_ids = processar('consulta', lotes('consulta', num_consultas, agendamentos_ids), num_consultas)
+    num_pagamentos = min(volumes['pagamento'], len(consultas_ids))
+    pagamentos_ids = processar(
+        'pagamento', lotes('pagamento', num_pagamentos, consultas_ids, tipos_pagamento_ids), num_pagamentos
+    )
+    processar(
+        'consulta_procedimento',
+        lotes('consulta_procedimento', len(consultas_ids), consultas_ids, procedimentos_ids, MIN_PROC_POR_CONSULTA, MAX_PROC_POR_CONSULTA)
+    )
+    processar('log_pagamento', lotes('log_pagamento', len(pagamentos_ids), pagamentos_ids))
+    
+    if not diretorio_saida:
+        return []
+    return [os.path.join(diretorio_saida, f"{tabela}.{formato}") for tabela in COLUNAS_ID for formato in formatos]
+
 # --- Função para upload para Azure Storage ---
-def upload_to_azure(local_file_path, blob_name):
-    """Faz upload de um arquivo para o Azure Blob Storage."""
-    if not AZURE_STORAGE_CONNECTION_STRING:
-        logger.warning("AZURE_STORAGE_CONNECTION_STRING não configurada. Upload para Azure ignorado.")
-        return False
+# Cliente do container compartilhado por todos os uploads (criado uma vez, sob demanda)
+_container_azure = None
+_lock_container_azure = threading.Lock()
+
+def obter_container_azure():
+    """Retorna o cliente do container, criando o cliente do serviço e o container na primeira chamada."""
+    global _container_azure
+    with _lock_container_azure:
+        if _container_azure is None:
+            # Uma sessão HTTP com conexões suficientes para todos os uploads e blocos simultâneos
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_maxsize=AZURE_UPLOADS_SIMULTANEOS * AZURE_CONCORRENCIA_BLOCOS)
+            sessao.mount('https://', adaptador)
+            sessao.mount('http://', adaptador)
+            
+            blob_service_client = BlobServiceClient.from_connection_string(
+                AZURE_STORAGE_CONNECTION_STRING, transport=RequestsTransport(session=sessao)
+            )
+            container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
+            
+            # Verificar se o container existe, se não, criar
+            try:
+                container_client.get_container_properties()
+            except ResourceNotFoundError:
+                logger.info(f"Container '{AZURE_CONTAINER_NAME}' não existe. Criando...")
+                container_client.create_container()
+            _container_azure = container_client
+        return _container_azure
+
+def calcular_md5(caminho, tamanho_leitura=8 * 1024 * 1024):
+    """Calcula o MD5 de um arquivo, lendo-o em partes."""
+    md5 = hashlib.md5()
+    with open(caminho, 'rb') as file:
+        for parte in iter(lambda: file.read(tamanho_leitura), b''):
+            md5.update(parte)
+    return md5.digest()
+
+def _enviar_em_blocos(blob_client, caminho, tamanho, content_settings):
+    """Envia um arquivo em blocos paralelos (stage_block) e confirma a lista de blocos ao final."""
+    tamanho_bloco = AZURE_TAMANHO_BLOCO_MB * 1024 * 1024
+    deslocamentos = range(0, tamanho, tamanho_bloco)
+    ids_blocos = [base64.b64encode(f"bloco-{indice:06d}".encode()).decode() for indice in range(len(deslocamentos))]
+    
+    def enviar_bloco(indice):
+        # Cada thread lê o seu trecho: no máximo AZURE_CONCORRENCIA_BLOCOS blocos em memória
+        with open(caminho, 'rb') as file:
+            file.seek(deslocamentos[indice])
+            blob_client.stage_block(ids_blocos[indice], file.read(tamanho_bloco))
+    
+    with ThreadPoolExecutor(max_workers=AZURE_CONCORRENCIA_BLOCOS) as executor:
+        list(executor.map(enviar_bloco, range(len(ids_blocos))))
+    blob_client.commit_block_list([BlobBlock(block_id=id_bloco) for id_bloco in ids_blocos], content_settings=content_settings)
+
+def enviar_arquivo_azure(local_file_path, blob_name):
+    """Envia um arquivo ao container, pulando-o se o blob já tiver o mesmo MD5.
     
+    Retorna os bytes enviados (0 quando o upload é pulado) ou None em caso de erro.
+    """
     try:
-        # Criar o cliente do serviço blob
-        blob_service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-        
-        # Obter o cliente do container
-        container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
+        blob_client = obter_container_azure().get_blob_client(blob_name)
+        md5 = calcular_md5(local_file_path)
         
-        # Verificar se o container existe, se não, criar
         try:
-            container_client.get_container_properties()
+            propriedades = blob_client.get_blob_properties()
+            if propriedades.content_settings.content_md5 == md5:
+                logger.info(f"⏭️  {blob_name} inalterado (mesmo MD5), upload ignorado")
+                return 0
         except ResourceNotFoundError:
-            logger.info(f"Container '{AZURE_CONTAINER_NAME}' não existe. Criando...")
-            container_client.create_container()
+            pass
         
-        # Fazer upload do arquivo (sobrescreve se já existir)
-        blob_client = blob_service_client.get_blob_client(
-            container=AZURE_CONTAINER_NAME, 
-            blob=blob_name
-        )
-        
-        with open(local_file_path, 'rb') as data:
-            blob_client.upload_blob(data, overwrite=True)
+        # O MD5 é gravado no blob, inclusive no upload em blocos, para a comparação da próxima execução
+        content_settings = ContentSettings(content_md5=md5)
+        tamanho = os.path.getsize(local_file_path)
+        if tamanho > AZURE_LIMIAR_BLOCOS_MB * 1024 * 1024:
+            _enviar_em_blocos(blob_client, local_file_path, tamanho, content_settings)
+        else:
+            with open(local_file_path, 'rb') as data:
+                blob_client.upload_blob(data, overwrite=True, content_settings=content_settings)
         
         logger.info(f"Upload bem-sucedido: {blob_name}")
-        return True
+        return tamanho
         
     except Exception as e:
-        logger.error(f"Erro no upload para Azure: {str(e)}")
+        logger.error(f"Erro no upload para Azure ({blob_name}): {str(e)}")
+        return None
+
+def upload_to_azure(local_file_path, blob_name):
+    """Faz upload de um arquivo para o Azure Blob Storage."""
+    if not AZURE_STORAGE_CONNECTION_STRING:
+        logger.warning("AZURE_STORAGE_CONNECTION_STRING não configurada. Upload para Azure ignorado.")
         return False
+    return enviar_arquivo_azure(local_file_path, blob_name) is not None
+
+def upload_arquivos_azure(arquivos, prefixo=AZURE_BLOB_PREFIX, metricas=None):
+    """Envia vários arquivos ao Azure Storage ao mesmo tempo, com o mesmo cliente. Retorna quantos foram enviados ou já estavam atualizados."""
+    def enviar(arquivo):
+        nome_arquivo = os.path.basename(arquivo)
+        inicio = time.perf_counter()
+        enviados = enviar_arquivo_azure(arquivo, f"{prefixo}{nome_arquivo}")
+        if enviados is not None:
+            registrar_metrica(metricas, 'upload', nome_arquivo, None, enviados, time.perf_counter() - inicio)
+        return enviados is not None
+    
+    with ThreadPoolExecutor(max_workers=AZURE_UPLOADS_SIMULTANEOS) as executor:
+        return sum(executor.map(enviar, arquivos))
 
 # --- Função para salvar em CSV ---
 def salvar_csv(dados, nome_arquivo, cabecalho):
@@ -571,139 +1536,199 @@ def verificar_configuracao_azure():
     return True
 
 # --- Orquestração da Geração e Salvamento ---
-def main():
+DESTINOS_VALIDOS = ('db', 'csv', 'parquet', 'azure')
+FORMATOS_ARQUIVO = ('csv', 'parquet')
+
+def criar_parser():
+    """Cria o parser da linha de comando do gerador."""
+    parser = argparse.ArgumentParser(
+        description="Gera a massa de dados da clínica e carrega no PostgreSQL, em CSV e/ou no Azure Storage",
+        epilog="Exemplo: python scripts/gerador_dados.py --fator-escala 10 --destinos db --relatorio relatorio.json"
+    )
+    parser.add_argument('--fator-escala', '--scale-factor', type=float, default=1.0,
+                        help="Multiplica os volumes padrão (1 = 70.000 agendamentos)")
+    parser.add_argument('--volume', action='append', default=[], metavar='TABELA=N',
+                        help="Total de registros de uma tabela, sobrepondo o fator de escala (pode repetir)")
+    parser.add_argument('--proporcao-consultas', type=float, default=PROPORCAO_CONSULTAS,
+                        help="Fração dos agendamentos que viram consulta")
+    parser.add_argument('--proporcao-pagamentos', type=float, default=PROPORCAO_PAGAMENTOS,
+                        help="Fração das consultas que geram pagamento")
+    parser.add_argument('--semente', '--seed', type=int, default=SEMENTE, help="Semente base da geração")
+    parser.add_argument('--destinos', '--sinks', default='db,csv,azure',
+                        help="Destinos dos dados, separados por vírgula: db, csv, parquet, azure")
+    parser.add_argument('--diretorio-saida', '--diretorio-csv', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'raw'),
+                        help="Diretório dos arquivos CSV/Parquet gerados")
+    parser.add_argument('--parquet-linhas-por-grupo', type=int, default=PARQUET_LINHAS_POR_GRUPO,
+                        help="Registros por row group dos arquivos Parquet")
+    parser.add_argument('--parquet-compressao', default=PARQUET_COMPRESSAO, help="Compressão dos arquivos Parquet")
+    parser.add_argument('--processos', type=int, default=NUM_PROCESSOS, help="Processos usados na geração")
+    parser.add_argument('--tamanho-fragmento', type=int, default=TAMANHO_FRAGMENTO, help="Registros por fragmento")
+    parser.add_argument('--metodo-carga', choices=['copy', 'insert'], default=METODO_CARGA, help="Método de carga no PostgreSQL")
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE_COPY, help="Registros por bloco do COPY")
+    parser.add_argument('--modelo-particionado', action=argparse.BooleanOptionalAction, default=MODELO_PARTICIONADO,
+                        help="Usa o modelo físico com agendamento, consulta, pagamento e log_pagamento particionados por mês")
+    parser.add_argument('--carga-rapida', action=argparse.BooleanOptionalAction, default=CARGA_RAPIDA,
+                        help="Remove índices secundários e FKs antes da carga e os recria ao final")
+    parser.add_argument('--conexoes-indices', type=int, default=NUM_CONEXOES_INDICES,
+                        help="Índices recriados e FKs validadas ao mesmo tempo na carga rápida")
+    parser.add_argument('--metodo-extracao', choices=['copy', 'cursor'], default=METODO_EXTRACAO,
+                        help="Como os CSVs são extraídos do banco quando as chaves não são atribuídas no gerador")
+    parser.add_argument('--conexoes-extracao', type=int, default=NUM_CONEXOES_EXTRACAO, help="Tabelas extraídas ao mesmo tempo")
+    parser.add_argument('--relatorio', help="Arquivo JSON onde salvar o relatório de execução (além da saída padrão)")
+    return parser
+
+def ler_volumes(parser, especificacoes):
+    """Converte as opções --volume TABELA=N em um dicionário {tabela: N}."""
+    volumes = {}
+    for especificacao in especificacoes:
+        tabela, _, quantidade = especificacao.partition('=')
+        if tabela not in calcular_volumes() or not quantidade.isdigit():
+            parser.error(f"--volume inválido: {especificacao} (tabelas: {', '.join(calcular_volumes())})")
+        volumes[tabela] = int(quantidade)
+    return volumes
+
+def montar_relatorio(parametros, metricas, segundos_totais):
+    """Monta o relatório de execução com as métricas por etapa e os totais de cada etapa."""
+    totais = {}
+    for metrica in metricas:
+        total = totais.setdefault(metrica['etapa'], {'registros': 0, 'bytes': 0, 'segundos': 0.0})
+        total['registros'] += metrica['registros'] or 0
+        total['bytes'] += metrica['bytes'] or 0
+        total['segundos'] = round(total['segundos'] + metrica['segundos'], 3)
+    for total in totais.values():
+        total['registros_por_segundo'] = round(total['registros'] / total['segundos'], 1) if total['segundos'] else None
+    return {
+        'parametros': parametros,
+        'etapas': metricas,
+        'totais': totais,
+        'segundos_totais': round(segundos_totais, 3),
+    }
+
+def main(argv=None):
+    global NUM_PROCESSOS, TAMANHO_FRAGMENTO, SEMENTE, METODO_CARGA, TAMANHO_LOTE_COPY, ATRIBUIR_IDS_CLIENTE
+    global METODO_EXTRACAO, NUM_CONEXOES_EXTRACAO, PARQUET_LINHAS_POR_GRUPO, PARQUET_COMPRESSAO
+    global CARGA_RAPIDA, NUM_CONEXOES_INDICES, MODELO_PARTICIONADO
+    
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    destinos = {destino.strip() for destino in args.destinos.split(',') if destino.strip()}
+    if not destinos or not destinos <= set(DESTINOS_VALIDOS):
+        parser.error(f"--destinos deve conter apenas: {', '.join(DESTINOS_VALIDOS)}")
+    volumes = calcular_volumes(args.fator_escala, ler_volumes(parser, args.volume),
+                               args.proporcao_consultas, args.proporcao_pagamentos)
+    
+    NUM_PROCESSOS = args.processos
+    TAMANHO_FRAGMENTO = args.tamanho_fragmento
+    SEMENTE = args.semente
+    METODO_CARGA = args.metodo_carga
+    TAMANHO_LOTE_COPY = args.tamanho_lote
+    METODO_EXTRACAO = args.metodo_extracao
+    NUM_CONEXOES_EXTRACAO = args.conexoes_extracao
+    CARGA_RAPIDA = args.carga_rapida
+    NUM_CONEXOES_INDICES = args.conexoes_indices
+    MODELO_PARTICIONADO = args.modelo_particionado
+    PARQUET_LINHAS_POR_GRUPO = args.parquet_linhas_por_grupo
+    PARQUET_COMPRESSAO = args.parquet_compressao
+    if 'azure' in destinos and not destinos & set(FORMATOS_ARQUIVO):
+        # O upload parte dos arquivos locais
+        logger.info("☁️  Destino azure requer os arquivos locais: incluindo o destino csv")
+        destinos.add('csv')
+    if 'db' not in destinos and not ATRIBUIR_IDS_CLIENTE:
+        # Sem banco não há sequence: as chaves são sempre atribuídas no gerador
+        logger.info("🔑 Sem o destino db, as chaves primárias são atribuídas no gerador")
+        ATRIBUIR_IDS_CLIENTE = True
+    
     logger.info("🚀 Iniciando geração de dados...")
+    logger.info(f"📐 Fator de escala {args.fator_escala:g}, destinos: {', '.join(sorted(destinos))}")
+    semear(SEMENTE)
+    inicio_execucao = time.perf_counter()
+    metricas = []
     
     # 1. Conectar ao banco
-    engine = conectar_db()
-    if not engine:
-        logger.error("❌ Falha na conexão com o banco. Verifique se o PostgreSQL está rodando.")
-        return
+    engine = None
+    if 'db' in destinos:
+        engine = conectar_db()
+        if not engine:
+            logger.error("❌ Falha na conexão com o banco. Verifique se o PostgreSQL está rodando.")
+            return
+    
+    # Pool de processos compartilhado pela geração de todas as tabelas
+    executor = ProcessPoolExecutor(max_workers=NUM_PROCESSOS) if NUM_PROCESSOS > 1 else None
+    if executor:
+        logger.info(f"⚙️  Geração paralela com {NUM_PROCESSOS} processos")
     
     try:
         # 2. Criar tabelas e limpar dados existentes
-        logger.info("🏗️ Criando tabelas e limpando dados...")
-        if not criar_e_limpar_tabelas(engine):
-            logger.error("❌ Falha ao criar/limpar tabelas")
-            return
+        estrutura = None
+        if engine and CARGA_RAPIDA:
+            logger.info("🏗️ Criando tabelas, removendo índices/FKs e esvaziando com TRUNCATE...")
+            estrutura = preparar_carga_rapida(engine, metricas)
+        elif engine:
+            logger.info("🏗️ Criando tabelas e limpando dados...")
+            if not criar_e_limpar_tabelas(engine):
+                logger.error("❌ Falha ao criar/limpar tabelas")
+                return
         
-        # 3. Gerar e inserir dados (tabelas independentes primeiro)
+        # 3. Gerar e inserir dados (tabelas independentes primeiro), lote a lote
         logger.info("📊 Gerando e inserindo dados...")
+        formatos = [formato for formato in FORMATOS_ARQUIVO if formato in destinos]
+        diretorio_saida = args.diretorio_saida if formatos else None
+        try:
+            arquivos_gerados = gerar_e_carregar(engine, diretorio_saida, executor, volumes, metricas, formatos)
+        finally:
+            # Mesmo se a carga falhar, o banco não fica sem os índices e as FKs do modelo físico
+            if estrutura:
+                logger.info("🔗 Recriando índices e chaves estrangeiras...")
+                restaurar_indices_e_fks(engine, estrutura, metricas)
         
-        # Tabelas independentes
-        logger.info("Gerando tabela: endereco")
-        dados_endereco = gerar_enderecos(NUM_ENDERECOS)
-        inserir_dados_tabela(engine, 'endereco', dados_endereco)
-        
-        logger.info("Gerando tabela: odontologista")
-        dados_odontologista = gerar_odontologistas(NUM_ODONTOLOGISTAS)
-        inserir_dados_tabela(engine, 'odontologista', dados_odontologista)
-        
-        logger.info("Gerando tabela: tipo_pagamento")
-        dados_tipos_pagamento = gerar_tipos_pagamento()
-        inserir_dados_tabela(engine, 'tipo_pagamento', dados_tipos_pagamento)
-        
-        logger.info("Gerando tabela: procedimento")
-        dados_procedimentos = gerar_procedimentos(NUM_PROCEDIMENTOS)
-        inserir_dados_tabela(engine, 'procedimento', dados_procedimentos)
-        
-        # Buscar IDs reais do banco para manter referências
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT id_endereco FROM endereco ORDER BY id_endereco"))
-            enderecos_ids_db = [row[0] for row in result.fetchall()]
-            
-            result = conn.execute(text("SELECT id_odontologista FROM odontologista ORDER BY id_odontologista"))
-            odontologistas_ids_db = [row[0] for row in result.fetchall()]
-            
-            result = conn.execute(text("SELECT id_tipo_pagamento FROM tipo_pagamento ORDER BY id_tipo_pagamento"))
-            tipos_pagamento_ids_db = [row[0] for row in result.fetchall()]
-            
-            result = conn.execute(text("SELECT id_procedimento FROM procedimento ORDER BY id_procedimento"))
-            procedimentos_ids_db = [row[0] for row in result.fetchall()]
-        
-        # Tabelas dependentes
-        logger.info("Gerando tabela: paciente")
-        dados_pacientes = gerar_pacientes(NUM_PACIENTES, enderecos_ids_db)
-        inserir_dados_tabela(engine, 'paciente', dados_pacientes)
-        
-        # Buscar IDs dos pacientes
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT id_paciente FROM paciente ORDER BY id_paciente"))
-            pacientes_ids_db = [row[0] for row in result.fetchall()]
-        
-        logger.info("Gerando tabela: agendamento")
-        dados_agendamentos = gerar_agendamentos(NUM_AGENDAMENTOS, pacientes_ids_db, odontologistas_ids_db)
-        inserir_dados_tabela(engine, 'agendamento', dados_agendamentos)
-        
-        # Buscar IDs dos agendamentos
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT id_agendamento FROM agendamento ORDER BY id_agendamento"))
-            agendamentos_ids_db = [row[0] for row in result.fetchall()]
-        
-        logger.info("Gerando tabela: consulta")
-        dados_consultas = gerar_consultas(NUM_CONSULTAS, agendamentos_ids_db)
-        inserir_dados_tabela(engine, 'consulta', dados_consultas)
-        
-        # Buscar IDs das consultas
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT id_consulta FROM consulta ORDER BY id_consulta"))
-            consultas_ids_db = [row[0] for row in result.fetchall()]
-        
-        logger.info("Gerando tabela: pagamento")
-        dados_pagamentos = gerar_pagamentos(NUM_PAGAMENTOS, consultas_ids_db, tipos_pagamento_ids_db)
-        inserir_dados_tabela(engine, 'pagamento', dados_pagamentos)
-        
-        # Buscar IDs dos pagamentos
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT id_pagamento FROM pagamento ORDER BY id_pagamento"))
-            pagamentos_ids_db = [row[0] for row in result.fetchall()]
-        
-        logger.info("Gerando tabela: consulta_procedimento")
-        dados_consulta_procedimento = gerar_consulta_procedimento(consultas_ids_db, procedimentos_ids_db, MIN_PROC_POR_CONSULTA, MAX_PROC_POR_CONSULTA)
-        inserir_dados_tabela(engine, 'consulta_procedimento', dados_consulta_procedimento)
-        
-        logger.info("Gerando tabela: log_pagamento")
-        dados_log_pagamento = gerar_log_pagamentos(pagamentos_ids_db)
-        inserir_dados_tabela(engine, 'log_pagamento', dados_log_pagamento)
-        
-        # 4. Extrair dados para CSVs
-        logger.info("📄 Extraindo dados para arquivos CSV...")
-        tabelas = [
-            'endereco', 'odontologista', 'tipo_pagamento', 'procedimento',
-            'paciente', 'agendamento', 'consulta', 'pagamento', 
-            'consulta_procedimento', 'log_pagamento'
-        ]
-        
-        diretorio_csv = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw')
-        arquivos_gerados = []
-        
-        for tabela in tabelas:
-            arquivo = extrair_dados_para_csv(engine, tabela, diretorio_csv)
-            if arquivo:
-                arquivos_gerados.append(arquivo)
+        # 4. Extrair dados para arquivos, quando não foram escritos durante a geração
+        if diretorio_saida and not arquivos_gerados:
+            logger.info(f"📄 Extraindo dados para arquivos {', '.join(formatos).upper()}...")
+            arquivos_gerados = extrair_tabelas_para_arquivos(engine, list(COLUNAS_ID), diretorio_saida, formatos, metricas=metricas)
         
         # 5. Upload para Azure (se configurado)
-        if verificar_configuracao_azure():
-            logger.info("☁️  Fazendo upload dos CSVs para Azure Storage...")
-            for arquivo in arquivos_gerados:
-                nome_arquivo = os.path.basename(arquivo)
-                upload_to_azure(arquivo, f"{nome_arquivo}")
+        if 'azure' in destinos and verificar_configuracao_azure():
+            logger.info("☁️  Fazendo upload dos arquivos para Azure Storage...")
+            enviados = upload_arquivos_azure(arquivos_gerados, metricas=metricas)
+            logger.info(f"☁️  {enviados}/{len(arquivos_gerados)} arquivos no Azure Storage")
         
         logger.info("✅ Processo concluído com sucesso!")
-        logger.info(f"📊 Dados inseridos no PostgreSQL:")
-        logger.info(f"   • {NUM_ENDERECOS:,} endereços")
-        logger.info(f"   • {NUM_ODONTOLOGISTAS:,} odontologistas") 
-        logger.info(f"   • {NUM_PACIENTES:,} pacientes")
-        logger.info(f"   • {NUM_AGENDAMENTOS:,} agendamentos")
-        logger.info(f"   • {NUM_CONSULTAS:,} consultas")
-        logger.info(f"   • {NUM_PAGAMENTOS:,} pagamentos")
-        logger.info(f"📄 {len(arquivos_gerados)} arquivos CSV gerados em {diretorio_csv}")
+        logger.info(f"📊 Registros gerados:")
+        for metrica in metricas:
+            if metrica['etapa'] == 'geracao_carga':
+                logger.info(f"   • {metrica['registros']:,} {metrica['tabela']}")
+        if diretorio_saida:
+            logger.info(f"📄 {len(arquivos_gerados)} arquivos gerados em {diretorio_saida}")
+        
+        # 6. Relatório de execução (JSON na saída padrão; os logs vão para a saída de erro)
+        parametros = {
+            'fator_escala': args.fator_escala,
+            'semente': SEMENTE,
+            'destinos': sorted(destinos),
+            'processos': NUM_PROCESSOS,
+            'tamanho_fragmento': TAMANHO_FRAGMENTO,
+            'metodo_carga': METODO_CARGA if engine else None,
+            'tamanho_lote': TAMANHO_LOTE_COPY if engine else None,
+            'carga_rapida': CARGA_RAPIDA if engine else None,
+            'modelo_particionado': MODELO_PARTICIONADO if engine else None,
+            'volumes': volumes,
+        }
+        relatorio = montar_relatorio(parametros, metricas, time.perf_counter() - inicio_execucao)
+        print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+        if args.relatorio:
+            with open(args.relatorio, 'w', encoding='utf-8') as file:
+                json.dump(relatorio, file, indent=2, ensure_ascii=False)
+            logger.info(f"📝 Relatório salvo em {args.relatorio}")
+        return relatorio
         
     except Exception as e:
         logger.error(f"❌ Erro durante o processo: {e}")
     finally:
-        engine.dispose()
-        logger.info("🔌 Conexão com banco fechada")
+        if executor:
+            executor.shutdown()
+        if engine:
+            engine.dispose()
+            logger.info("🔌 Conexão com banco fechada")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
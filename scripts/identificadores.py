@@ -0,0 +1,98 @@
+"""
+Identificadores únicos da geração de dados sem fake.unique: CPFs válidos de uma permutação de Feistel semeada
+sobre o índice do registro e emails montados do nome e do índice
+"""
+
+import unicodedata
+
+import numpy as np
+
+# Bases de CPF com os 9 dígitos iguais (000000000, 111111111, ...) geram CPFs que os validadores recusam
+BASES_INVALIDAS = [digito * 111111111 for digito in range(10)]
+# Índices possíveis: cada um corresponde a uma base de 9 dígitos válida e distinta
+TAMANHO_ESPACO_CPF = 10**9 - len(BASES_INVALIDAS)
+
+# Rodadas da rede de Feistel (não é criptografia: só precisa embaralhar os índices)
+RODADAS_FEISTEL = 4
+
+# Pesos dos dígitos verificadores do CPF (1º: 10..2 sobre 9 dígitos; 2º: 11..2 sobre 10 dígitos)
+PESOS_DV1 = np.arange(10, 1, -1, dtype=np.int64)
+PESOS_DV2 = np.arange(11, 1, -1, dtype=np.int64)
+
+
+def chaves_rodadas(semente):
+    """Chaves das rodadas da rede de Feistel, derivadas da semente."""
+    return np.random.default_rng(semente).integers(1, 2**32, RODADAS_FEISTEL, dtype=np.uint64)
+
+
+def _feistel(valores, chaves, bits_metade):
+    """Uma passagem da rede de Feistel: bijeção de [0, 4^bits_metade) nele mesmo."""
+    mascara = np.uint64((1 << bits_metade) - 1)
+    esquerda, direita = valores >> np.uint64(bits_metade), valores & mascara
+    for chave in chaves:
+        # Função de rodada: qualquer função de (direita, chave) mantém a bijeção; esta só precisa embaralhar bem
+        mistura = (direita * np.uint64(0x9E3779B1) + chave) & np.uint64(0xFFFFFFFF)
+        mistura = ((mistura ^ (mistura >> np.uint64(13))) * np.uint64(0x85EBCA6B)) & np.uint64(0xFFFFFFFF)
+        esquerda, direita = direita, esquerda ^ ((mistura >> np.uint64(7)) & mascara)
+    return (esquerda << np.uint64(bits_metade)) | direita
+
+
+def permutar(indices, tamanho, semente):
+    """Permutação pseudoaleatória de [0, tamanho) (tamanho <= 2^60): índices distintos dão valores distintos.
+
+    A rede cobre a menor potência de 4 que contém o intervalo (no CPF, 2^30 para ~10^9 valores). Valores
+    fora do intervalo voltam a passar pela rede (cycle walking) até cair nele: em média, menos de 4 passagens.
+    """
+    valores = np.asarray(indices, dtype=np.uint64)
+    if valores.size and int(valores.max()) >= tamanho:
+        raise ValueError(f"Índice fora do intervalo da permutação (máximo {tamanho - 1})")
+    bits_metade = max(1, ((tamanho - 1).bit_length() + 1) // 2)
+    chaves = chaves_rodadas(semente)
+    valores = _feistel(valores, chaves, bits_metade)
+    fora = valores >= tamanho
+    while fora.any():
+        valores[fora] = _feistel(valores[fora], chaves, bits_metade)
+        fora = valores >= tamanho
+    return valores.astype(np.int64)
+
+
+def _pular_bases_invalidas(posicoes):
+    """Converte posições em [0, TAMANHO_ESPACO_CPF) nas bases de 9 dígitos válidas de mesma ordem."""
+    bases = posicoes.copy()
+    for invalida in BASES_INVALIDAS:
+        bases += bases >= invalida
+    return bases
+
+
+def digitos_verificadores(bases):
+    """Calcula os CPFs de 11 dígitos (como inteiros) a partir das bases de 9 dígitos."""
+    digitos = (bases[:, None] // 10 ** np.arange(8, -1, -1, dtype=np.int64)) % 10
+    dv1 = (digitos @ PESOS_DV1) * 10 % 11 % 10
+    dv2 = (np.column_stack([digitos, dv1]) @ PESOS_DV2) * 10 % 11 % 10
+    return bases * 100 + dv1 * 10 + dv2
+
+
+def gerar_cpfs(indices, semente):
+    """CPFs válidos (11 dígitos, sem formatação) dos registros de índices globais `indices`.
+
+    Índices distintos geram CPFs distintos, em qualquer fragmento ou processo, e a mesma semente gera os
+    mesmos CPFs. Suporta até TAMANHO_ESPACO_CPF registros.
+    """
+    bases = _pular_bases_invalidas(permutar(indices, TAMANHO_ESPACO_CPF, semente))
+    return [f"{cpf:011d}" for cpf in digitos_verificadores(bases).tolist()]
+
+
+def usuario_do_nome(nome):
+    """Usuário de email a partir de um nome: primeiro e último nome, minúsculos e sem acentos (ex.: joao.silva)."""
+    partes = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode().lower().split()
+    partes = [''.join(caractere for caractere in parte if caractere.isalnum()) for parte in partes]
+    partes = [parte for parte in partes if parte]
+    return '.'.join(partes[:1] + partes[1:][-1:]) or 'usuario'
+
+
+def gerar_emails(indices, nomes, dominios):
+    """Emails dos registros de índices globais `indices`: usuário do nome, índice + 1 e domínio.
+
+    O sufixo numérico (o índice global) garante a unicidade sem consultar os emails já gerados.
+    """
+    return [f"{usuario_do_nome(nome)}.{indice + 1}@{dominio}" for indice, nome, dominio in zip(indices, nomes, dominios)]
@@ -0,0 +1,129 @@
+-- Modelo físico com as tabelas transacionais particionadas por mês (PARTITION BY RANGE na coluna de data).
+-- As partições mensais (ex.: agendamento_2024_03) são criadas pelo gerador conforme as datas carregadas
+-- e a partição _padrao recebe as datas fora delas. No PostgreSQL a chave primária de uma tabela
+-- particionada inclui a coluna de partição, então as FKs que apontam para agendamento e consulta
+-- (consulta, consulta_procedimento e pagamento) não existem neste modelo. As demais são mantidas
+
+CREATE TABLE IF NOT EXISTS agendamento (
+  id_agendamento SERIAL,
+  data_agendamento timestamp NOT NULL,
+  status_agendamento varchar(100) DEFAULT NULL,
+  paciente_id_paciente int NOT NULL,
+  odontologista_id_odontologista int NOT NULL,
+  PRIMARY KEY (id_agendamento, data_agendamento)
+) PARTITION BY RANGE (data_agendamento);
+
+CREATE TABLE IF NOT EXISTS agendamento_padrao PARTITION OF agendamento DEFAULT;
+
+CREATE TABLE IF NOT EXISTS consulta (
+  id_consulta SERIAL,
+  data_hora timestamp NOT NULL,
+  diagnostico text,
+  tratamento text,
+  agendamento_id_agendamento int NOT NULL,
+  PRIMARY KEY (id_consulta, data_hora)
+) PARTITION BY RANGE (data_hora);
+
+CREATE TABLE IF NOT EXISTS consulta_padrao PARTITION OF consulta DEFAULT;
+
+CREATE TABLE IF NOT EXISTS consulta_procedimento (
+  id_consulta_procedimento SERIAL,
+  consulta_id_consulta int NOT NULL,
+  procedimento_id_procedimento int NOT NULL,
+  PRIMARY KEY (id_consulta_procedimento, consulta_id_consulta, procedimento_id_procedimento)
+);
+
+CREATE TABLE IF NOT EXISTS endereco (
+  id_endereco SERIAL PRIMARY KEY,
+  logradouro varchar(255) NOT NULL,
+  numero varchar(20) DEFAULT NULL,
+  complemento varchar(100) DEFAULT NULL,
+  bairro varchar(100) NOT NULL,
+  cidade varchar(100) NOT NULL,
+  estado char(2) NOT NULL,
+  cep varchar(9) NOT NULL,
+  pais varchar(200) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS log_pagamento (
+  id_log SERIAL,
+  tipo_acao varchar(10) NOT NULL,
+  id_pagamento int NOT NULL,
+  tipo_pagamento_id_tipo_pagamento int DEFAULT NULL,
+  valor_pago decimal(10,2) DEFAULT NULL,
+  data_pagamento timestamp DEFAULT NULL,
+  DataHoraOperacao timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  ExecutedBy varchar(100) DEFAULT NULL,
+  PRIMARY KEY (id_log, DataHoraOperacao)
+) PARTITION BY RANGE (DataHoraOperacao);
+
+CREATE TABLE IF NOT EXISTS log_pagamento_padrao PARTITION OF log_pagamento DEFAULT;
+
+CREATE TABLE IF NOT EXISTS odontologista (
+  id_odontologista SERIAL PRIMARY KEY,
+  nome_odontologista varchar(100) DEFAULT NULL,
+  especialidade varchar(100) DEFAULT NULL,
+  cro varchar(20) DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS paciente (
+  id_paciente SERIAL PRIMARY KEY,
+  nome_paciente varchar(100) DEFAULT NULL,
+  cpf_paciente varchar(11) DEFAULT NULL,
+  telefone varchar(15) DEFAULT NULL,
+  genero char(1) DEFAULT NULL,
+  data_nasc date DEFAULT NULL,
+  email varchar(100) DEFAULT NULL,
+  endereco_id_endereco int DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pagamento (
+  id_pagamento SERIAL,
+  valor_pago decimal(10,2) DEFAULT NULL,
+  data_pagamento timestamp NOT NULL,
+  tipo_pagamento_id_tipo_pagamento int NOT NULL,
+  consulta_id_consulta int NOT NULL,
+  PRIMARY KEY (id_pagamento, data_pagamento)
+) PARTITION BY RANGE (data_pagamento);
+
+CREATE TABLE IF NOT EXISTS pagamento_padrao PARTITION OF pagamento DEFAULT;
+
+CREATE TABLE IF NOT EXISTS procedimento (
+  id_procedimento SERIAL PRIMARY KEY,
+  nome_procedimento varchar(100) DEFAULT NULL,
+  descricao_procedimento varchar(100) DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tipo_pagamento (
+  id_tipo_pagamento SERIAL PRIMARY KEY,
+  descricao_tipo_pagamento varchar(100) DEFAULT NULL
+);
+
+CREATE INDEX fk_agendamento_paciente1 ON agendamento (paciente_id_paciente);
+CREATE INDEX fk_agendamento_odontologista1 ON agendamento (odontologista_id_odontologista);
+CREATE INDEX fk_consulta_agendamento1 ON consulta (agendamento_id_agendamento);
+CREATE INDEX fk_consulta_procedimento_consulta1 ON consulta_procedimento (consulta_id_consulta);
+CREATE INDEX fk_consulta_procedimento_procedimento1 ON consulta_procedimento (procedimento_id_procedimento);
+CREATE INDEX fk_paciente_endereco ON paciente (endereco_id_endereco);
+CREATE INDEX fk_pagamento_consulta1 ON pagamento (consulta_id_consulta);
+CREATE INDEX fk_pagamento_tipo_pagamento ON pagamento (tipo_pagamento_id_tipo_pagamento);
+
+ALTER TABLE agendamento
+  ADD CONSTRAINT fk_agendamento_odontologista1 FOREIGN KEY (odontologista_id_odontologista)
+    REFERENCES odontologista (id_odontologista) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE agendamento
+  ADD CONSTRAINT fk_agendamento_paciente1 FOREIGN KEY (paciente_id_paciente)
+    REFERENCES paciente (id_paciente) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE consulta_procedimento
+  ADD CONSTRAINT fk_consulta_procedimento_procedimento1 FOREIGN KEY (procedimento_id_procedimento)
+    REFERENCES procedimento (id_procedimento) ON DELETE CASCADE ON UPDATE CASCADE;
+
+ALTER TABLE paciente
+  ADD CONSTRAINT fk_paciente_endereco FOREIGN KEY (endereco_id_endereco)
+    REFERENCES endereco (id_endereco) ON DELETE SET NULL ON UPDATE CASCADE;
+
+ALTER TABLE pagamento
+  ADD CONSTRAINT fk_pagamento_tipo_pagamento FOREIGN KEY (tipo_pagamento_id_tipo_pagamento)
+    REFERENCES tipo_pagamento (id_tipo_pagamento) ON DELETE RESTRICT ON UPDATE CASCADE;
@@ -0,0 +1,101 @@
+"""
+Vocabulário da geração de dados: valores do Faker pt_BR sorteados uma vez por semente e guardados em disco,
+de onde as colunas de texto são montadas por índice (NumPy)
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+import faker
+import numpy as np
+from faker import Faker
+
+logger = logging.getLogger(__name__)
+
+# Campos do vocabulário e como cada valor é sorteado do Faker pt_BR
+CAMPOS = {
+    'primeiro_nome': lambda fake: fake.first_name(),
+    'sobrenome': lambda fake: fake.last_name(),
+    'logradouro': lambda fake: fake.street_name(),
+    'numero': lambda fake: fake.building_number(),
+    'complemento': lambda fake: fake.text(max_nb_chars=30),
+    'bairro': lambda fake: fake.bairro(),
+    'cidade': lambda fake: fake.city(),
+    'estado': lambda fake: fake.state_abbr(),
+    'cep': lambda fake: fake.postcode(),
+    'usuario': lambda fake: fake.user_name(),
+    'dominio': lambda fake: fake.free_email_domain(),
+}
+
+# Valores sorteados por campo. Campos com poucos valores possíveis no Faker (estados, domínios) se repetem
+# no conjunto na mesma proporção em que o Faker os sortearia
+TAMANHO_VOCABULARIO = int(os.getenv('TAMANHO_VOCABULARIO', '5000'))
+# Diretório do cache em disco (um arquivo JSON por semente, tamanho e versão do Faker)
+DIRETORIO_VOCABULARIO = os.getenv(
+    'DIRETORIO_VOCABULARIO', os.path.join(os.path.dirname(__file__), '..', '.cache', 'vocabulario')
+)
+
+# Proporção de nomes com dois sobrenomes (ex.: "Ana Souza Lima")
+PROPORCAO_DOIS_SOBRENOMES = 0.5
+
+# Vocabulários já carregados neste processo: {(semente, tamanho): {campo: array}}
+_carregados = {}
+
+
+def construir_vocabulario(semente, tamanho=None):
+    """Sorteia `tamanho` valores de cada campo com um Faker pt_BR semeado. Retorna {campo: lista}."""
+    tamanho = tamanho or TAMANHO_VOCABULARIO
+    fake = Faker('pt_BR')
+    fake.seed_instance(semente)
+    return {campo: [sortear(fake) for _ in range(tamanho)] for campo, sortear in CAMPOS.items()}
+
+
+def caminho_cache(semente, tamanho, diretorio=None):
+    """Arquivo do vocabulário em disco. A versão do Faker entra no nome: outra versão sorteia outros valores."""
+    diretorio = diretorio or DIRETORIO_VOCABULARIO
+    return os.path.join(diretorio, f"vocabulario_{semente}_{tamanho}_faker{faker.VERSION}.json")
+
+
+def carregar_vocabulario(semente, tamanho=None, diretorio=None):
+    """Retorna o vocabulário da semente: da memória, do cache em disco ou, na primeira vez, construído e salvo."""
+    tamanho = tamanho or TAMANHO_VOCABULARIO
+    chave = (semente, tamanho)
+    if chave in _carregados:
+        return _carregados[chave]
+
+    caminho = caminho_cache(semente, tamanho, diretorio)
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            valores = json.load(arquivo)
+    else:
+        valores = construir_vocabulario(semente, tamanho)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Grava em um temporário e renomeia: processos em paralelo nunca leem um arquivo pela metade
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump(valores, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+        logger.info(f"Vocabulário da semente {semente} ({tamanho} valores por campo) salvo em {caminho}")
+
+    _carregados[chave] = {campo: np.array(lista, dtype=object) for campo, lista in valores.items()}
+    return _carregados[chave]
+
+
+def sortear_textos(vocabulario, campo, rng, num):
+    """Sorteia `num` valores de um campo do vocabulário (com reposição) usando o gerador NumPy rng."""
+    valores = vocabulario[campo]
+    return valores[rng.integers(0, len(valores), num)].tolist()
+
+
+def compor_nomes(vocabulario, rng, num):
+    """Monta `num` nomes completos: primeiro nome, sobrenome e, em parte dos nomes, um segundo sobrenome."""
+    primeiros = sortear_textos(vocabulario, 'primeiro_nome', rng, num)
+    sobrenomes = sortear_textos(vocabulario, 'sobrenome', rng, num)
+    segundos = sortear_textos(vocabulario, 'sobrenome', rng, num)
+    dois_sobrenomes = (rng.random(num) < PROPORCAO_DOIS_SOBRENOMES).tolist()
+    return [
+        f"{primeiro} {sobrenome} {segundo}" if dois else f"{primeiro} {sobrenome}"
+        for primeiro, sobrenome, segundo, dois in zip(primeiros, sobrenomes, segundos, dois_sobrenomes)
+    ]